@@ -7,6 +7,11 @@ import argparse
 from variable_delay.src.argparse.help_formatter import BlankLinesHelpFormatter
 from variable_delay.src.analyze.dump_analyzer import DumpAnalyzer
 from variable_delay.src.analyze.dump_analyzer import MetadataError, AnalysisError, DataError
+from variable_delay.src.analyze.dump_analyzer import WINDOW_MARGIN, DATA, BIN
+from variable_delay.src.analyze.analyzer_args import *
+from variable_delay.src.analyze.pcap_reader import MMAP, DPKT, BACKENDS
+from variable_delay.src.analyze.packet_identity import PAYLOAD, HEADER, IDENTITIES
+from variable_delay.src.metadata.metadata import METADATA_NAME
 
 WORKING_DIR          = os.path.dirname(os.path.realpath(__file__))
 DEFAULT_IN_DIR_NAME  = 'dumps'
@@ -17,11 +22,12 @@ EXIT_SUCCESS         = 0
 EXIT_FAILURE         = 1
 SUCCESS_MESSAGE      = "SUCCESS"
 FAILURE_MESSAGE      = "FAILURE"
+BYTES_IN_MIB         = 1024 * 1024
 
 
 #
 # Function processes input arguments of the script
-# returns list of input arguments of the script
+# returns dictionary of processed input arguments of the script
 #
 def parse_arguments():
     parser = argparse.ArgumentParser(formatter_class=BlankLinesHelpFormatter, description=
@@ -33,19 +39,145 @@ def parse_arguments():
     parser.add_argument('-o', '--output-dir', default=DEFAULT_OUT_DIR_PATH,
                         help='folder with output files, default is "%s"' % DEFAULT_OUT_DIR_NAME)
 
+    parser.add_argument('-j', '--jobs', type=int, metavar='N',
+                        help='number of flows analysed in parallel by separate processes, the '
+                             'summaries of the flows are still printed in the order of the flows, '
+                             'default is 1 or all the flows for live analysis')
+
+    parser.add_argument('-m', '--memory-limit', type=int, metavar='MIB',
+                        help='cap on memory held by the processes analysing flows in parallel '
+                             'altogether, estimated from sizes of the dumps of the flows, a flow '
+                             'waits for other flows to finish if the cap would be exceeded, by '
+                             'default there is no cap, not used for live analysis')
+
+    parser.add_argument('-e', '--engine', choices=ENGINES,
+                        help='engine matching packets of sender and receiver dumps of a flow: '
+                             '"%s" reads the sender dump and then the receiver dump, "%s" reads '
+                             'the sender dump in a separate process while the receiver dump is '
+                             'read, "%s" reads both dumps at once in order of timestamps and keeps '
+                             'only the departures of the recent time window, "%s" reads digests, '
+                             'timestamps and sizes of packets of both dumps into arrays and '
+                             'matches them by a sort-merge join, default is "%s" or "%s" for live '
+                             'analysis' % (SEQUENTIAL, PIPELINED, WINDOWED, VECTORIZED, SEQUENTIAL,
+                                           WINDOWED))
+
+    parser.add_argument('-w', '--window', type=float, metavar='SEC',
+                        help='engine "%s": packets not arrived to receiver in this time after '
+                             'departure are considered lost, by default it is the maximum one-way '
+                             'delay of the flow computed from the delays, rates and queues of the '
+                             'links plus %g sec' % (WINDOWED, WINDOW_MARGIN))
+
+    parser.add_argument('-c', '--compact', action='store_true',
+                        help='packets are identified by 64-bit integer digests of CRC-32 and '
+                             'Adler-32 checksums instead of sha1 hex digests, which are computed '
+                             'faster and take about 100 instead of 135 bytes per packet waiting '
+                             'for its match')
+
+    parser.add_argument('-b', '--backend', default=MMAP, choices=BACKENDS,
+                        help='backend reading packets of dumps: "%s" is the built-in reader '
+                             'memory-mapping a dump and reading the needed fields of packets at '
+                             'fixed offsets, "%s" decodes each packet with dpkt library and is '
+                             'used for the dumps the built-in reader does not support, default is '
+                             '"%s"'
+                             % (MMAP, DPKT, MMAP))
+
+    parser.add_argument('-r', '--reanalyze', action='store_true',
+                        help='analyse all the flows, by default a flow is skipped if its data '
+                             'were written completely by the previous run from the same dumps '
+                             'which have not changed since then')
+
+    parser.add_argument('-l', '--live', action='store_true',
+                        help='analyse the dumps while they are still being captured by run.py: the '
+                             'dumps of all the flows are followed at once as they grow, and the '
+                             'analysis finishes shortly after the testing ends, only engine "%s" '
+                             'is supported' % WINDOWED)
+
+    parser.add_argument('-i', '--identity', default=PAYLOAD, choices=IDENTITIES,
+                        help='identity by which packets are matched in sender and receiver dumps: '
+                             '"%s" is ip id and the whole ip payload, "%s" is ip id and the fields '
+                             'of TCP header (ports, sequence and acknowledgement numbers, '
+                             'timestamps) or of UDP header, which allows to analyse dumps captured '
+                             'with a small snaplen, default is "%s"' % (PAYLOAD, HEADER, PAYLOAD))
+
+    parser.add_argument('-p', '--payload-len', default=0, type=int, metavar='BYTES',
+                        help='identity "%s": number of the first bytes of TCP/UDP payload added to '
+                             'the identity, default is 0' % HEADER)
+
+    parser.add_argument('-s', '--single-file', action='store_true',
+                        help='pack the data of all the flows and the metadata of the testing into '
+                             'the single file "%s.%s" instead of a file per flow, the flows are '
+                             'then analysed again by the next run. The metadata file "%s" is '
+                             'kept in the output folder, as it may be the only metadata of the '
+                             'dumps if the output folder is the folder of the dumps' %
+                             (DATA, BIN, METADATA_NAME))
+
+    parser.add_argument('-n', '--nanoseconds', action='store_true',
+                        help='keep timestamps of packets as integer nanoseconds through the '
+                             'analysis and in the data files instead of float seconds, so that '
+                             'the nanosecond timestamps of the dumps are not rounded, the dumps '
+                             'are read by the built-in readers only')
+
     args = parser.parse_args()
 
-    args.dir = os.path.realpath(os.path.expanduser(args.dir))
+    output = { }
+
+    output[IN_DIR] = os.path.realpath(os.path.expanduser(args.dir))
+
+    if not os.path.exists(output[IN_DIR]):
+        sys.exit('Directory %s does not exist' % output[IN_DIR])
+
+    output[OUT_DIR] = os.path.realpath(os.path.expanduser(args.output_dir))
+
+    if not os.path.exists(output[OUT_DIR]):
+        os.makedirs(output[OUT_DIR])
+
+    output[JOBS] = args.jobs
+
+    if output[JOBS] is None:
+        output[JOBS] = None if args.live else 1 # live analysis: as many jobs as flows
+    elif output[JOBS] <= 0:
+        sys.exit('Number of jobs should be positive')
+
+    output[MEMORY_LIMIT] = None
+
+    if args.memory_limit is not None:
+        if args.memory_limit <= 0:
+            sys.exit('Memory limit should be positive')
+
+        output[MEMORY_LIMIT] = args.memory_limit * BYTES_IN_MIB
+
+    output[LIVE]   = args.live
+    output[ENGINE] = args.engine
+
+    if output[ENGINE] is None:
+        output[ENGINE] = WINDOWED if output[LIVE] else SEQUENTIAL
+
+    if output[LIVE] and output[ENGINE] != WINDOWED:
+        sys.exit('Live analysis requires engine "%s"' % WINDOWED)
+
+    if output[LIVE] and output[MEMORY_LIMIT] is not None:
+        sys.exit('Memory limit cannot be used for live analysis, as the flows cannot wait while '
+                 'their dumps grow')
+
+    output[COMPACT]     = args.compact
+    output[BACKEND]     = args.backend
+    output[WINDOW]      = args.window
+    output[REANALYZE]   = args.reanalyze
+    output[IDENTITY]    = args.identity
+    output[PAYLOAD_LEN] = args.payload_len
+    output[SINGLE_FILE] = args.single_file
+    output[NANOSECONDS] = args.nanoseconds
 
-    if not os.path.exists(args.dir):
-        sys.exit('Directory %s does not exist' % args.dir)
+    if output[PAYLOAD_LEN] < 0:
+        sys.exit('Payload length should be non-negative')
 
-    args.output_dir = os.path.realpath(os.path.expanduser(args.output_dir))
+    if output[WINDOW] is not None and output[WINDOW] <= 0:
+        sys.exit('Window should be positive')
 
-    if not os.path.exists(args.output_dir):
-        os.makedirs(args.output_dir)
+    if output[ENGINE] == PIPELINED and output[JOBS] != 1:
+        sys.exit('Engine "%s" cannot be used with more than one job' % PIPELINED)
 
-    return args
+    return output
 
 
 #
@@ -56,7 +188,7 @@ if __name__ == '__main__':
     exitCode = EXIT_SUCCESS
 
     try:
-        DumpAnalyzer(args.dir, args.output_dir).extract_data()
+        DumpAnalyzer(args).extract_data()
     except MetadataError as error:
         print("Metadata ERROR:\n%s" % error)
         exitCode = EXIT_FAILURE
@@ -9,9 +9,16 @@ from variable_delay.src.argparse.help_formatter import BlankLinesHelpFormatter
 SENDER                  = 'sender'
 RECEIVER                = 'receiver'
 PCAP                    = '.pcap'
+PCAPNG                  = '.pcapng'
+COMPRESSIONS            = ['', '.gz', '.xz', '.zst']
+DUMPS                   = tuple(dump + compression for dump in [PCAP, PCAPNG]
+                                                   for compression in COMPRESSIONS)
 JSON                    = '.json'
 PNG                     = '.png'
 LOG                     = '.log'
+BIN                     = '.bin'
+TMP                     = '.tmp'
+MANIFEST                = '.manifest'
 WORKING_DIR             = os.path.dirname(os.path.realpath(__file__))
 DEFAULT_PCAPS_DIR_NAME  = 'dumps'
 DEFAULT_DATA_DIR_NAME   = os.path.join('graphs', 'data')
@@ -22,9 +29,9 @@ DEFAULT_GRAPHS_PATH     = os.path.join(WORKING_DIR, DEFAULT_GRAPHS_DIR_NAME)
 
 
 parser = argparse.ArgumentParser(formatter_class=BlankLinesHelpFormatter, description=
-'The script cleans three output directories. The script deletes only pcap/json/png/log files and '
-'does not touch any subdirectories. If any of the chosen directories gets completely empty the '
-'script also deletes the directory.')
+'The script cleans three output directories. The script deletes only pcap/pcapng (also compressed) '
+'and json/png/log/bin/manifest/tmp files and does not touch any subdirectories. If any of the '
+'chosen directories gets completely empty the script also deletes the directory.')
 
 parser.add_argument('-a', '--all', action='store_true',
                     help='delete all files in the three directories, same as -pdg')
@@ -96,8 +103,9 @@ for directory in directories:
     files = [f for f in os.listdir(directory) if os.path.isfile(os.path.join(directory, f))]
 
     for file in files:
-        if not file.endswith(PCAP) and not file.endswith(JSON) and not file.endswith(PNG)\
-                                                               and not file.endswith(LOG):
+        if not file.endswith(DUMPS) and not file.endswith(JSON) and not file.endswith(PNG)\
+                                    and not file.endswith(LOG)  and not file.endswith(BIN)\
+                                    and not file.endswith(MANIFEST) and not file.endswith(TMP):
             continue
 
         if SENDER in file:
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+
+import sys
+import os
+import argparse
+from multiprocessing import cpu_count
+
+from variable_delay.src.argparse.help_formatter import BlankLinesHelpFormatter
+from variable_delay.src.convert.data_converter import DataConverter, DataError
+from variable_delay.src.convert.converter_args import *
+
+WORKING_DIR      = os.path.dirname(os.path.realpath(__file__))
+DEFAULT_DIR_NAME = os.path.join('graphs', 'data')
+DEFAULT_DIR_PATH = os.path.join(WORKING_DIR, DEFAULT_DIR_NAME)
+EXIT_SUCCESS     = 0
+EXIT_FAILURE     = 1
+SUCCESS_MESSAGE  = "SUCCESS"
+FAILURE_MESSAGE  = "FAILURE"
+
+
+#
+# Function processes input arguments of the script
+# returns dictionary of processed input arguments of the script
+#
+def parse_arguments():
+    parser = argparse.ArgumentParser(formatter_class=BlankLinesHelpFormatter, description=
+    'The script converts the data of flows from the json lines data log files written by the '
+    'previous versions of the analysis script into the binary data files. The data of each flow '
+    'are converted by a separate process and are checked against the log file afterwards.')
+
+    parser.add_argument('dirs', nargs='*', default=[ DEFAULT_DIR_PATH ], metavar='DIR',
+                        help='folders with data files, the flows having only the data log files '
+                             'are converted, default is "%s"' % DEFAULT_DIR_NAME)
+
+    parser.add_argument('-j', '--jobs', type=int, metavar='N',
+                        help='number of flows converted in parallel by separate processes, '
+                             'default is the number of CPUs')
+
+    parser.add_argument('-k', '--keep', action='store_true',
+                        help='keep the data log files of the converted flows, by default they are '
+                             'deleted once the data files are checked')
+
+    args = parser.parse_args()
+
+    output = { }
+
+    output[DIRS] = [ os.path.realpath(os.path.expanduser(directory)) for directory in args.dirs ]
+
+    for directory in output[DIRS]:
+        if not os.path.isdir(directory):
+            sys.exit('Directory %s does not exist' % directory)
+
+    output[JOBS] = cpu_count() if args.jobs is None else args.jobs
+
+    if output[JOBS] <= 0:
+        sys.exit('Number of jobs should be positive')
+
+    output[KEEP] = args.keep
+
+    return output
+
+
+#
+# Entry function
+#
+if __name__ == '__main__':
+    args     = parse_arguments()
+    exitCode = EXIT_SUCCESS
+
+    try:
+        DataConverter(args).convert()
+    except DataError as error:
+        print("Data conversion ERROR:\n%s" % error)
+        exitCode = EXIT_FAILURE
+    except KeyboardInterrupt:
+        print("KeyboardInterrupt was caught")
+        exitCode = EXIT_FAILURE
+
+    exitMessage = SUCCESS_MESSAGE if exitCode == EXIT_SUCCESS else FAILURE_MESSAGE
+    print(exitMessage)
+
+    sys.exit(exitCode)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+
+import sys
+import os
+import argparse
+
+from variable_delay.src.argparse.help_formatter import BlankLinesHelpFormatter
+from variable_delay.src.export.exporter_args import *
+from variable_delay.src.export.data_exporter import DataExporter, MetadataError, DataError
+from variable_delay.src.export.table_writer import get_formats, NPY, ARROW
+
+WORKING_DIR          = os.path.dirname(os.path.realpath(__file__))
+DEFAULT_IN_DIR_NAME  = os.path.join('graphs', 'data')
+DEFAULT_IN_DIR_PATH  = os.path.join(WORKING_DIR, DEFAULT_IN_DIR_NAME)
+DEFAULT_OUT_DIR_NAME = os.path.join('graphs', 'export')
+DEFAULT_OUT_DIR_PATH = os.path.join(WORKING_DIR, DEFAULT_OUT_DIR_NAME)
+DEFAULT_FORMAT       = ARROW if ARROW in get_formats() else NPY
+EXIT_SUCCESS         = 0
+EXIT_FAILURE         = 1
+SUCCESS_MESSAGE      = "SUCCESS"
+FAILURE_MESSAGE      = "FAILURE"
+
+
+#
+# Function processes input arguments of the script
+# returns dictionary of processed input arguments of the script
+#
+def parse_arguments():
+    parser = argparse.ArgumentParser(formatter_class=BlankLinesHelpFormatter, description=
+    'The script exports the data extracted from pcap-files into columnar files for external tools: '
+    'packets.EXT with the flow, scheme, direction, arrival time, one-way delay and size of each '
+    'packet, slots.EXT with the average throughput and one-way delay of each flow per time '
+    'interval (-i), jain.EXT with Jain\'s index over the average throughputs of the flows per '
+    'time interval. The export can be limited to the packets arrived within a time range (--from, '
+    '--to).')
+
+    parser.add_argument('-d', '--dir', default=DEFAULT_IN_DIR_PATH,
+    help='Folder with input data-files, default is "%s"' % DEFAULT_IN_DIR_NAME)
+
+    parser.add_argument('-o', '--output-dir', default=DEFAULT_OUT_DIR_PATH,
+    help='Folder with output exported files, default is "%s"' % DEFAULT_OUT_DIR_NAME)
+
+    parser.add_argument('-F', '--format', default=DEFAULT_FORMAT, choices=get_formats(),
+    help='Format of exported files: "arrow" for Arrow IPC files which pyarrow reads by memory '
+         'mapping, "parquet" for Parquet files, "npy" for folders of numpy files, one file per '
+         'column, which numpy reads by memory mapping. The arrow and parquet formats require '
+         'pyarrow package. Default is "%s"' % DEFAULT_FORMAT)
+
+    parser.add_argument('-i', '--interval', default=0.5, type=float, metavar='SEC',
+    help='Interval per which slotted data are computed in seconds, default is 0.5')
+
+    parser.add_argument('--from', dest='from_sec', type=float, metavar='SEC',
+    help='Only packets arrived not earlier than SEC seconds since the start of the testing are '
+         'exported, by default the packets from the start')
+
+    parser.add_argument('--to', dest='to_sec', type=float, metavar='SEC',
+    help='Only packets arrived earlier than SEC seconds since the start of the testing are '
+         'exported, by default the packets until the end')
+
+    parser.add_argument('-m', '--memory', default=1024, type=int, metavar='MIB',
+    help='Memory budget in MiB for the data of flows parsed from data log files of the previous '
+         'versions, which are loaded once for all the exported files. Above the budget, the data '
+         'are spilled into temporary files instead of being parsed again. Default is 1024')
+
+    args = parser.parse_args()
+
+    output = { }
+
+    output[SLOT_SEC] = args.interval
+
+    if output[SLOT_SEC] <= 0.0:
+        sys.exit('Interval should be positive')
+
+    output[FROM_SEC] = args.from_sec
+    output[TO_SEC]   = args.to_sec
+
+    if output[FROM_SEC] is not None and output[FROM_SEC] < 0.0:
+        sys.exit('Start of time range --from should be non-negative')
+
+    if output[FROM_SEC] is not None and output[TO_SEC] is not None and \
+       output[FROM_SEC] >= output[TO_SEC]:
+        sys.exit('Start of time range --from should be less than its end --to')
+
+    output[IN_DIR] = os.path.realpath(os.path.expanduser(args.dir))
+
+    if not os.path.exists(output[IN_DIR]):
+        sys.exit('Directory %s does not exist' % output[IN_DIR])
+
+    output[OUT_DIR] = os.path.realpath(os.path.expanduser(args.output_dir))
+
+    if not os.path.exists(output[OUT_DIR]):
+        os.makedirs(output[OUT_DIR])
+
+    output[FORMAT] = args.format
+
+    output[MEMORY_MIB] = args.memory
+
+    if output[MEMORY_MIB] < 0:
+        sys.exit('Memory budget should be non-negative')
+
+    return output
+
+
+#
+# Entry function
+#
+if __name__ == '__main__':
+    args     = parse_arguments()
+    exitCode = EXIT_SUCCESS
+
+    try:
+        DataExporter(args).export()
+    except MetadataError as error:
+        print("Metadata ERROR:\n%s" % error)
+        exitCode = EXIT_FAILURE
+    except DataError as error:
+        print("Exporting data ERROR:\n%s" % error)
+        exitCode = EXIT_FAILURE
+    except KeyboardInterrupt:
+        print("KeyboardInterrupt was caught")
+        exitCode = EXIT_FAILURE
+
+    exitMessage = SUCCESS_MESSAGE if exitCode == EXIT_SUCCESS else FAILURE_MESSAGE
+    print(exitMessage)
+
+    sys.exit(exitCode)
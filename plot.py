@@ -3,6 +3,7 @@
 import sys
 import os
 import argparse
+from multiprocessing import cpu_count
 
 from variable_delay.src.argparse.help_formatter import BlankLinesHelpFormatter
 from variable_delay.src.plot.plotter_args import *
@@ -69,30 +70,30 @@ def process_colors_argument(colorsArg):
 
 
 #
-# Function processes arguments specifying the required type of the plots/stats to make.
+# Function processes arguments specifying the required types of the plots/stats to make. Several
+# types may be chosen at once, then the data of the flows are computed once for all the types.
 # param [in] perFlowArg   - per-flow type boolean argument
 # param [in] totalArg     - total type boolean argument
 # param [in] perSubsetArg - per-subset type string argument
 # throws PlotTypeError
-# returns the type of plots/stats to make
+# returns the list of types of plots/stats to make
 #
 def process_type_arguments(perFlowArg, totalArg, perSubsetArg):
     if perFlowArg is False and totalArg is False and perSubsetArg is None:
-        sys.exit('One of the flags -f, -t, -s should be chosen')
+        sys.exit('At least one of the flags -f, -t, -s should be chosen')
 
-    if perFlowArg is True and totalArg     is True     or \
-       perFlowArg is True and perSubsetArg is not None or \
-       totalArg   is True and perSubsetArg is not None:
-        sys.exit('Flags -f, -t, -s are mutually exclusive')
+    plotTypes = []
 
     if perFlowArg is True:
-        return PerFlowPlot()
+        plotTypes.append(PerFlowPlot())
 
     if totalArg is True:
-        return TotalPlot()
+        plotTypes.append(TotalPlot())
 
     if perSubsetArg is not None:
-        return PerSubsetPlot(perSubsetArg.split())
+        plotTypes.append(PerSubsetPlot(perSubsetArg.split()))
+
+    return plotTypes
 
 
 #
@@ -120,8 +121,35 @@ def add_arguments(parser):
          'having both the same scheme name and direction. Currently allowed layout fields: {}.'
          .format(PerSubsetPlot.ALLOWED_FIELDS))
 
-    parser.add_argument('-i', '--interval', default=0.5, type=float, metavar='SEC',
-    help='Interval per which average graphs are computed in seconds, default is 0.5')
+    parser.add_argument('-i', '--interval', default=[ 0.5 ], type=float, nargs='+', metavar='SEC',
+    help='Interval(s) per which average graphs are computed in seconds, default is 0.5. For '
+         'several intervals, the average graphs and stats are made for each interval with the '
+         'interval in their filenames, while the data are loaded once: for integer nanosecond '
+         'arrivals, the average data of an interval being a multiple of the finest interval are '
+         'summed from the finest one')
+
+    parser.add_argument('--from', dest='from_sec', type=float, metavar='SEC',
+    help='Only packets arrived not earlier than SEC seconds since the start of the testing are '
+         'plotted, by default the packets from the start')
+
+    parser.add_argument('--to', dest='to_sec', type=float, metavar='SEC',
+    help='Only packets arrived earlier than SEC seconds since the start of the testing are '
+         'plotted, by default the packets until the end')
+
+    parser.add_argument('-e', '--exact', action='store_true',
+    help='Per-packet delay stats are computed exactly over the delays of all the packets, by '
+         'default they are estimated within 0.01%% by merging the quantile sketches of delays '
+         'saved by the analysis, unless a time range is chosen or the data have no sketches')
+
+    parser.add_argument('-m', '--memory', default=1024, type=int, metavar='MIB',
+    help='Memory budget in MiB for the data of flows parsed from data log files of the previous '
+         'versions, which are loaded once for all the graphs and stats. Above the budget, the data '
+         'are spilled into temporary files instead of being parsed again. Default is 1024')
+
+    parser.add_argument('-p', '--processes', type=int, metavar='N',
+    help='Number of processes rendering the graphs in parallel while the data of the next graphs '
+         'are computed, with 1 the graphs are rendered one after another. Default is the number '
+         'of CPUs')
 
     parser.add_argument('-c', '--colors', metavar='"COLOR1 COLOR2..."',
     help='Color cycle for curves with colors specified in any format recognized by matplotlib')
@@ -138,11 +166,32 @@ def add_arguments(parser):
 def process_arguments(args):
     output = { }
 
-    output[SLOT_SEC] = args.interval
+    output[SLOTS_SEC] = sorted(set(args.interval))
 
-    if output[SLOT_SEC] <= 0.0:
+    if output[SLOTS_SEC][0] <= 0.0:
         sys.exit('Interval should be positive')
 
+    output[FROM_SEC] = args.from_sec
+    output[TO_SEC]   = args.to_sec
+    output[EXACT]    = args.exact
+
+    output[MEMORY_MIB] = args.memory
+
+    if output[MEMORY_MIB] < 0:
+        sys.exit('Memory budget should be non-negative')
+
+    output[PROCESSES] = cpu_count() if args.processes is None else args.processes
+
+    if output[PROCESSES] < 1:
+        sys.exit('Number of processes should be positive')
+
+    if output[FROM_SEC] is not None and output[FROM_SEC] < 0.0:
+        sys.exit('Start of time range --from should be non-negative')
+
+    if output[FROM_SEC] is not None and output[TO_SEC] is not None and \
+       output[FROM_SEC] >= output[TO_SEC]:
+        sys.exit('Start of time range --from should be less than its end --to')
+
     output[IN_DIR] = os.path.realpath(os.path.expanduser(args.dir))
 
     if not os.path.exists(output[IN_DIR]):
@@ -153,7 +202,7 @@ def process_arguments(args):
     if not os.path.exists(output[OUT_DIR]):
         os.makedirs(output[OUT_DIR])
 
-    output[PLOT_TYPE]         = process_type_arguments (args.per_flow, args.total, args.per_subset)
+    output[PLOT_TYPES]        = process_type_arguments (args.per_flow, args.total, args.per_subset)
 
     output[COLOR_CYCLE]       = process_colors_argument(args.colors)
 
@@ -169,11 +218,13 @@ def process_arguments(args):
 def parse_arguments():
     parser = argparse.ArgumentParser(formatter_class=BlankLinesHelpFormatter, description=
     'The script makes graphs and stats over data extracted from pcap-files. Possible types of '
-    'graphs and stats: per-flow (-f), total (-t), per-subset (-s). For any type chosen, the '
-    'following graphs and stats are generated: average throughput, average Jain\'s index, average '
-    'one-way delay, per-packet one-way delay. The average graphs are averaged per chosen time '
-    'interval (-i). Average Jain\'s index graph always contains one curve, as it is computed over '
-    'the curves present in the corresponding average throughput graph.')
+    'graphs and stats: per-flow (-f), total (-t), per-subset (-s). Several types can be chosen at '
+    'once. For any type chosen, the following graphs and stats are generated: average throughput, '
+    'average Jain\'s index, average one-way delay, per-packet one-way delay. The average graphs '
+    'are averaged per chosen time interval (-i). Average Jain\'s index graph always contains one '
+    'curve, as it is computed over the curves present in the corresponding average throughput '
+    'graph. The graphs and stats can be limited to the packets arrived within a time range '
+    '(--from, --to).')
 
     add_arguments(parser)
 
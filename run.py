@@ -9,6 +9,7 @@ import pwd
 from variable_delay.src.argparse.help_formatter import BlankLinesHelpFormatter
 from variable_delay.src.test.test import test
 from variable_delay.src.metadata.metadata import compute_metadata, save_metadata, MetadataError
+from variable_delay.src.test.capture_status import remove_capture_status
 from variable_delay.src.layout.layout import parse_layout, save_default_layout, parse_time_str
 from variable_delay.src.layout.layout import LayoutError
 from variable_delay.src.processed_args.args_names import *
@@ -286,6 +287,7 @@ if __name__ == '__main__':
         args     = process_arguments(args)
         layout   = parse_layout(args[LAYOUT_PATH], args[RUNTIME], args[PANTHEON], args[MAX_DELAY])
         metadata = compute_metadata(args, layout)
+        remove_capture_status(args[DIR])
         save_metadata(args[DIR], metadata)
     except ArgsError as error:
         print("Arguments processing ERROR:\n%s" % error)
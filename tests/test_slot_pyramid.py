@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from variable_delay.src.data.data import load_slots
+from variable_delay.src.data.data_writer import DataWriter
+from variable_delay.src.plot.flow import Flow
+from variable_delay.src.plot.flow_cache import FlowCache
+
+NS_IN_MS    = 1000000
+FLOW        = 0
+SLOTS       = 2000 # milliseconds covered by the arrivals
+INTERVALS   = [ 0.001, 0.002, 0.01, 0.1, 0.25, 0.5, 1.0 ]
+TIME_RANGES = [ (None, None), (0.1, 0.7) ]
+BUDGET_MIB  = 64
+
+
+#
+# Function writes the data file of the flow
+# param [in] directory   - output directory
+# param [in] arrivals    - numpy array of arrivals: float seconds or integer nanoseconds
+# param [in] nanoseconds - whether arrivals are integer nanoseconds
+#
+def write_flow(directory, arrivals, nanoseconds):
+    random = np.random.RandomState(len(arrivals))
+    writer = DataWriter(directory, FLOW, nanoseconds)
+
+    try:
+        writer.extend(arrivals, random.uniform(1, 100, len(arrivals)),
+                      random.randint(60, 1515, len(arrivals)))
+        writer.finish([ 0, 0 ])
+    finally:
+        writer.discard()
+
+
+#
+# Class the instance of which checks that the average data of a flow summed from the pyramid of
+# slotted data are the same as the average data of the flow slotted per packet, with the packets
+# arrived exactly at the bounds of the slots and next to them
+#
+class SlotPyramidTest(unittest.TestCase):
+    #
+    # Method creates the temporary directory of the data files
+    #
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+
+    #
+    # Method removes the temporary directory of the data files
+    #
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+    #
+    # Method checks the integer nanosecond arrivals: at each bound of 1 ms slots and 1 ns around it
+    #
+    def test_nanosecond_bounds(self):
+        bounds   = np.arange(1, SLOTS, dtype=np.int64) * NS_IN_MS
+        arrivals = np.sort(np.concatenate((bounds - 1, bounds, bounds + 1)))
+
+        write_flow(self.directory, arrivals, True)
+
+        for fromSec, toSec in TIME_RANGES:
+            for slotSec in INTERVALS:
+                self.assertIsNotNone(load_slots(self.directory, FLOW + 1, slotSec, fromSec, toSec))
+                self.check_slots(fromSec, toSec, slotSec, True)
+
+
+    #
+    # Method checks the float arrivals at the bounds of 1 ms slots and next to them. Some of them,
+    # e.g. 0.3, are put into other slots by the pyramid than by the per-packet slotting, e.g. into
+    # 100 ms slot 3 instead of 2, so the pyramid should not be used.
+    #
+    def test_float_bounds(self):
+        bounds     = np.arange(1, SLOTS) / 1000.0
+        arrivals   = np.sort(np.concatenate((np.nextafter(bounds, 0), bounds,
+                                             np.nextafter(bounds, np.inf))))
+        pyramidIds = (arrivals / 0.001).astype(np.int64)
+
+        self.assertTrue(any(np.any(pyramidIds // int(round(slotSec / 0.001)) !=
+                                   (arrivals / slotSec).astype(np.int64))
+                            for slotSec in INTERVALS))
+
+        write_flow(self.directory, arrivals, False)
+
+        for fromSec, toSec in TIME_RANGES:
+            for slotSec in INTERVALS:
+                self.assertIsNone(load_slots(self.directory, FLOW + 1, slotSec, fromSec, toSec))
+                self.check_slots(fromSec, toSec, slotSec, False)
+
+
+    #
+    # Method compares the average data of the flow computed by the plotting script with the
+    # average data of the flow slotted per packet
+    # param [in] fromSec     - start of the time range in seconds or None
+    # param [in] toSec       - end of the time range in seconds or None
+    # param [in] slotSec     - float slot size in seconds
+    # param [in] integerTime - whether arrivals are integer nanoseconds
+    #
+    def check_slots(self, fromSec, toSec, slotSec, integerTime):
+        cache = FlowCache(self.directory, fromSec, toSec, BUDGET_MIB)
+
+        try:
+            slotsNumber = int(SLOTS * 0.001 / slotSec) + 2
+
+            flow = Flow(FLOW)
+            flow.compute_average_data(cache, slotsNumber, slotSec)
+
+            arrivals, delays, sizes = cache.get_packets(FLOW + 1)[:3]
+
+            expected = Flow(FLOW)
+            expected.compute_slots(Flow.get_slot_ids(arrivals, slotSec), None, delays, sizes,
+                                   slotsNumber)
+        finally:
+            cache.close()
+
+        self.assertEqual(flow.integerTime, integerTime)
+        self.assertTrue(np.array_equal(flow.slottedPkts,  expected.slottedPkts))
+        self.assertTrue(np.array_equal(flow.slottedBytes, expected.slottedBytes))
+        self.assertTrue(np.allclose(flow.slottedDelays, expected.slottedDelays, rtol=1e-12))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,23 @@
+#!/usr/bin/env python
+
+IN_DIR       = 'in-dir'
+OUT_DIR      = 'out-dir'
+JOBS         = 'jobs'
+MEMORY_LIMIT = 'memory-limit'
+ENGINE       = 'engine'
+COMPACT      = 'compact'
+BACKEND      = 'backend'
+WINDOW       = 'window'
+REANALYZE    = 'reanalyze'
+LIVE         = 'live'
+IDENTITY     = 'identity'
+PAYLOAD_LEN  = 'payload-len'
+SINGLE_FILE  = 'single-file'
+NANOSECONDS  = 'nanoseconds'
+
+# engines matching packets of sender and receiver dumps
+SEQUENTIAL = 'sequential'
+PIPELINED  = 'pipelined'
+WINDOWED   = 'windowed'
+VECTORIZED = 'vectorized'
+ENGINES    = [ SEQUENTIAL, PIPELINED, WINDOWED, VECTORIZED ]
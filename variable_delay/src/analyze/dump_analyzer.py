@@ -2,24 +2,90 @@
 
 import os
 import sys
+import time
+import signal
 import hashlib
+import numpy as np
+from array import array
+from collections import deque
+from multiprocessing import Pool, Process, Queue
 
-from dpkt.pcap import Reader
-from dpkt.ethernet import Ethernet
+try:
+    from StringIO import StringIO # python2
+except ImportError:
+    from io import StringIO       # python3
+
+try:
+    from Queue import Empty       # python2
+except ImportError:
+    from queue import Empty       # python3
 
 from variable_delay.src.metadata.metadata import load_metadata, save_metadata, MetadataError
 from variable_delay.src.metadata.metadata_fields import RUNTIME, ALL_FLOWS, SORTED_LAYOUT
+from variable_delay.src.metadata.metadata_fields import RATE, MAX_DELAY, JITTER
+from variable_delay.src.metadata.metadata_fields import FIRST_QUEUE, SECOND_QUEUE
 from variable_delay.src.layout.layout_fields import FLOWS, DIRECTION, SCHEME
+from variable_delay.src.layout.layout_fields import LEFT_RATE, RIGHT_RATE, LEFT_DELAY, RIGHT_DELAY
+from variable_delay.src.layout.layout_fields import LEFT_QUEUES, RIGHT_QUEUES
 from variable_delay.src.layout.layout import RIGHTWARD, compute_per_flow
 from variable_delay.src.pantheon.pantheon_constants import RECEIVER, SENDER
 from variable_delay.src.analyze.progress_bar import ProgressBar
-from variable_delay.src.data.data import save_data, DataError
+from variable_delay.src.analyze.analyzer_args import *
+from variable_delay.src.analyze.sort_merge import collapse_departures, match_arrivals
+from variable_delay.src.analyze.packet_identity import header_identity, digest_64, HEADER
+from variable_delay.src.analyze.pcap_reader import open_dump, find_dump, get_dump_size
+from variable_delay.src.analyze.pcap_reader import LivePcapReader, read_first_timestamp
+from variable_delay.src.test.capture_status import load_capture_status, DONE
+from variable_delay.src.data.data import DataError, DATA, BIN, NS_IN_SEC
+from variable_delay.src.data.data_writer import DataWriter, pack_container
+from variable_delay.src.data.manifest import save_manifest, load_manifest, remove_manifest
+from variable_delay.src.data.manifest import FORMAT_VERSION, VERSION, BASE_TIME, WINDOW_SEC
+from variable_delay.src.data.manifest import PACKET_ID, DUMPS, DATA_SIZE, TIME_UNITS
 from variable_delay.src.data.data_fields import *
 
-MS_IN_SEC = 1000
-UTF8      = 'utf-8'
-PYTHON3   = 3
-PERCENTS  = 100.0
+MS_IN_SEC    = 1000
+US_IN_SEC    = 1000000
+BITS_IN_BYTE = 8
+BITS_IN_MBIT = 1000000
+UTF8         = 'utf-8'
+PYTHON3      = 3
+PERCENTS     = 100.0
+POLL_SEC     = 0.1
+BYTES_IN_MIB = 1024 * 1024
+BATCH        = 'batch'
+SUMMARY      = 'summary'
+ERROR        = 'error'
+
+# Pipelined engine: sender's departures are streamed in batches through a queue of limited length,
+# and receiver's packets wait for their departures until the sender's stream passes them by slack.
+BATCH_PACKETS  = 4096
+QUEUE_BATCHES  = 64
+MAX_PENDING    = 65536
+PIPELINE_SLACK = 1.0
+
+# Estimation of memory held by a process analysing a flow: the fixed footprint of the process plus
+# the share of the sender's dump size kept in memory as departures, as extracted per-packet data
+# are written to the disk in blocks.
+# The size of a compressed dump is scaled by the upper estimate of the compression ratio of dumps.
+PROCESS_MEMORY_BYTES = 50 * BYTES_IN_MIB
+MEMORY_PER_DUMP_BYTE = 0.25
+MEMORY_PER_DUMP_BYTE_COMPACT = 0.2
+COMPRESSION_RATIO = 10
+
+# Windowed engine: a departure is declared lost when it is older than the maximum one-way delay of
+# the flow -- netem delays, jitter and full queues of MTU-sized packets on the path -- plus margin.
+MAX_PACKET_BYTES = 1514
+WINDOW_MARGIN    = 1.0
+
+# Live analysis: the matched packets are kept until the base time is known, which is looked for
+# once per the number of packets kept.
+DEFERRED_PACKETS = 4096
+
+try:
+    array('q')
+    INT64_TYPE = 'q' # python3: signed 64-bit integer
+except ValueError:
+    INT64_TYPE = 'l' # python2: signed long which is 64-bit on 64-bit Linux
 
 
 #
@@ -29,37 +95,81 @@ class AnalysisError(Exception):
     pass
 
 
+globalAnalyzer = None # Global analyzer whose flows are analysed -- for multiprocessing pool
+
+
+#
+# Global function which analyses one flow and collects its summary output -- for multiprocessing
+# param [in] flow - flow index
+# throws AnalysisError, DataError
+# returns the summary output of the analysis of the flow
+#
+def analyse_flow_in_worker(flow):
+    output     = StringIO()
+    sys.stdout = output
+
+    try:
+        globalAnalyzer.analyse_flow(flow)
+    finally:
+        sys.stdout = sys.__stdout__
+
+    return output.getvalue()
+
+
 #
 # Class the instance of which allows to extract data from pcap-files produced during testing
 #
 class DumpAnalyzer(object):
     #
     # Constructor
-    # param[in] inDir  - full path of input directory with dumps to analyse
-    # param[in] outDir - full path of output directory to save data extracted from the dumps
+    # param[in] args - dictionary of the analyzer arguments
     # throws MetadataError
     #
-    def __init__(self, inDir, outDir):
-        self.inDir  = inDir  # full path of input directory with dumps
-        self.outDir = outDir # full path of output directory for extracted data
+    def __init__(self, args):
+        self.inDir       = args[IN_DIR]       # full path of input directory with dumps
+        self.outDir      = args[OUT_DIR]      # full path of output directory for extracted data
+        self.jobs        = args[JOBS]         # number of flows analysed in parallel or None
+        self.memoryLimit = args[MEMORY_LIMIT] # cap in bytes on memory of parallel analysis or None
+        self.engine      = args[ENGINE]       # engine matching packets of sender and receiver dumps
+        self.compact     = args[COMPACT] or \
+                           args[ENGINE] == VECTORIZED # whether 64-bit digests identify packets
+        self.backend     = args[BACKEND]      # backend reading packets of dumps
+        self.window      = args[WINDOW]       # windowed engine: max age of departures or None
+        self.reanalyze   = args[REANALYZE]    # whether flows with up-to-date data are analysed
+        self.live        = args[LIVE]         # whether dumps are followed while being captured
+        self.identity    = args[IDENTITY]     # identity of packets: PAYLOAD or HEADER
+        self.payloadLen  = args[PAYLOAD_LEN]  # header identity: number of first bytes of payload
+        self.singleFile  = args[SINGLE_FILE]  # whether data are packed into the container file
+        self.nanoseconds = args[NANOSECONDS]  # whether timestamps are integer nanoseconds
+        self.units       = NS_IN_SEC if self.nanoseconds else 1 # units of timestamps in a second
+        self.msInUnit    = MS_IN_SEC / float(self.units)        # milliseconds in a unit
+
+        if self.live:
+            self.wait_capture_start() # metadata of the testing are saved before capturing starts
 
         self.metadata   = load_metadata(self.inDir) # testing metadata
         self.runtimeSec = self.metadata[RUNTIME  ]  # testing runtime
         self.flows      = self.metadata[ALL_FLOWS]  # total number of flows
 
+        if self.jobs is None:
+            self.jobs = self.flows # live analysis follows all the flows at once by default
+
         layout = self.metadata[SORTED_LAYOUT]
         self.directions = compute_per_flow(DIRECTION, layout) # per flow directions
         self.schemes    = compute_per_flow(SCHEME,    layout) # per flow scheme names
+        self.maxDelays  = self.compute_max_delays(layout)     # per flow max one-way delays
 
         self.senderDumps   = self.compute_dumps_paths(SENDER)   # per flow paths of sender dumps
         self.receiverDumps = self.compute_dumps_paths(RECEIVER) # per flow paths of receiver dumps
 
         self.baseTime = None # timestamp of the earliest packet of all the pcap-files
 
+        self.firstTimes = { }                             # live: per dump first packet's timestamp
+        self.deferred   = [[] for _ in range(self.flows)] # live: packets waiting for base time
+
         self.departures = [{} for _ in range(self.flows)] # packets' timestamps of departures
-        self.arrivals   = [[] for _ in range(self.flows)] # packets' timestamps of arrivals
-        self.delays     = [[] for _ in range(self.flows)] # packets' one-way delays
-        self.sizes      = [[] for _ in range(self.flows)] # packets' sizes in bytes
+
+        self.writers    = [None] * self.flows # writers of packets' arrivals, delays and sizes
 
         self.senderSentBytes   = [0] * self.flows # bytes from sender recorded at sender
         self.senderSentPkts    = [0] * self.flows # packets from sender recorded at sender
@@ -71,6 +181,7 @@ class DumpAnalyzer(object):
         self.allSentPkts       = [0] * self.flows # total packets from sender recorded in both dumps
         self.lostSentBytes     = [0] * self.flows # bytes from sender recorded only at sender
         self.lostSentPkts      = [0] * self.flows # packets from sender recorded only at sender
+        self.droppedPkts       = [0] * self.flows # unmatched departures not left in the table
 
 
     #
@@ -84,25 +195,172 @@ class DumpAnalyzer(object):
         save_metadata(self.outDir, self.metadata)
         self.metadata.clear()
 
-        self.baseTime = self.get_base_time ()
+        if self.live:
+            ProgressBar.INTERACTIVE = False # sizes of dumps are not known until capturing is done
+        else:
+            self.baseTime = self.get_base_time()
+
+        flows = []
 
         for flow in range(0, self.flows):
-            print("\n\033[1m%s scheme, flow %d:\033[0m\n" % (self.schemes[flow], flow + 1)) # bold
+            if not self.reanalyze and not self.live and self.is_flow_up_to_date(flow):
+                print("\n\033[1m%s scheme, flow %d:\033[0m\n" % (self.schemes[flow], flow + 1))
+                print("The data of the flow is up to date, the flow is skipped.")
+                print("==========================================")
+            else:
+                flows.append(flow)
+
+        if self.jobs == 1:
+            for flow in flows:
+                self.analyse_flow(flow)
+        else:
+            self.analyse_flows_in_parallel(flows)
+
+        if self.singleFile:
+            self.pack_data()
+
+
+    #
+    # Method packs the data of all the flows and the metadata into the single container file. The
+    # data files and the manifests of the flows are removed afterwards, so the flows are analysed
+    # again by the next run. The metadata file is kept, as it may be the only metadata of the
+    # testing when the output folder is the folder of the dumps.
+    # throws MetadataError, DataError
+    #
+    def pack_data(self):
+        print("\nPacking the data of %d flows into the single file..." % self.flows)
+
+        pack_container(self.outDir, self.flows, load_metadata(self.outDir))
+
+        for flow in range(0, self.flows):
+            remove_manifest(self.outDir, flow)
+
+
+    #
+    # Method extracts data of one flow from its pair of pcap-files and saves it to the output folder
+    # param [in] flow - flow index
+    # throws AnalysisError, DataError
+    #
+    def analyse_flow(self, flow):
+        print("\n\033[1m%s scheme, flow %d:\033[0m\n" % (self.schemes[flow], flow + 1)) # bold
+
+        remove_manifest(self.outDir, flow)
+
+        senderIp = self.get_sender_ip(flow)
+
+        self.writers[flow] = DataWriter(self.outDir, flow, self.nanoseconds)
+
+        try:
+            if self.engine == PIPELINED:
+                self.analyse_dumps_pipelined(flow, senderIp)
+            elif self.engine == WINDOWED:
+                self.analyse_dumps_windowed(flow, senderIp)
+            elif self.engine == VECTORIZED:
+                self.analyse_dumps_vectorized(flow, senderIp)
+            else:
+                self.analyse_sender_dump  (flow, senderIp)
+                self.analyse_receiver_dump(flow, senderIp)
+
+            if self.live:
+                self.write_deferred_packets(flow)
 
-            senderIp = self.get_sender_ip(flow)
-            self.analyse_sender_dump  (flow, senderIp)
-            self.analyse_receiver_dump(flow, senderIp)
             self.compute_loss(flow)
 
             self.departures[flow].clear()
 
             print("\nSaving the data of the flow to the file...\n")
             self.save_flow_data(flow)
-            print("==========================================")
+        finally:
+            self.writers[flow].discard() # removes temporary files of the writer
+            self.writers[flow] = None
+
+        save_manifest(self.outDir, flow, self.compute_manifest(flow))
+        print("==========================================")
+
+
+    #
+    # Method analyses the flows in a pool of processes. A flow is handed to the pool only if the
+    # memory estimated to be held by the flows being analysed does not exceed the memory limit then,
+    # although a flow is always handed to the pool if no other flows are being analysed. The summary
+    # outputs of the flows are printed in the order of the flows. Each process of the pool analyses
+    # only one flow and exits, so the memory of the flow is returned to OS even for python2.
+    # param [in] flows - indices of the flows to analyse
+    # throws AnalysisError, DataError
+    #
+    def analyse_flows_in_parallel(self, flows):
+        global globalAnalyzer
+        globalAnalyzer = self
+
+        ProgressBar.INTERACTIVE = False
+
+        memory     = dict((flow, 0 if self.memoryLimit is None else self.estimate_flow_memory(flow))
+                          for flow in flows)
+        waiting    = list(flows) # flows not handed to the pool yet
+        running    = { }         # per flow being analysed: its asynchronous result
+        outputs    = { }         # per analysed flow: its summary output
+        heldMemory = 0           # memory estimated to be held by running flows
+        toPrint    = list(flows) # flows whose summaries are not printed yet
+
+        pool = self.start_pool()
+
+        try:
+            while len(toPrint) != 0:
+                while len(waiting) != 0 and len(running) < self.jobs and \
+                      (len(running) == 0 or self.memoryLimit is None or
+                       heldMemory + memory[waiting[0]] <= self.memoryLimit):
+                    flow          = waiting.pop(0)
+                    running[flow] = pool.apply_async(analyse_flow_in_worker, (flow,))
+                    heldMemory   += memory[flow]
+
+                time.sleep(POLL_SEC)
+
+                for flow in [ flow for flow, result in running.items() if result.ready() ]:
+                    outputs[flow] = running.pop(flow).get() # rethrows errors of the flow analysis
+                    heldMemory   -= memory[flow]
 
-            del self.delays  [flow][:] # Immediately frees memory only for python3. For python2 even
-            del self.sizes   [flow][:] # calling gc.collect() directly does not help. The only found
-            del self.arrivals[flow][:] # comment: https://stackoverflow.com/a/35013905/4781940
+                while len(toPrint) != 0 and toPrint[0] in outputs:
+                    sys.stdout.write(outputs.pop(toPrint.pop(0)))
+                    sys.stdout.flush()
+
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
+
+    #
+    # Method starts multiprocessing pool with processes which will analyse flows. The processes
+    # ignore SIGINT so that only the main process handles KeyboardInterrupt.
+    # returns multiprocessing pool
+    #
+    def start_pool(self):
+        originalSigintHandler = signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        pool = Pool(min(self.jobs, self.flows), maxtasksperchild=1)
+
+        signal.signal(signal.SIGINT, originalSigintHandler)
+
+        return pool
+
+
+    #
+    # Method estimates memory held by a process during the analysis of a flow
+    # param [in] flow - flow index
+    # throws AnalysisError
+    # returns the estimated memory in bytes
+    #
+    def estimate_flow_memory(self, flow):
+        try:
+            dumpSize = get_dump_size(self.senderDumps[flow])
+
+            if dumpSize is None:
+                dumpSize = os.stat(self.senderDumps[flow]).st_size * COMPRESSION_RATIO
+        except OSError as error:
+            raise AnalysisError("Failed to read dump %s:\n%s" % (self.senderDumps[flow], error))
+
+        ratio = MEMORY_PER_DUMP_BYTE_COMPACT if self.compact else MEMORY_PER_DUMP_BYTE
+
+        return PROCESS_MEMORY_BYTES + int(dumpSize * ratio)
 
 
     #
@@ -114,11 +372,148 @@ class DumpAnalyzer(object):
         paths = []
 
         for flow, scheme in enumerate(self.schemes, 1):
-            paths.append(os.path.join(self.inDir, "{:d}-{}-{}.pcap".format(flow, scheme, role)))
+            stem = os.path.join(self.inDir, "{:d}-{}-{}".format(flow, scheme, role))
+            paths.append(find_dump(stem))
 
         return paths
 
 
+    #
+    # Method computes per flow maximum one-way delays of packets from sender to receiver. A packet
+    # passes the side link of the sender, the central link and the side link of the receiver, and
+    # on each link, it may wait in the full queue and is delayed by netem. Rates of zero are not
+    # limited, so packets do not wait in queues then.
+    # param [in] layout - the layout
+    # returns array of per flow maximum one-way delays in seconds
+    #
+    def compute_max_delays(self, layout):
+        rate           = self.metadata[RATE]
+        centralQueue   = max(self.metadata[FIRST_QUEUE], self.metadata[SECOND_QUEUE])
+        centralDelayUs = self.metadata[MAX_DELAY] + self.metadata[JITTER]
+        centralMax     = float(centralDelayUs) / US_IN_SEC + \
+                         DumpAnalyzer.queue_delay(centralQueue, rate)
+
+        maxDelays = []
+
+        for entry in layout:
+            leftMax  = float(entry[LEFT_DELAY])  / US_IN_SEC + \
+                       DumpAnalyzer.queue_delay(entry[LEFT_QUEUES],  entry[LEFT_RATE])
+
+            rightMax = float(entry[RIGHT_DELAY]) / US_IN_SEC + \
+                       DumpAnalyzer.queue_delay(entry[RIGHT_QUEUES], entry[RIGHT_RATE])
+
+            maxDelays.extend([leftMax + centralMax + rightMax] * entry[FLOWS])
+
+        return maxDelays
+
+
+    #
+    # Method computes the window of the windowed engine for the flow
+    # param [in] flow - flow index
+    # returns the window in seconds
+    #
+    def compute_window(self, flow):
+        return self.maxDelays[flow] + WINDOW_MARGIN if self.window is None else self.window
+
+
+    #
+    # Method computes the manifest of the flow data: the format version of the data, the base time,
+    # the window of the windowed engine, the identity of packets and the paths, sizes and
+    # modification times of the dumps
+    # param [in] flow - flow index
+    # returns dictionary of the manifest fields
+    #
+    def compute_manifest(self, flow):
+        dumps = []
+
+        for path in [ self.senderDumps[flow], self.receiverDumps[flow] ]:
+            stat = os.stat(path)
+            dumps.append([path, stat.st_size, stat.st_mtime])
+
+        manifest = {
+            VERSION    : FORMAT_VERSION,
+            BASE_TIME  : self.baseTime,
+            WINDOW_SEC : self.compute_window(flow) if self.engine == WINDOWED else None,
+            PACKET_ID  : [ self.identity, self.payloadLen ],
+            TIME_UNITS : self.units,
+            DUMPS      : dumps,
+            DATA_SIZE  : os.stat(self.compute_data_path(flow)).st_size,
+        }
+
+        return manifest
+
+
+    #
+    # Method checks whether the flow data are up to date: the data file was written completely by
+    # the analysis of the same dumps which have not changed since then
+    # param [in] flow - flow index
+    # returns True if the flow data are up to date and False otherwise
+    #
+    def is_flow_up_to_date(self, flow):
+        manifest = load_manifest(self.outDir, flow)
+
+        if manifest is None or not os.path.exists(self.compute_data_path(flow)):
+            return False
+
+        return manifest == self.compute_manifest(flow)
+
+
+    #
+    # Method computes the path of the data file of the flow
+    # param [in] flow - flow index
+    # returns the path
+    #
+    def compute_data_path(self, flow):
+        return os.path.join(self.outDir, "{}-{:d}.{}".format(DATA, flow + 1, BIN))
+
+
+    #
+    # Method computes the time in which the full queue of MTU-sized packets is transmitted
+    # param [in] queue    - size of the queue in packets
+    # param [in] rateMbps - rate in Mbps or zero for the rate not limited
+    # returns the time in seconds
+    #
+    @staticmethod
+    def queue_delay(queue, rateMbps):
+        if not rateMbps:
+            return 0.0
+
+        return float(queue * MAX_PACKET_BYTES * BITS_IN_BYTE) / (rateMbps * BITS_IN_MBIT)
+
+
+    #
+    # Method opens the dump for reading of its packets. In the live mode, the reader follows the
+    # dump while it is being captured.
+    # param [in] path - path of the dump
+    # throws IOError
+    # returns the reader of the dump
+    #
+    def open_dump(self, path):
+        if self.live:
+            return LivePcapReader(path, self.is_capture_done, self.nanoseconds)
+
+        return open_dump(path, self.backend, self.nanoseconds)
+
+
+    #
+    # Method waits until run.py starts capturing of the dumps
+    #
+    def wait_capture_start(self):
+        if load_capture_status(self.inDir) is None:
+            print("Waiting for capturing of the dumps to start...")
+
+        while load_capture_status(self.inDir) is None:
+            time.sleep(POLL_SEC)
+
+
+    #
+    # Method checks whether capturing of the dumps is done
+    # returns True if capturing is done and False otherwise
+    #
+    def is_capture_done(self):
+        return load_capture_status(self.inDir) == DONE
+
+
     #
     # Method gets the minimum of timestamps of the first packets of all dumps to serve as base time
     # throws AnalysisError
@@ -131,8 +526,7 @@ class DumpAnalyzer(object):
             for dumpPath in [self.senderDumps[flow], self.receiverDumps[flow]]:
 
                 try:
-                    with open(dumpPath, 'rb') as dumpFile:
-                        reader = Reader(dumpFile)
+                    with self.open_dump(dumpPath) as reader:
                         try:
                             baseTime = next(iter(reader))[0]
 
@@ -149,6 +543,70 @@ class DumpAnalyzer(object):
         return minBaseTime
 
 
+    #
+    # Method finds the base time during live analysis without waiting for the dumps: the base time
+    # is known once each dump has got its first packet or once capturing is done. The timestamps of
+    # the first packets are remembered, so each dump is read only until it has got one.
+    # throws AnalysisError
+    # returns the base timestamp or None if it is not known yet
+    #
+    def find_base_time(self):
+        done = self.is_capture_done() # the dumps are flushed before capturing is marked done
+
+        for flow in range(0, self.flows):
+            for dumpPath in [self.senderDumps[flow], self.receiverDumps[flow]]:
+                if self.firstTimes.get(dumpPath) is not None:
+                    continue
+
+                try:
+                    self.firstTimes[dumpPath] = read_first_timestamp(dumpPath, self.nanoseconds)
+                except IOError as error:
+                    raise AnalysisError("Failed to read dump %s:\n%s" % (dumpPath, error))
+
+                if self.firstTimes[dumpPath] is None and not done:
+                    return None
+
+        firstTimes = [ first for first in self.firstTimes.values() if first is not None ]
+
+        return min(firstTimes) if len(firstTimes) != 0 else None
+
+
+    #
+    # Method keeps the matched packet until the base time is known during live analysis, as the
+    # first packets of flows starting later are captured only then. The base time is looked for
+    # once per DEFERRED_PACKETS packets kept, and the kept packets are written once it is found.
+    # param [in] flow      - flow to which the packet belongs
+    # param [in] timestamp - timestamp of the packet in receiver's dump
+    # param [in] delay     - one-way delay of the packet
+    # param [in] size      - size of packets in bytes
+    # throws AnalysisError, DataError
+    #
+    def defer_packet(self, flow, timestamp, delay, size):
+        self.deferred[flow].append((timestamp, delay, size))
+
+        if len(self.deferred[flow]) % DEFERRED_PACKETS == 0:
+            self.baseTime = self.find_base_time()
+
+            if self.baseTime is not None:
+                self.write_deferred_packets(flow)
+
+
+    #
+    # Method writes the packets kept until the base time is known during live analysis. When the
+    # dumps are read completely, capturing is done, so the base time is known.
+    # param [in] flow - flow index
+    # throws AnalysisError, DataError
+    #
+    def write_deferred_packets(self, flow):
+        if self.baseTime is None:
+            self.baseTime = self.find_base_time()
+
+        for timestamp, delay, size in self.deferred[flow]:
+            self.writers[flow].append(timestamp - self.baseTime, delay, size)
+
+        self.deferred[flow] = []
+
+
     #
     # Method computes ip address of sender host
     # param [in] flow - flow index
@@ -160,13 +618,11 @@ class DumpAnalyzer(object):
 
         for dumpPath in [self.senderDumps[flow], self.receiverDumps[flow]]:
             try:
-                with open(dumpPath, 'rb') as dumpFile:
-                    reader = Reader(dumpFile)
+                with self.open_dump(dumpPath) as reader:
                     try:
-                        packet   = next(iter(reader))[1]
-                        ip       = Ethernet(packet).data
-                        leftIp   = min(ip.src, ip.dst)
-                        rightIp  = max(ip.src, ip.dst)
+                        src, dst = next(iter(reader))[2:4]
+                        leftIp   = min(src, dst)
+                        rightIp  = max(src, dst)
                         senderIp = leftIp if self.directions[flow] == RIGHTWARD else rightIp
                         break # switch to the next flow
 
@@ -187,17 +643,14 @@ class DumpAnalyzer(object):
     def analyse_sender_dump(self, flow, senderIp):
         bytes    = 0
         packets  = 0
-        progress = ProgressBar("sender   dump", os.stat(self.senderDumps[flow]).st_size)
+        progress = ProgressBar("sender   dump", get_dump_size(self.senderDumps[flow]))
 
         try:
-            with open(self.senderDumps[flow], 'rb') as dump:
-                for timestamp, packet in Reader(dump):
-                    pass
-                    size = len(packet)
-                    ip   = Ethernet(packet).data
-
-                    if ip.src == senderIp:
-                        self.process_sender_sent_packet(flow, timestamp, ip)
+            with self.open_dump(self.senderDumps[flow]) as reader:
+                for timestamp, size, src, _, ipId, protocol, payload in reader:
+                    if src == senderIp:
+                        self.process_sender_sent_packet(flow, timestamp, ipId, protocol,
+                                                        payload)
 
                         self.senderSentBytes[flow] += size
                         self.senderSentPkts [flow] += 1
@@ -224,33 +677,373 @@ class DumpAnalyzer(object):
     def analyse_receiver_dump(self, flow, senderIp):
         bytes    = 0
         packets  = 0
-        progress = ProgressBar("receiver dump", os.stat(self.senderDumps[flow]).st_size)
+        progress = ProgressBar("receiver dump", get_dump_size(self.senderDumps[flow]))
 
         try:
-            with open(self.receiverDumps[flow], 'rb') as dump:
-                for timestamp, packet in Reader(dump):
-                    size = len(packet)
-                    ip   = Ethernet(packet).data
+            with self.open_dump(self.receiverDumps[flow]) as reader:
+                for timestamp, size, src, _, ipId, protocol, payload in reader:
+                    if src == senderIp:
+                        self.process_receiver_sent_packet(flow, timestamp, size, ipId,
+                                                          protocol, payload)
 
-                    if ip.src == senderIp:
-                        self.process_receiver_sent_packet(flow, timestamp, size, ip)
+                        self.receiverSentBytes[flow] += size
+                        self.receiverSentPkts [flow] += 1
+
+                    bytes   += size
+                    packets += 1
+                    progress.update(bytes)
+
+        except IOError as error:
+            raise AnalysisError("Failed to read dump %s:\n%s" % (self.receiverDumps[flow], error))
+
+        progress.finish()
+
+        print("Total: %d pkts/%d bytes, from sender: %d pkts/%d bytes\n" %
+             (packets, bytes, self.receiverSentPkts[flow], self.receiverSentBytes[flow]))
+
+
+    #
+    # Method processes sender's and receiver's dumps simultaneously. A separate process streams
+    # digests and timestamps of packets of sender from sender's dump, while this process reads
+    # receiver's dump. A packet of sender found in receiver's dump waits in the pending queue until
+    # its departure is streamed or until the stream of departures passes the packet's timestamp by
+    # PIPELINE_SLACK seconds -- then the packet is not recorded at sender, as no packet departs
+    # after its arrival. Packets leave the pending queue in their order in receiver's dump.
+    # param [in] flow     - flow index
+    # param [in] senderIp - ip address of sender of the flow
+    # throws AnalysisError
+    #
+    def analyse_dumps_pipelined(self, flow, senderIp):
+        queue   = Queue(QUEUE_BATCHES)
+        process = Process(target=self.stream_sender_dump, args=(flow, senderIp, queue))
+        process.daemon = True
+        process.start()
+
+        stream   = { 'time' : None, 'summary' : None } # state of the stream of departures
+        pending  = deque()                               # receiver's packets waiting for departures
+        bytes    = 0
+        packets  = 0
+        progress = ProgressBar("receiver dump", get_dump_size(self.senderDumps[flow]))
+
+        try:
+            with self.open_dump(self.receiverDumps[flow]) as reader:
+                for timestamp, size, src, _, ipId, protocol, payload in reader:
+                    if src == senderIp:
+                        digest = self.compute_digest(ipId, protocol, payload)
+                        pending.append((digest, timestamp, size))
 
                         self.receiverSentBytes[flow] += size
                         self.receiverSentPkts [flow] += 1
 
+                        self.receive_departures(flow, queue, process, stream,
+                                                len(pending) > MAX_PENDING)
+                        self.resolve_pending(flow, pending, stream)
+
                     bytes   += size
                     packets += 1
                     progress.update(bytes)
 
+            while stream['summary'] is None:
+                self.receive_departures(flow, queue, process, stream, True)
+
+            self.resolve_pending(flow, pending, stream)
+
         except IOError as error:
             raise AnalysisError("Failed to read dump %s:\n%s" % (self.receiverDumps[flow], error))
+        finally:
+            process.terminate()
+            process.join()
+
+        progress.finish()
+
+        print("Total: %d pkts/%d bytes, from sender: %d pkts/%d bytes\n" %
+             (packets, bytes, self.receiverSentPkts[flow], self.receiverSentBytes[flow]))
+
+        senderPackets, senderBytes, duration = stream['summary']
+
+        print("sender   dump: %5.1f%% in %.2fs\n" % (PERCENTS, duration))
+
+        print("Total: %d pkts/%d bytes, from sender: %d pkts/%d bytes\n" %
+             (senderPackets, senderBytes, self.senderSentPkts[flow], self.senderSentBytes[flow]))
+
+
+    #
+    # Method takes batches of departures streamed from sender's dump out of the queue. While
+    # waiting for a message, the streaming process is checked to be alive, so that its death
+    # without the summary of the dump raises the error instead of hanging.
+    # param [in]      flow    - flow index
+    # param [in]      queue   - queue with batches of departures
+    # param [in]      process - the process streaming the departures
+    # param [in, out] stream  - state of the stream: the last departure time and the final summary
+    # param [in]      block   - whether to wait for at least one message in the queue
+    # throws AnalysisError
+    #
+    def receive_departures(self, flow, queue, process, stream, block):
+        while stream['summary'] is None and (block or not queue.empty()):
+            try:
+                kind, message = queue.get(timeout=POLL_SEC)
+            except Empty:
+                if not process.is_alive() and queue.empty():
+                    raise AnalysisError("Process streaming dump %s exited with code %s" %
+                                        (self.senderDumps[flow], process.exitcode))
+                continue
+
+            block = False
+
+            if kind == BATCH:
+                for digest, timestamp in message:
+                    self.add_departure(flow, digest, timestamp)
+
+                if len(message) != 0:
+                    stream['time'] = message[-1][1]
+
+            elif kind == SUMMARY:
+                stream['summary'] = message[:3]
+                self.senderSentPkts [flow] = message[3]
+                self.senderSentBytes[flow] = message[4]
+            else:
+                raise AnalysisError(message)
+
+
+    #
+    # Method matches pending receiver's packets whose departures are streamed or surely absent
+    # param [in]      flow    - flow index
+    # param [in, out] pending - receiver's packets waiting for their departures
+    # param [in]      stream  - state of the stream: the last departure time and the final summary
+    #
+    def resolve_pending(self, flow, pending, stream):
+        slack = PIPELINE_SLACK * self.units
+
+        while len(pending) != 0:
+            digest, timestamp, size = pending[0]
+
+            if digest not in self.departures[flow] and stream['summary'] is None and \
+               (stream['time'] is None or stream['time'] <= timestamp + slack):
+                break
+
+            self.match_departure(flow, digest, timestamp, size)
+            pending.popleft()
+
+
+    #
+    # Method streams digests and timestamps of packets of sender from sender's dump into the queue.
+    # It is run in a separate process.
+    # param [in] flow     - flow index
+    # param [in] senderIp - ip address of sender of the flow
+    # param [in] queue    - queue for batches of departures followed by the summary of the dump
+    #
+    def stream_sender_dump(self, flow, senderIp, queue):
+        startTime = time.time()
+        bytes     = 0
+        packets   = 0
+        sentBytes = 0
+        sentPkts  = 0
+        batch     = []
+
+        try:
+            with self.open_dump(self.senderDumps[flow]) as reader:
+                for timestamp, size, src, _, ipId, protocol, payload in reader:
+                    if src == senderIp:
+                        batch.append((self.compute_digest(ipId, protocol, payload), timestamp))
+
+                        sentBytes += size
+                        sentPkts  += 1
+
+                        if len(batch) == BATCH_PACKETS:
+                            queue.put((BATCH, batch))
+                            batch = []
+
+                    bytes   += size
+                    packets += 1
+
+            queue.put((BATCH, batch))
+            queue.put((SUMMARY, (packets, bytes, time.time() - startTime, sentPkts, sentBytes)))
+
+        except IOError as error:
+            queue.put((ERROR, "Failed to read dump %s:\n%s" % (self.senderDumps[flow], error)))
+        except Exception as error:
+            queue.put((ERROR, "Failed to stream dump %s:\n%s: %s" %
+                              (self.senderDumps[flow], type(error).__name__, error)))
+
+
+    #
+    # Method processes sender's and receiver's dumps in one pass in order of timestamps of packets.
+    # As both dumps are recorded with the same clock, a departure which is older than the maximum
+    # one-way delay of the flow plus margin (or than the chosen window) cannot be matched anymore,
+    # so the departure is removed from the table and counted as lost. Thus, the table holds only the
+    # departures of the recent window instead of all unmatched departures of the flow.
+    # param [in] flow     - flow index
+    # param [in] senderIp - ip address of sender of the flow
+    # throws AnalysisError
+    #
+    def analyse_dumps_windowed(self, flow, senderIp):
+        window        = self.compute_window(flow) * self.units
+        departures    = deque() # timestamps and digests of departures in the table, oldest first
+        totalBytes    = [0, 0]  # bytes of sender's dump and of receiver's dump
+        totalPackets  = [0, 0]  # packets of sender's dump and of receiver's dump
+        dumpSizes     = [ get_dump_size(self.senderDumps[flow]),
+                          get_dump_size(self.receiverDumps[flow]) ]
+        capacity      = None if None in dumpSizes else sum(dumpSizes)
+        progress      = ProgressBar("both dumps   ", capacity)
+
+        try:
+            with self.open_dump(self.senderDumps[flow])   as senderReader, \
+                 self.open_dump(self.receiverDumps[flow]) as receiverReader:
+                senderPackets   = iter(senderReader)
+                receiverPackets = iter(receiverReader)
+                senderPacket    = next(senderPackets,   None)
+                receiverPacket  = next(receiverPackets, None)
+
+                while senderPacket is not None or receiverPacket is not None:
+                    if receiverPacket is None or \
+                       senderPacket is not None and senderPacket[0] <= receiverPacket[0]:
+                        timestamp, size, src, _, ipId, protocol, payload = senderPacket
+                        self.expire_departures(flow, departures, timestamp - window)
+
+                        if src == senderIp:
+                            digest = self.compute_digest(ipId, protocol, payload)
+                            self.add_departure(flow, digest, timestamp)
+                            departures.append((timestamp, digest))
+
+                            self.senderSentBytes[flow] += size
+                            self.senderSentPkts [flow] += 1
+
+                        role         = 0
+                        senderPacket = next(senderPackets, None)
+                    else:
+                        timestamp, size, src, _, ipId, protocol, payload = receiverPacket
+                        self.expire_departures(flow, departures, timestamp - window)
+
+                        if src == senderIp:
+                            self.process_receiver_sent_packet(flow, timestamp, size, ipId,
+                                                              protocol, payload)
+
+                            self.receiverSentBytes[flow] += size
+                            self.receiverSentPkts [flow] += 1
+
+                        role           = 1
+                        receiverPacket = next(receiverPackets, None)
+
+                    totalBytes  [role] += size
+                    totalPackets[role] += 1
+                    progress.update(totalBytes[0] + totalBytes[1])
+
+        except IOError as error:
+            raise AnalysisError("Failed to read dumps %s, %s:\n%s" %
+                                (self.senderDumps[flow], self.receiverDumps[flow], error))
 
         progress.finish()
 
+        print("Sender   dump total: %d pkts/%d bytes, from sender: %d pkts/%d bytes\n" %
+             (totalPackets[0], totalBytes[0],
+              self.senderSentPkts[flow], self.senderSentBytes[flow]))
+
+        print("Receiver dump total: %d pkts/%d bytes, from sender: %d pkts/%d bytes\n" %
+             (totalPackets[1], totalBytes[1],
+              self.receiverSentPkts[flow], self.receiverSentBytes[flow]))
+
+
+    #
+    # Method removes the departures older than the time bound from the table as lost ones
+    # param [in]      flow       - flow index
+    # param [in, out] departures - timestamps and digests of departures in the table, oldest first
+    # param [in]      bound      - the time bound
+    #
+    def expire_departures(self, flow, departures, bound):
+        while len(departures) != 0 and departures[0][0] < bound:
+            timestamp, digest = departures.popleft()
+
+            # the departure may have been already matched or removed as a duplicate
+            if self.departures[flow].get(digest) == timestamp:
+                del self.departures[flow][digest]
+                self.droppedPkts[flow] += 1
+
+
+    #
+    # Method processes sender's and receiver's dumps by reading the digests, timestamps and sizes
+    # of packets of sender into columns and matching the columns with a sort-merge join. The result
+    # is the same as of the per-packet engines, but the matching is done by array operations.
+    # param [in] flow     - flow index
+    # param [in] senderIp - ip address of sender of the flow
+    # throws AnalysisError
+    #
+    def analyse_dumps_vectorized(self, flow, senderIp):
+        digests, timestamps, sizes, packets, bytes = \
+            self.read_dump_columns(self.senderDumps[flow], senderIp, "sender   dump")
+
+        self.senderSentBytes[flow] = int(np.sum(sizes))
+        self.senderSentPkts [flow] = len(sizes)
+
+        tableDigests, tableTimestamps, duplicates = collapse_departures(digests, timestamps)
+
+        for _ in range(duplicates):
+            print("ERROR: Duplicate 64-bit digest of two packets was found!")
+
+        print("Total: %d pkts/%d bytes, from sender: %d pkts/%d bytes\n" %
+             (packets, bytes, self.senderSentPkts[flow], self.senderSentBytes[flow]))
+
+        digests, timestamps, sizes, packets, bytes = \
+            self.read_dump_columns(self.receiverDumps[flow], senderIp, "receiver dump")
+
+        self.receiverSentBytes[flow] = int(np.sum(sizes))
+        self.receiverSentPkts [flow] = len(sizes)
+
+        matched, indices = match_arrivals(tableDigests, digests)
+        arrivals         = timestamps[matched]
+        matchedPkts      = len(arrivals)
+
+        self.writers[flow].extend(arrivals - self.baseTime,
+                                  (arrivals - tableTimestamps[indices]) * self.msInUnit,
+                                  sizes[matched])
+
+        self.phantomBytes[flow] = int(np.sum(sizes[~matched]))
+        self.phantomPkts [flow] = len(sizes) - matchedPkts
+        self.droppedPkts [flow] = len(tableDigests) - matchedPkts
+
         print("Total: %d pkts/%d bytes, from sender: %d pkts/%d bytes\n" %
              (packets, bytes, self.receiverSentPkts[flow], self.receiverSentBytes[flow]))
 
 
+    #
+    # Method reads 64-bit digests, timestamps and sizes of packets of sender from the dump into
+    # columns
+    # param [in] path     - path of the dump
+    # param [in] senderIp - ip address of sender of the flow
+    # param [in] label    - label of the progress bar
+    # throws AnalysisError
+    # returns numpy arrays of digests, timestamps and sizes of packets of sender and the numbers of
+    # all the packets and bytes of the dump
+    #
+    def read_dump_columns(self, path, senderIp, label):
+        digests    = array(INT64_TYPE)
+        timestamps = array(INT64_TYPE if self.nanoseconds else 'd')
+        sizes      = array(INT64_TYPE)
+        bytes      = 0
+        packets    = 0
+        progress   = ProgressBar(label, get_dump_size(path))
+
+        try:
+            with self.open_dump(path) as reader:
+                for timestamp, size, src, _, ipId, protocol, payload in reader:
+                    if src == senderIp:
+                        digests.   append(self.compute_digest(ipId, protocol, payload))
+                        timestamps.append(timestamp)
+                        sizes.     append(size)
+
+                    bytes   += size
+                    packets += 1
+                    progress.update(bytes)
+
+        except IOError as error:
+            raise AnalysisError("Failed to read dump %s:\n%s" % (path, error))
+
+        progress.finish()
+
+        return np.frombuffer(digests,    dtype=np.int64  ), \
+               np.frombuffer(timestamps, dtype=np.int64 if self.nanoseconds else np.float64), \
+               np.frombuffer(sizes,      dtype=np.int64  ), packets, bytes
+
+
     #
     # Method computes the number of bytes/packets sent by sender in total and the number of
     # bytes/packets sent by sender but not recorded at the receiver
@@ -262,7 +1055,7 @@ class DumpAnalyzer(object):
         self.lostSentBytes[flow] = self.allSentBytes[flow]    - self.receiverSentBytes[flow]
         self.lostSentPkts [flow] = self.allSentPkts [flow]    - self.receiverSentPkts [flow]
 
-        assert self.lostSentPkts[flow] == len(self.departures[flow])
+        assert self.lostSentPkts[flow] == len(self.departures[flow]) + self.droppedPkts[flow]
 
         print((u"\u2665 Union of data from sender recorded on both sides: %d pkts/%d bytes" %
                (self.allSentPkts [flow], self.allSentBytes [flow])))
@@ -279,50 +1072,98 @@ class DumpAnalyzer(object):
 
 
     #
-    # Method writes flow data to a log file
+    # Method finishes the data file of the flow
     # param [in] flow - flow index
     # throws DataError
     #
     def save_flow_data(self, flow):
         loss = [self.lostSentBytes[flow], self.allSentBytes[flow]]
 
-        save_data(self.outDir, flow, self.arrivals[flow], self.delays[flow], self.sizes[flow], loss)
+        self.writers[flow].finish(loss)
 
 
     #
     # Method processes packet sent by sender and found in sender's dump
     # param [in] flow      - flow to which the packet belongs
     # param [in] timestamp - timestamp of the packet
-    # param [in] ip        - raw ip payload of the packet
+    # param [in] ipId      - ip id of the packet
+    # param [in] protocol  - ip protocol of the packet
+    # param [in] payload   - raw ip payload of the packet
     #
-    def process_sender_sent_packet(self, flow, timestamp, ip):
-        digest = hashlib.sha1(str(ip.id).encode(UTF8) + bytes(ip.data)).hexdigest()
+    def process_sender_sent_packet(self, flow, timestamp, ipId, protocol, payload):
+        self.add_departure(flow, self.compute_digest(ipId, protocol, payload), timestamp)
+
 
+    #
+    # Method processes packet sent by sender and found in receiver's dump
+    # param [in] flow      - flow to which the packet belongs
+    # param [in] timestamp - timestamp of the packet
+    # param [in] size      - size of packets in bytes
+    # param [in] ipId      - ip id of the packet
+    # param [in] protocol  - ip protocol of the packet
+    # param [in] payload   - raw ip payload of the packet
+    #
+    def process_receiver_sent_packet(self, flow, timestamp, size, ipId, protocol, payload):
+        self.match_departure(flow, self.compute_digest(ipId, protocol, payload), timestamp, size)
+
+
+    #
+    # Method computes the digest identifying the packet in both dumps: either sha1 hex digest or,
+    # in the compact mode, the 64-bit integer of CRC-32 and Adler-32 checksums. The digest is taken
+    # either of ip id and the whole ip payload or of the header-only identity of the packet.
+    # param [in] ipId     - ip id of the packet
+    # param [in] protocol - ip protocol of the packet
+    # param [in] payload  - raw ip payload of the packet
+    # returns the digest of the packet
+    #
+    def compute_digest(self, ipId, protocol, payload):
+        if self.identity == HEADER:
+            head    = header_identity(ipId, protocol, payload, self.payloadLen)
+            payload = b''
+        else:
+            head    = str(ipId).encode(UTF8)
+
+        if self.compact:
+            return digest_64(head, payload)
+
+        digest = hashlib.sha1(head)
+        digest.update(payload)
+
+        return digest.hexdigest()
+
+
+    #
+    # Method remembers the departure of the packet sent by sender
+    # param [in] flow      - flow to which the packet belongs
+    # param [in] digest    - digest of the packet
+    # param [in] timestamp - timestamp of the packet in sender's dump
+    #
+    def add_departure(self, flow, digest, timestamp):
         if digest in self.departures[flow]:
-            print("ERROR: Duplicate sha1 digest of two packets was found!")
+            print("ERROR: Duplicate %s digest of two packets was found!" %
+                  ("64-bit" if self.compact else "sha1"))
             del self.departures[flow][digest]
         else:
             self.departures[flow][digest] = timestamp
 
 
     #
-    # Method processes packet sent by sender and found in receiver's dump
+    # Method matches the packet sent by sender and found in receiver's dump with its departure
     # param [in] flow      - flow to which the packet belongs
-    # param [in] timestamp - timestamp of the packet
+    # param [in] digest    - digest of the packet
+    # param [in] timestamp - timestamp of the packet in receiver's dump
     # param [in] size      - size of packets in bytes
-    # param [in] ip        - raw ip payload of the packet
     #
-    def process_receiver_sent_packet(self, flow, timestamp, size, ip):
-        digest = hashlib.sha1(str(ip.id).encode(UTF8) + bytes(ip.data)).hexdigest()
-
-        if digest in self.departures[flow]:
-            delay = (timestamp - self.departures[flow][digest]) * MS_IN_SEC
+    def match_departure(self, flow, digest, timestamp, size):
+        departure = self.departures[flow].pop(digest, None)
 
-            self.delays[flow].  append(delay)
-            self.arrivals[flow].append(timestamp - self.baseTime)
-            self.sizes[flow].   append(size)
+        if departure is not None:
+            delay = (timestamp - departure) * self.msInUnit
 
-            del self.departures[flow][digest]
+            if self.baseTime is None:
+                self.defer_packet(flow, timestamp, delay, size)
+            else:
+                self.writers[flow].append(timestamp - self.baseTime, delay, size)
         else:
             self.phantomBytes[flow] += size
             self.phantomPkts [flow] += 1
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+import zlib
+import struct
+
+# identities of packets matched in sender's and receiver's dumps
+PAYLOAD    = 'payload' # IP id and the whole IP payload
+HEADER     = 'header'  # IP id and fields of TCP/UDP header, optionally with first bytes of payload
+IDENTITIES = [ PAYLOAD, HEADER ]
+
+TCP              = 6
+UDP              = 17
+IP_ID            = struct.Struct('!H')
+TCP_FIELDS_END   = 12                  # ports, sequence and acknowledgement numbers
+TCP_HDR_LEN      = 20
+TCP_OFFSET_BYTE  = 12                  # the byte of TCP header with data offset in high 4 bits
+TCP_OFFSET_SHIFT = 4
+UDP_HDR_LEN      = 8                   # ports, length, checksum
+OPTION_EOL       = 0
+OPTION_NOP       = 1
+OPTION_TS        = 8
+OPTION_TS_LEN    = 10
+TS_VALUES_LEN    = 8                   # values of timestamp and of echo reply of timestamps option
+ALIGNED_TS       = b'\x01\x01\x08\x0a' # NOP, NOP, timestamps option as laid out by Linux
+WORD_BYTES       = 4
+BYTE             = struct.Struct('B')
+MASK_32          = 0xffffffff          # python2: crc32 and adler32 may be negative
+SIGN_BIT_64      = 1 << 63
+RANGE_64         = 1 << 64
+
+
+#
+# Function builds the header-only identity of the packet: IP id, TCP ports, sequence and
+# acknowledgement numbers and timestamps option or UDP header, followed by the first bytes of the
+# transport payload. The identity does not depend on the captured length of the packet as long as
+# the headers and the chosen bytes of the payload are captured.
+# param [in] ipId       - IP id of the packet
+# param [in] protocol   - IP protocol of the packet
+# param [in] payload    - IP payload of the packet, possibly truncated by the capture
+# param [in] payloadLen - number of the first bytes of the transport payload in the identity
+# returns bytes of the identity
+#
+def header_identity(ipId, protocol, payload, payloadLen):
+    parts = [ IP_ID.pack(ipId), BYTE.pack(protocol) ]
+
+    if protocol == TCP and len(payload) >= TCP_HDR_LEN:
+        headerLen = (BYTE.unpack_from(payload, TCP_OFFSET_BYTE)[0] >> TCP_OFFSET_SHIFT) * WORD_BYTES
+
+        parts.append(payload[:TCP_FIELDS_END])
+        parts.append(find_tcp_timestamps(payload, headerLen))
+    elif protocol == UDP and len(payload) >= UDP_HDR_LEN:
+        headerLen = UDP_HDR_LEN
+
+        parts.append(payload[:UDP_HDR_LEN])
+    else:
+        headerLen = 0
+
+    if payloadLen != 0:
+        parts.append(payload[headerLen:headerLen + payloadLen])
+
+    return b''.join(parts)
+
+
+#
+# Function finds TCP timestamps option in the options of TCP header
+# param [in] payload   - IP payload of the packet starting with TCP header
+# param [in] headerLen - length of TCP header with options
+# returns bytes of the values of the timestamps option or empty bytes if there is no such option
+#
+def find_tcp_timestamps(payload, headerLen):
+    end = min(headerLen, len(payload))
+
+    if end >= TCP_HDR_LEN + len(ALIGNED_TS) + TS_VALUES_LEN and \
+       payload[TCP_HDR_LEN:TCP_HDR_LEN + len(ALIGNED_TS)] == ALIGNED_TS:
+        start = TCP_HDR_LEN + len(ALIGNED_TS)
+        return payload[start:start + TS_VALUES_LEN]
+
+    offset = TCP_HDR_LEN
+
+    while offset < end:
+        kind = BYTE.unpack_from(payload, offset)[0]
+
+        if kind == OPTION_EOL:
+            break
+
+        if kind == OPTION_NOP:
+            offset += 1
+            continue
+
+        if offset + 1 >= end:
+            break
+
+        length = BYTE.unpack_from(payload, offset + 1)[0]
+
+        if length < 2:
+            break
+
+        if kind == OPTION_TS and length == OPTION_TS_LEN and offset + length <= end:
+            return payload[offset + 2:offset + length]
+
+        offset += length
+
+    return b''
+
+
+#
+# Function computes the 64-bit digest of the identity of the packet given in two parts: Adler-32 of
+# the identity in the high half and CRC-32 of it in the low half, as the low bits of the digest
+# select the slot of the dictionary of departures and the low bits of Adler-32 are poorly
+# distributed. Both checksums are computed by zlib in C without allocating a hash object. The digest
+# is not cryptographic, but the packets of a flow are not crafted to collide, and a collision is
+# reported as a duplicate digest.
+# param [in] head - the first part of the identity
+# param [in] tail - the second part of the identity
+# returns the digest as a signed 64-bit integer
+#
+def digest_64(head, tail):
+    crc    = zlib.crc32  (tail, zlib.crc32  (head)) & MASK_32
+    adler  = zlib.adler32(tail, zlib.adler32(head)) & MASK_32
+    digest = (adler << 32) | crc
+
+    return digest - RANGE_64 if digest >= SIGN_BIT_64 else digest
@@ -0,0 +1,780 @@
+#!/usr/bin/env python
+
+import os
+import time
+import mmap
+import zlib
+import gzip
+import struct
+
+from dpkt.pcap import Reader
+from dpkt.ethernet import Ethernet
+from dpkt.ip import IP
+
+try:
+    import lzma
+except ImportError:
+    try:
+        from backports import lzma # python2: optional backports.lzma package
+    except ImportError:
+        lzma = None
+
+try:
+    import zstandard # optional package
+except ImportError:
+    zstandard = None
+
+# errors of decompression of a damaged compressed dump, besides IOError
+DECOMPRESSION_ERRORS = (EOFError, zlib.error) + \
+                       (() if lzma      is None else (lzma.LZMAError,)) + \
+                       (() if zstandard is None else (zstandard.ZstdError,))
+
+MMAP          = 'mmap'
+DPKT          = 'dpkt'
+BACKENDS      = [ MMAP, DPKT ]
+LINKTYPE_ETH  = 1
+ETH_TYPE_IP   = 0x0800
+ETH_HDR_LEN   = 14
+IHL_MASK      = 0x0f
+WORD_BYTES    = 4
+MICRO_DIVISOR = 1E6
+NANO_DIVISOR  = 1E9
+NS_IN_SEC     = 1000000000
+READ_BYTES    = 1 << 20 # stream readers: maximum bytes read from the dump at once
+POLL_SEC      = 0.5     # live reader: period of checking whether the dump has grown
+
+# suffixes of dumps: the format and optionally the compression
+PCAP         = '.pcap'
+PCAPNG       = '.pcapng'
+GZIP         = '.gz'
+XZ           = '.xz'
+ZSTD         = '.zst'
+FORMATS      = [ PCAP, PCAPNG ]
+COMPRESSIONS = [ GZIP, XZ, ZSTD ]
+
+# pcap file header magic numbers as read in little-endian byte order
+MAGICS = {
+    0xa1b2c3d4 : ('<', MICRO_DIVISOR), # little-endian file, microsecond timestamps
+    0xa1b23c4d : ('<', NANO_DIVISOR ), # little-endian file, nanosecond timestamps
+    0xd4c3b2a1 : ('>', MICRO_DIVISOR), # big-endian file, microsecond timestamps
+    0x4d3cb2a1 : ('>', NANO_DIVISOR ), # big-endian file, nanosecond timestamps
+}
+
+MAGIC       = struct.Struct('<I')
+FILE_HDR    = '{}IHHiIII'  # magic, version major/minor, zone, sigfigs, snaplen, linktype
+RECORD_HDR  = '{}IIII'     # seconds, fraction of second, captured length, original length
+ETH_IP_HDR  = struct.Struct('!12xHBxHH3xB2x4s4s') # ethertype, version/ihl, total length, id,
+                                                  # protocol, source and destination addresses
+NON_IP      = (None, None, None, None, None)
+
+# pcapng blocks: section header, interface description, obsolete packet and enhanced packet blocks
+PCAPNG_MAGIC     = 0x0a0d0d0a # type of section header block, the same in both byte orders
+BYTE_ORDER_MAGIC = 0x1a2b3c4d
+BYTE_ORDER_SWAP  = 0x4d3c2b1a # byte-order magic of the section in the other byte order
+IDB_TYPE         = 1
+PB_TYPE          = 2
+EPB_TYPE         = 6
+BLOCK_HDR        = '{}II'     # block type, block total length
+SHB_HDR_SIZE     = 12         # block type, block total length, byte-order magic
+IDB_FIELDS       = '{}HHI'    # link type, reserved, snaplen
+PB_FIELDS        = '{}HHIIII' # interface id, drops, timestamp high/low, captured/original length
+EPB_FIELDS       = '{}IIIII'  # interface id, timestamp high/low, captured/original length
+OPTION_HDR       = '{}HH'     # option code, option length
+IDB_OPTIONS      = 16         # offset of options in interface description block
+PACKET_DATA      = 28         # offset of packet data in packet and enhanced packet blocks
+OPT_ENDOFOPT     = 0
+IF_TSRESOL       = 9          # option of timestamps resolution of interface
+TSRESOL          = struct.Struct('B')
+DEFAULT_TSRESOL  = 6          # microsecond timestamps
+TSRESOL_BINARY   = 0x80       # the resolution is a negative power of two rather than of ten
+
+
+#
+# Custom Exception class for dumps which cannot be memory-mapped and parsed by the built-in reader
+#
+class UnsupportedDumpError(Exception):
+    pass
+
+
+#
+# Function opens the dump for reading of its packets with the chosen backend. Compressed dumps and
+# pcapng dumps are read by the built-in streaming reader. If the built-in memory-mapping reader does
+# not support the dump, dpkt reader is used, unless integer nanosecond timestamps are required,
+# which dpkt cannot provide exactly, then the built-in streaming reader is used.
+# param [in] path        - path of the dump
+# param [in] backend     - MMAP or DPKT
+# param [in] nanoseconds - whether timestamps are integer nanoseconds instead of float seconds
+# throws IOError
+# returns the reader of the dump
+#
+def open_dump(path, backend, nanoseconds=False):
+    compression = get_compression(path)
+
+    if compression is not None:
+        return StreamDumpReader(path, open_decompressed(path, compression), nanoseconds)
+
+    if backend == MMAP:
+        try:
+            return MmapPcapReader(path, nanoseconds)
+        except UnsupportedDumpError:
+            pass
+
+    if nanoseconds or is_pcapng(path):
+        return StreamDumpReader(path, open(path, 'rb'), nanoseconds)
+
+    return DpktPcapReader(path)
+
+
+#
+# Function reads the timestamp of the first packet of the uncompressed dump which may be still being
+# captured. Only the data written so far are read, so the function does not wait for the dump.
+# param [in] path        - path of the dump
+# param [in] nanoseconds - whether the timestamp is integer nanoseconds instead of float seconds
+# throws IOError
+# returns the timestamp or None if the dump has no whole packet yet
+#
+def read_first_timestamp(path, nanoseconds=False):
+    if not os.path.exists(path):
+        return None
+
+    with StreamDumpReader(path, open(path, 'rb'), nanoseconds) as reader:
+        for packet in reader:
+            return packet[0]
+
+    return None
+
+
+#
+# Function finds the dump by the path without suffix: a pcap or pcapng dump, either uncompressed or
+# compressed
+# param [in] stem - path of the dump without suffix
+# returns path of the first existing dump or of the uncompressed pcap dump if there is none
+#
+def find_dump(stem):
+    for format in FORMATS:
+        for compression in [ '' ] + COMPRESSIONS:
+            path = stem + format + compression
+
+            if os.path.exists(path):
+                return path
+
+    return stem + PCAP
+
+
+#
+# Function gets the size of the dump in the uncompressed form
+# param [in] path - path of the dump
+# throws OSError
+# returns the size in bytes or None if the dump is compressed
+#
+def get_dump_size(path):
+    if get_compression(path) is not None:
+        return None
+
+    return os.stat(path).st_size
+
+
+#
+# Function gets the compression of the dump by the suffix of its path
+# param [in] path - path of the dump
+# returns GZIP, XZ, ZSTD or None if the dump is not compressed
+#
+def get_compression(path):
+    for compression in COMPRESSIONS:
+        if path.endswith(compression):
+            return compression
+
+    return None
+
+
+#
+# Function opens the compressed dump for streaming decompression
+# param [in] path        - path of the dump
+# param [in] compression - GZIP, XZ or ZSTD
+# throws IOError
+# returns file object reading the decompressed dump
+#
+def open_decompressed(path, compression):
+    if compression == GZIP:
+        return gzip.open(path, 'rb')
+
+    if compression == XZ:
+        if lzma is None:
+            raise IOError('Reading of %s requires lzma module, for python2 install '
+                          'backports.lzma package' % path)
+
+        return lzma.open(path, 'rb')
+
+    if zstandard is None:
+        raise IOError('Reading of %s requires zstandard package' % path)
+
+    return ZstdFile(path)
+
+
+#
+# Function checks whether the uncompressed dump is in pcapng format
+# param [in] path - path of the dump
+# throws IOError
+# returns True if the dump is in pcapng format and False otherwise
+#
+def is_pcapng(path):
+    with open(path, 'rb') as file:
+        data = file.read(MAGIC.size)
+
+    return len(data) == MAGIC.size and MAGIC.unpack(data)[0] == PCAPNG_MAGIC
+
+
+#
+# Function parses pcap file header
+# param [in] data - the data of the dump beginning with the file header
+# throws UnsupportedDumpError
+# returns struct of the record header, the divisor of the fraction of second in timestamps and
+# the offset of the first record
+#
+def parse_file_header(data):
+    fileHdr = struct.Struct(FILE_HDR.format('<'))
+
+    if len(data) < fileHdr.size:
+        raise UnsupportedDumpError('no pcap file header')
+
+    magic = MAGIC.unpack_from(data, 0)[0]
+
+    if magic not in MAGICS:
+        raise UnsupportedDumpError('unknown magic number %x' % magic)
+
+    order, divisor = MAGICS[magic]
+    linktype       = struct.Struct(FILE_HDR.format(order)).unpack_from(data, 0)[6]
+
+    if linktype != LINKTYPE_ETH:
+        raise UnsupportedDumpError('unsupported link type %d' % linktype)
+
+    return struct.Struct(RECORD_HDR.format(order)), divisor, fileHdr.size
+
+
+#
+# Function decodes the fields of the Ethernet packet needed for the analysis
+# param [in] data      - the data containing the packet
+# param [in] start     - offset of the packet in the data
+# param [in] capLen    - captured length of the packet
+# param [in] origLen   - original length of the packet on the wire
+# param [in] timestamp - timestamp of the packet
+# returns tuple as yielded by the readers
+#
+def decode_packet(data, start, capLen, origLen, timestamp):
+    if capLen < ETH_IP_HDR.size:
+        return (timestamp, origLen) + NON_IP
+
+    ethType, versionIhl, length, ipId, protocol, src, dst = ETH_IP_HDR.unpack_from(data, start)
+
+    if ethType != ETH_TYPE_IP:
+        return (timestamp, origLen) + NON_IP
+
+    end          = start + capLen
+    payloadStart = start + ETH_HDR_LEN + (versionIhl & IHL_MASK) * WORD_BYTES
+    payloadEnd   = end if length == 0 else min(end, start + ETH_HDR_LEN + length)
+
+    return timestamp, origLen, src, dst, ipId, protocol, data[payloadStart:payloadEnd]
+
+
+#
+# Class the instance of which reads packets of a pcap-file with Ethernet link type through a memory
+# map. The record headers are walked with struct and the fields of IP header and the IP payload are
+# read at fixed offsets, the payload being a zero-copy memoryview slice, so no object is built per
+# packet except for the yielded tuple.
+#
+class MmapPcapReader(object):
+    #
+    # Constructor
+    # param [in] path        - path of the dump
+    # param [in] nanoseconds - whether timestamps are integer nanoseconds instead of float seconds
+    # throws IOError, UnsupportedDumpError
+    #
+    def __init__(self, path, nanoseconds=False):
+        self.nanoseconds = nanoseconds
+        self.file        = open(path, 'rb')
+
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, EnvironmentError) as error: # e.g. empty file cannot be mapped
+            self.file.close()
+            raise UnsupportedDumpError(error)
+
+        try:
+            self.view = memoryview(self.map)
+        except TypeError:
+            self.view = self.map # python2: slices of the map are copies of the data
+
+        try:
+            self.recordHdr, self.divisor, self.offset = parse_file_header(self.map)
+        except UnsupportedDumpError:
+            self.close()
+            raise
+
+
+    #
+    # Method iterates over packets of the dump
+    # returns generator of tuples: timestamp, original size, source and destination addresses of IP,
+    # IP id, IP protocol and IP payload -- the last five are None if the packet is not IPv4 one
+    #
+    def __iter__(self):
+        data       = self.view
+        end        = len(self.map)
+        offset     = self.offset
+        divisor    = self.divisor
+        scale      = NS_IN_SEC // int(divisor) # nanoseconds in a unit of the fraction of second
+        nanos      = self.nanoseconds
+        unpackHdr  = self.recordHdr.unpack_from
+        hdrSize    = self.recordHdr.size
+        unpackIp   = ETH_IP_HDR.unpack_from
+        ipHdrsSize = ETH_IP_HDR.size
+
+        while offset + hdrSize <= end:
+            seconds, fraction, capLen, origLen = unpackHdr(data, offset)
+
+            start  = offset + hdrSize
+            offset = start  + capLen
+
+            if offset > end: # the last record was not written completely
+                break
+
+            if nanos:
+                timestamp = seconds * NS_IN_SEC + fraction * scale
+            else:
+                timestamp = seconds + fraction / divisor
+
+            if capLen < ipHdrsSize:
+                yield (timestamp, origLen) + NON_IP
+                continue
+
+            ethType, versionIhl, length, ipId, protocol, src, dst = unpackIp(data, start)
+
+            if ethType != ETH_TYPE_IP:
+                yield (timestamp, origLen) + NON_IP
+                continue
+
+            payloadStart = start + ETH_HDR_LEN + (versionIhl & IHL_MASK) * WORD_BYTES
+            payloadEnd   = offset if length == 0 else min(offset, start + ETH_HDR_LEN + length)
+
+            yield timestamp, origLen, src, dst, ipId, protocol, data[payloadStart:payloadEnd]
+
+
+    #
+    # Method releases the memory map and closes the dump. If payloads of packets are still
+    # referenced, the map is unmapped when the last of them is released.
+    #
+    def close(self):
+        self.view = None
+
+        try:
+            self.map.close()
+        except BufferError:
+            pass
+
+        self.map = None
+        self.file.close()
+
+
+    #
+    # Methods for usage of the reader in with statement
+    #
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+
+#
+# Class the instance of which reads packets of a pcap-file with dpkt, decoding each packet
+#
+class DpktPcapReader(object):
+    #
+    # Constructor
+    # param [in] path - path of the dump
+    # throws IOError
+    #
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+
+
+    #
+    # Method iterates over packets of the dump. The timestamps of nanosecond pcap-files, which dpkt
+    # gives as Decimal, are converted into float seconds as for microsecond ones.
+    # returns generator of tuples: timestamp, original size, source and destination addresses of IP,
+    # IP id, IP protocol and IP payload -- the last five are None if the packet is not IPv4 one
+    #
+    def __iter__(self):
+        for timestamp, packet in Reader(self.file):
+            timestamp = float(timestamp)
+            ip        = Ethernet(packet).data
+
+            if isinstance(ip, IP):
+                size = max(len(packet), ETH_HDR_LEN + ip.len) # dpkt does not give original length
+                yield timestamp, size, ip.src, ip.dst, ip.id, ip.p, bytes(ip.data)
+            else:
+                yield (timestamp, len(packet)) + NON_IP
+
+
+    #
+    # Method closes the dump
+    #
+    def close(self):
+        self.file.close()
+
+
+    #
+    # Methods for usage of the reader in with statement
+    #
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+
+#
+# Class the instance of which reads packets of a pcap or pcapng dump with Ethernet link type from a
+# stream, e.g. from a decompressed dump. The stream is read by chunks and only whole records or
+# blocks are parsed, the tail of a record not read completely yet is kept until the next chunk.
+#
+class StreamDumpReader(object):
+    #
+    # Constructor
+    # param [in] path        - path of the dump
+    # param [in] file        - file object of the stream of the dump
+    # param [in] nanoseconds - whether timestamps are integer nanoseconds instead of float seconds
+    #
+    def __init__(self, path, file, nanoseconds=False):
+        self.path        = path
+        self.file        = file
+        self.nanoseconds = nanoseconds
+        self.offset      = 0    # offset of the first record or block not parsed yet in the data
+        self.parse       = None # method parsing the records or blocks of the dump format
+
+        self.recordHdr = None # pcap: struct of the record header
+        self.divisor   = None # pcap: divisor of the fraction of second in timestamps
+
+        self.blockHdr   = None # pcapng: structs of the blocks of the current section
+        self.idbFields  = None
+        self.pbFields   = None
+        self.epbFields  = None
+        self.optionHdr  = None
+        self.interfaces = None # pcapng: per interface: timestamp units in a second, int and float
+
+
+    #
+    # Method iterates over packets of the dump
+    # throws IOError
+    # returns generator of tuples: timestamp, original size, source and destination addresses of IP,
+    # IP id, IP protocol and IP payload -- the last five are None if the packet is not IPv4 one
+    #
+    def __iter__(self):
+        data = b''
+
+        for chunk in self.read_chunks():
+            data        = data[self.offset:] + chunk
+            self.offset = 0
+
+            if self.parse is None:
+                if len(data) < MAGIC.size:
+                    continue
+
+                if MAGIC.unpack_from(data, 0)[0] == PCAPNG_MAGIC:
+                    self.parse = self.parse_pcapng_blocks
+                else:
+                    self.parse = self.parse_pcap_records
+
+            for packet in self.parse(data):
+                yield packet
+
+
+    #
+    # Method reads the dump by chunks. The errors of decompression of the dump are raised as
+    # IOError.
+    # throws IOError
+    # returns generator of non-empty chunks of the dump
+    #
+    def read_chunks(self):
+        while True:
+            try:
+                chunk = self.file.read(READ_BYTES)
+            except DECOMPRESSION_ERRORS as error:
+                raise IOError('Dump %s is corrupted: %s' % (self.path, error))
+
+            if len(chunk) == 0:
+                break
+
+            yield chunk
+
+
+    #
+    # Method parses the whole records of pcap format in the data
+    # param [in] data - the data of the dump starting at the offset
+    # throws IOError
+    # returns generator of tuples of packets as from __iter__ method
+    #
+    def parse_pcap_records(self, data):
+        if self.recordHdr is None:
+            if len(data) < struct.calcsize(FILE_HDR.format('<')):
+                return # the file header is not read completely yet
+
+            try:
+                self.recordHdr, self.divisor, self.offset = parse_file_header(data)
+            except UnsupportedDumpError as error:
+                raise IOError('Dump %s is not supported: %s' % (self.path, error))
+
+        unpackHdr = self.recordHdr.unpack_from
+        hdrSize   = self.recordHdr.size
+        divisor   = self.divisor
+        scale     = NS_IN_SEC // int(divisor) # nanoseconds in a unit of the fraction of second
+        end       = len(data)
+
+        while self.offset + hdrSize <= end:
+            seconds, fraction, capLen, origLen = unpackHdr(data, self.offset)
+
+            start = self.offset + hdrSize
+
+            if start + capLen > end: # the record is not read completely yet
+                break
+
+            self.offset = start + capLen
+
+            if self.nanoseconds:
+                timestamp = seconds * NS_IN_SEC + fraction * scale
+            else:
+                timestamp = seconds + fraction / divisor
+
+            yield decode_packet(data, start, capLen, origLen, timestamp)
+
+
+    #
+    # Method parses the whole blocks of pcapng format in the data. Packets are taken from enhanced
+    # packet blocks and obsolete packet blocks, the other blocks except for section header and
+    # interface description ones are skipped.
+    # param [in] data - the data of the dump starting at the offset
+    # throws IOError
+    # returns generator of tuples of packets as from __iter__ method
+    #
+    def parse_pcapng_blocks(self, data):
+        end = len(data)
+
+        while self.offset + SHB_HDR_SIZE <= end:
+            offset = self.offset
+
+            if MAGIC.unpack_from(data, offset)[0] == PCAPNG_MAGIC: # a new section may change
+                self.start_pcapng_section(data, offset)           # byte order and interfaces
+
+            blockType, length = self.blockHdr.unpack_from(data, offset)
+
+            if offset + length > end: # the block is not read completely yet
+                break
+
+            self.offset = offset + length
+
+            if blockType == IDB_TYPE:
+                self.add_pcapng_interface(data, offset, length)
+            elif blockType == EPB_TYPE or blockType == PB_TYPE:
+                if blockType == EPB_TYPE:
+                    interface, high, low, capLen, origLen = \
+                        self.epbFields.unpack_from(data, offset + 8)
+                else:
+                    interface, _, high, low, capLen, origLen = \
+                        self.pbFields.unpack_from(data, offset + 8)
+
+                if interface >= len(self.interfaces):
+                    raise IOError('Dump %s has a packet of unknown interface' % self.path)
+
+                units, divisor    = self.interfaces[interface]
+                seconds, fraction = divmod((high << 32) | low, units)
+
+                if self.nanoseconds:
+                    timestamp = seconds * NS_IN_SEC + fraction * NS_IN_SEC // units
+                else:
+                    timestamp = seconds + fraction / divisor
+
+                yield decode_packet(data, offset + PACKET_DATA, capLen, origLen, timestamp)
+
+
+    #
+    # Method starts a section of pcapng dump: gets its byte order and forgets interfaces
+    # param [in] data   - the data of the dump
+    # param [in] offset - offset of the section header block
+    # throws IOError
+    #
+    def start_pcapng_section(self, data, offset):
+        byteOrderMagic = MAGIC.unpack_from(data, offset + 8)[0]
+
+        if byteOrderMagic == BYTE_ORDER_MAGIC:
+            order = '<'
+        elif byteOrderMagic == BYTE_ORDER_SWAP:
+            order = '>'
+        else:
+            raise IOError('Dump %s has a corrupted pcapng section header' % self.path)
+
+        self.blockHdr   = struct.Struct(BLOCK_HDR.format(order))
+        self.idbFields  = struct.Struct(IDB_FIELDS.format(order))
+        self.pbFields   = struct.Struct(PB_FIELDS.format(order))
+        self.epbFields  = struct.Struct(EPB_FIELDS.format(order))
+        self.optionHdr  = struct.Struct(OPTION_HDR.format(order))
+        self.interfaces = []
+
+
+    #
+    # Method adds the interface of the interface description block of pcapng dump
+    # param [in] data   - the data of the dump
+    # param [in] offset - offset of the block
+    # param [in] length - total length of the block
+    # throws IOError
+    #
+    def add_pcapng_interface(self, data, offset, length):
+        linktype = self.idbFields.unpack_from(data, offset + 8)[0]
+
+        if linktype != LINKTYPE_ETH:
+            raise IOError('Dump %s has unsupported link type %d' % (self.path, linktype))
+
+        resolution = DEFAULT_TSRESOL
+        option     = offset + IDB_OPTIONS
+        end        = offset + length - WORD_BYTES # the block ends with its total length
+
+        while option + self.optionHdr.size <= end:
+            code, size = self.optionHdr.unpack_from(data, option)
+
+            if code == OPT_ENDOFOPT:
+                break
+
+            if code == IF_TSRESOL:
+                resolution = TSRESOL.unpack_from(data, option + self.optionHdr.size)[0]
+
+            option += self.optionHdr.size + (size + WORD_BYTES - 1) // WORD_BYTES * WORD_BYTES
+
+        if resolution & TSRESOL_BINARY:
+            units = 2 ** (resolution & ~TSRESOL_BINARY)
+        else:
+            units = 10 ** resolution
+
+        self.interfaces.append((units, float(units)))
+
+
+    #
+    # Method closes the dump
+    #
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+    #
+    # Methods for usage of the reader in with statement
+    #
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+
+#
+# Class the instance of which reads packets of a pcap or pcapng dump while the dump is still being
+# written by tcpdump. When the end of the dump is reached, the reader waits for the dump to grow
+# until capturing is done.
+#
+class LivePcapReader(StreamDumpReader):
+    #
+    # Constructor
+    # param [in] path          - path of the dump
+    # param [in] isCaptureDone - function returning True when the dump is not written anymore
+    # param [in] nanoseconds   - whether timestamps are integer nanoseconds instead of float seconds
+    #
+    def __init__(self, path, isCaptureDone, nanoseconds=False):
+        super(LivePcapReader, self).__init__(path, None, nanoseconds)
+
+        self.isCaptureDone = isCaptureDone
+
+
+    #
+    # Method reads the dump by chunks following its growth. The dump is opened once it is created.
+    # After capturing is done, the dump is read once more to get the data flushed at the end.
+    # throws IOError
+    # returns generator of non-empty chunks of the dump
+    #
+    def read_chunks(self):
+        done = self.isCaptureDone()
+
+        while self.file is None:
+            if os.path.exists(self.path) or done:
+                self.file = open(self.path, 'rb')
+            else:
+                time.sleep(POLL_SEC)
+                done = self.isCaptureDone()
+
+        while True:
+            chunk = self.file.read(READ_BYTES)
+
+            if len(chunk) != 0:
+                yield chunk
+            elif done:
+                break
+            else:
+                done = self.isCaptureDone()
+
+                if not done:
+                    time.sleep(POLL_SEC)
+
+
+#
+# Class the instance of which is a file object decompressing zstd-compressed dump frame by frame.
+# Unlike zstandard stream reader, it raises the error if the last frame of the dump is truncated.
+#
+class ZstdFile(object):
+    #
+    # Constructor
+    # param [in] path - path of the dump
+    # throws IOError
+    #
+    def __init__(self, path):
+        self.path         = path
+        self.file         = open(path, 'rb')
+        self.decompressor = zstandard.ZstdDecompressor().decompressobj()
+        self.started      = False # whether the current frame has got any compressed data
+        self.buffer       = b''   # decompressed data not read yet
+
+
+    #
+    # Method reads decompressed data
+    # param [in] size - maximum number of bytes to read
+    # throws IOError
+    # returns the data, empty at the end of the dump
+    #
+    def read(self, size):
+        while len(self.buffer) < size:
+            chunk = self.file.read(READ_BYTES)
+
+            if len(chunk) == 0:
+                if self.started:
+                    raise IOError('Dump %s is corrupted: the last frame is truncated' % self.path)
+                break
+
+            while len(chunk) != 0:
+                self.started  = True
+                self.buffer  += self.decompressor.decompress(chunk)
+                chunk         = b''
+
+                if self.decompressor.eof: # the next frame may follow
+                    chunk             = self.decompressor.unused_data
+                    self.decompressor = zstandard.ZstdDecompressor().decompressobj()
+                    self.started      = False
+
+        data        = self.buffer[:size]
+        self.buffer = self.buffer[size:]
+
+        return data
+
+
+    #
+    # Method closes the dump
+    #
+    def close(self):
+        self.file.close()
@@ -3,25 +3,34 @@
 import sys
 import time
 
-SECOND   = 1.0
-PERCENTS = 100.0
+SECOND       = 1.0
+PERCENTS     = 100.0
+BYTES_IN_MIB = 1024 * 1024
 
 
 #
 # Class the instance of which is a progress bar
 #
 class ProgressBar(object):
+    #
+    # whether the intermediate states of progress bars are drawn or only the completed state is
+    #
+    INTERACTIVE = True
+
+
     #
     # Constructor
     # param [in] name     - name of the progress bar
-    # param [in] capacity - capacity of the progress bar
+    # param [in] capacity - capacity of the progress bar in bytes or None if it is unknown, e.g.
+    #                       for a compressed dump -- then processed bytes are shown, not percents
     #
     def __init__(self, name, capacity):
         self.name     = name
         self.capacity = capacity
         self.toErase  = 0
 
-        self.draw(0, 0)
+        if ProgressBar.INTERACTIVE:
+            self.draw(self.format_progress(0), 0)
 
         self.startTime = time.time()
         self.lastTime  = self.startTime
@@ -32,10 +41,13 @@ class ProgressBar(object):
     # param [in] value - the current value out of the full capacity
     #
     def update(self, value):
+        if not ProgressBar.INTERACTIVE:
+            return
+
         newTime = time.time()
 
         if newTime - self.lastTime > SECOND:
-            self.draw(float(value) / self.capacity * PERCENTS,  int(newTime - self.startTime))
+            self.draw(self.format_progress(value), int(newTime - self.startTime))
             self.lastTime = newTime
 
 
@@ -43,18 +55,30 @@ class ProgressBar(object):
     # Method completes the progress bar
     #
     def finish(self):
-        self.draw(PERCENTS, time.time() - self.startTime)
+        self.draw('{:5.1f}%'.format(PERCENTS), time.time() - self.startTime)
         sys.stdout.write('\n\n')
         sys.stdout.flush()
 
 
+    #
+    # Method formats the current state of the progress bar
+    # param [in] value - the current value out of the full capacity
+    # returns the progress to print
+    #
+    def format_progress(self, value):
+        if self.capacity is None:
+            return '{:.1f} MiB'.format(float(value) / BYTES_IN_MIB)
+
+        return '{:5.1f}%'.format(float(value) / self.capacity * PERCENTS)
+
+
     #
     # Method prints out the current state of the progress bar to terminal
-    # param [in] percentage - progress to print
-    # param [in] timestamp  - timestamp to print
+    # param [in] progress  - progress to print
+    # param [in] timestamp - timestamp to print
     #
-    def draw(self, percentage, timestamp):
-        toPrint = '{}: {:5.1f}% in {:.2f}s'.format(self.name, percentage, timestamp)
+    def draw(self, progress, timestamp):
+        toPrint = '{}: {} in {:.2f}s'.format(self.name, progress, timestamp).ljust(self.toErase)
 
         sys.stdout.write('\b' * self.toErase)
         sys.stdout.write(toPrint)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+
+#
+# Function collapses the departures of sender's dump into the table of departures sorted by digest.
+# The departures are treated as by the per-packet engines: a departure with the digest already in
+# the table removes the digest from the table, otherwise, it is added to the table. Thus, the
+# digest found an odd number of times remains in the table with the timestamp of its last departure.
+# param [in] digests    - numpy array of 64-bit digests of departures in the order of the dump
+# param [in] timestamps - numpy array of timestamps of departures in the order of the dump
+# returns sorted unique digests in the table, their timestamps of departures and the number of
+# duplicate digests found
+#
+def collapse_departures(digests, timestamps):
+    order  = np.argsort(digests, kind='mergesort') # stable: equal digests stay in the dump order
+    keys   = digests[order]
+
+    if len(keys) == 0:
+        return keys, timestamps[order], 0
+
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    counts = np.diff(np.append(starts, len(keys)))
+    odd    = counts % 2 == 1
+    lasts  = starts + counts - 1
+
+    return keys[starts[odd]], timestamps[order[lasts[odd]]], int(np.sum(counts // 2))
+
+
+#
+# Function matches the packets of sender found in receiver's dump with the table of departures by
+# a sort-merge join. As a departure is matched only once, only the first packet with the digest in
+# receiver's dump can be matched, the others are not recorded at sender.
+# param [in] tableDigests - sorted unique digests in the table of departures
+# param [in] digests      - numpy array of 64-bit digests of packets in the order of the dump
+# returns boolean mask of matched packets and indices of their departures in the table
+#
+def match_arrivals(tableDigests, digests):
+    first = np.zeros(len(digests), dtype=bool)
+    first[np.unique(digests, return_index=True)[1]] = True
+
+    if len(tableDigests) == 0:
+        return np.zeros(len(digests), dtype=bool), np.zeros(0, dtype=np.intp)
+
+    indices = np.searchsorted(tableDigests, digests)
+    indices[indices == len(tableDigests)] = 0
+    matched = first & (tableDigests[indices] == digests)
+
+    return matched, indices[matched]
@@ -0,0 +1,5 @@
+#!/usr/bin/env python
+
+DIRS = 'dirs'
+JOBS = 'jobs'
+KEEP = 'keep'
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+
+import os
+import re
+import sys
+import time
+import signal
+import numpy as np
+from multiprocessing import Pool
+
+from variable_delay.src.data.data import DATA, LOG, BIN, DELAYS_TYPE, DataError
+from variable_delay.src.data.data import load_data, get_duration, load_legacy_data
+from variable_delay.src.data.data import get_legacy_duration
+from variable_delay.src.data.data_writer import save_data
+from variable_delay.src.convert.converter_args import *
+
+POLL_SEC     = 0.1
+BYTES_IN_MIB = 1024 * 1024
+LOG_PATTERN  = re.compile(r'^{}-(\d+)\.{}$'.format(DATA, LOG))
+
+
+#
+# Function converts the data of one flow -- for multiprocessing pool
+# param [in] task - the directory and the flow index
+# throws DataError
+# returns the summary of the conversion of the flow
+#
+def convert_flow_in_worker(task):
+    directory, flow = task
+
+    return DataConverter.convert_flow(directory, flow, DataConverter.KEEP)
+
+
+#
+# Class the instance of which converts the data of flows from the legacy json lines data log files
+# into the binary data files read by the plotting script
+#
+class DataConverter(object):
+    #
+    # whether the legacy data log files are kept after the conversion -- for multiprocessing pool
+    #
+    KEEP = False
+
+
+    #
+    # Constructor
+    # param [in] args - dictionary of the converter arguments
+    #
+    def __init__(self, args):
+        self.dirs = args[DIRS] # full paths of the directories with data files
+        self.jobs = args[JOBS] # number of flows converted in parallel
+        self.keep = args[KEEP] # whether the legacy data log files are kept
+
+        DataConverter.KEEP = self.keep
+
+
+    #
+    # Method converts the flows of all the directories having only legacy data log files. Each flow
+    # is converted by a separate process, the summaries of the flows are printed in the order of the
+    # directories and of the flows.
+    # throws DataError
+    #
+    def convert(self):
+        tasks = [ (directory, flow) for directory in self.dirs
+                                    for flow      in self.find_legacy_flows(directory) ]
+
+        if len(tasks) == 0:
+            print("There are no flows with only legacy data log files.")
+            return
+
+        jobs = min(self.jobs, len(tasks))
+
+        print("Converting %d flows by %d processes...\n" % (len(tasks), jobs))
+
+        pool = self.start_pool(jobs)
+
+        try:
+            results = [ pool.apply_async(convert_flow_in_worker, (task,)) for task in tasks ]
+
+            for result in results:
+                while not result.ready():
+                    time.sleep(POLL_SEC)
+
+                sys.stdout.write(result.get()) # rethrows errors of the conversion of the flow
+                sys.stdout.flush()
+
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
+
+    #
+    # Method finds the flows of the directory which have legacy data log files but no data files
+    # param [in] directory - full path of the directory with data files
+    # returns sorted indices of the flows
+    #
+    @staticmethod
+    def find_legacy_flows(directory):
+        flows = []
+
+        for name in os.listdir(directory):
+            match = LOG_PATTERN.match(name)
+
+            if match is None:
+                continue
+
+            flow = int(match.group(1))
+
+            if not os.path.exists(os.path.join(directory, "{}-{:d}.{}".format(DATA, flow, BIN))):
+                flows.append(flow)
+
+        return sorted(flows)
+
+
+    #
+    # Method starts multiprocessing pool with processes which will convert flows. The processes
+    # ignore SIGINT so that only the main process handles KeyboardInterrupt.
+    # param [in] jobs - number of processes
+    # returns multiprocessing pool
+    #
+    @staticmethod
+    def start_pool(jobs):
+        originalSigintHandler = signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        pool = Pool(jobs, maxtasksperchild=1)
+
+        signal.signal(signal.SIGINT, originalSigintHandler)
+
+        return pool
+
+
+    #
+    # Method converts the data of the flow from the legacy data log file into the binary data file.
+    # The data file is checked against the log file: the durations, the losses, the numbers of
+    # packets and the sums of arrivals, delays and sizes should match. If they do not, the data file
+    # is removed, and the log file is kept anyway.
+    # param [in] directory - full path of the directory with data files
+    # param [in] flow      - flow index
+    # param [in] keep      - whether the legacy data log file is kept
+    # throws DataError
+    # returns the summary of the conversion of the flow
+    #
+    @staticmethod
+    def convert_flow(directory, flow, keep):
+        logPath  = os.path.join(directory, "{}-{:d}.{}".format(DATA, flow, LOG))
+        binPath  = os.path.join(directory, "{}-{:d}.{}".format(DATA, flow, BIN))
+        duration = get_legacy_duration(directory, flow)
+
+        arrivals, delays, sizes, loss = load_legacy_data(directory, flow)
+
+        save_data(directory, flow - 1, arrivals, delays, sizes, loss)
+
+        expected = DataConverter.summarize(duration, arrivals, delays, sizes, loss)
+        del arrivals, delays, sizes
+
+        arrivals, delays, sizes, loss = load_data(directory, flow)
+
+        actual = DataConverter.summarize(get_duration(directory, flow), arrivals, delays, sizes,
+                                         loss)
+        del arrivals, delays, sizes
+
+        if actual != expected:
+            os.remove(binPath)
+            raise DataError('Converted data of the file %s do not match its data:\n%s\n%s' %
+                            (logPath, expected, actual))
+
+        logBytes = os.path.getsize(logPath)
+
+        if not keep:
+            os.remove(logPath)
+
+        return '{} flow {:d}: {:d} packets, {:.1f} MiB -> {:.1f} MiB\n'.format(
+               directory, flow, expected[2], float(logBytes) / BYTES_IN_MIB,
+               float(os.path.getsize(binPath)) / BYTES_IN_MIB)
+
+
+    #
+    # Method summarizes the data of the flow to check the conversion. The arrivals are summed as
+    # they are stored, the delays are summed as they are stored in the data file.
+    # param [in] duration - timestamps of the flow's data first and last arrivals
+    # param [in] arrivals - timestamps of arrivals of the flow's packets
+    # param [in] delays   - one-way delays of the flow's packets
+    # param [in] sizes    - sizes in bytes of the flow's packets
+    # param [in] loss     - the flows's lost bytes number and total sent bytes number
+    # returns list: the duration, the loss, the number of packets and the sums
+    #
+    @staticmethod
+    def summarize(duration, arrivals, delays, sizes, loss):
+        return [ list(duration),
+                 [ int(value) for value in loss ],
+                 len(arrivals),
+                 float(np.sum(np.asarray(arrivals, dtype=np.float64))),
+                 float(np.sum(np.asarray(delays, dtype=DELAYS_TYPE).astype(np.float64))),
+                 int(np.sum(np.asarray(sizes, dtype=np.int64))) ]
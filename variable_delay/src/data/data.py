@@ -2,9 +2,60 @@
 
 import os
 import json
+import struct
+import numpy as np
+
+from variable_delay.src.metadata.metadata import load_metadata, METADATA_NAME
+from variable_delay.src.data.data_fields import ARRIVALS, DELAYS, SIZES
+from variable_delay.src.data.slot_pyramid import find_level, SLOT_COLUMNS
+from variable_delay.src.data.delay_sketch import DelaySketch, SKETCH_COLUMNS
 
 DATA = 'data'
-LOG  = 'log'
+LOG  = 'log' # legacy format of data files: JSON lines
+BIN  = 'bin' # binary columnar format of data files
+
+FORMAT_VERSION = 2 # version of the format of data files, increased when the format changes
+
+MAGIC           = b'CCBDATA\x00'
+CONTAINER_MAGIC = b'CCBEXPT\x00'
+PREAMBLE        = struct.Struct('<8sII') # magic, format version, length of the JSON header
+ALIGNMENT       = 8                      # columns start at offsets aligned for memory mapping
+ARRIVALS_TYPE   = '<f8'                  # seconds since the earliest packet of all the dumps
+ARRIVALS_NS     = '<i8'                  # nanoseconds since the earliest packet of all the dumps
+NS_IN_SEC       = 1000000000
+DELAYS_TYPE     = '<f4'                  # milliseconds
+SIZES_TYPE      = '<u2'                  # bytes
+WIDE_SIZES_TYPE = '<u4'                  # bytes, if some packet is longer than 65535 bytes
+MAX_SIZE        = 0xFFFF                 # maximal size fitting into SIZES_TYPE
+INDEX_PACKETS   = 4096                   # number of packets per entry of the time index
+LEGACY_LINES    = 5                      # duration, loss, arrivals, delays, sizes
+
+# header fields
+DURATION = 'duration' # timestamps of the first and last arrivals
+LOSS     = 'loss'     # the flow's lost bytes number and the flow's total sent bytes number
+COLUMNS  = 'columns'  # per column: its type, offset from the start of the columns and length
+DTYPE    = 'dtype'
+OFFSET   = 'offset'
+COUNT    = 'count'
+PYRAMID  = 'pyramid'  # base slot, factor and number of levels of the pyramid of slotted data
+SLOT     = 'slot'
+FACTOR   = 'factor'
+LEVELS   = 'levels'
+SLOTS    = 'slots'    # prefix of names of the columns of the pyramid
+INDEX    = 'index'    # name of the column of the time index: arrivals of every STEP-th packet
+STEP     = 'step'     # number of packets per entry of the time index
+UNITS    = 'units'    # units of integer arrivals in a second, the duration is still in seconds
+SKETCH   = 'sketch'   # accuracy, sum, minimum and maximum of the quantile sketch of delays, also
+ACCURACY = 'accuracy' # prefix of names of the columns of the sketch
+SUM      = 'sum'
+MIN      = 'min'
+MAX      = 'max'
+
+# container header fields
+METADATA = 'metadata' # metadata of the testing
+FLOWS    = 'flows'    # per flow: the header of its data as in a data file, offsets are in the file
+
+containerHeaders = { } # per path of the container file: its size, modification time and header
 
 
 #
@@ -15,46 +66,440 @@ class DataError(Exception):
 
 
 #
-# Function writes flow data to a log file.
-# param [in] directory - output directory to which the data should be saved
+# Function reads flow's data first and last arrivals.
+# param [in] directory - input directory containing the data file
+# param [in] flow      - flow index
+# returns timestamps of flow's data first and last arrivals
+# throws DataError
+#
+def get_duration(directory, flow):
+    found = find_flow(directory, flow)
+
+    if found is None:
+        return get_legacy_duration(directory, flow)
+
+    _, header, _ = found
+
+    return header[DURATION]
+
+
+#
+# Function reads flow's data from the data file. The columns are not read into memory but are
+# mapped to it, so only the pages actually accessed are read from the disk.
+# param [in] directory - input directory containing the data file
+# param [in] flow      - flow index
+# returns timestamps of arrivals of the flow's packets, one-way delays of the flow's packets,
+# sizes in bytes of the flow's packets, the flows's lost bytes number and total sent bytes number
+# throws DataError
+#
+def load_data(directory, flow):
+    found = find_flow(directory, flow)
+
+    if found is None:
+        return load_legacy_data(directory, flow)
+
+    filePath, header, start = found
+
+    arrivals = map_column(filePath, header, start, ARRIVALS)
+    delays   = map_column(filePath, header, start, DELAYS  )
+    sizes    = map_column(filePath, header, start, SIZES   )
+
+    return arrivals, delays, sizes, header[LOSS]
+
+
+#
+# Function reads arrival timestamps and delays of the flow's packets from the data file.
+# param [in] directory - input directory containing the data file
+# param [in] flow      - flow index
+# returns timestamps of arrivals of the flow's packets, one-way delays of the flow's packets
+# throws DataError
+#
+def load_delays(directory, flow):
+    found = find_flow(directory, flow)
+
+    if found is None:
+        return load_legacy_delays(directory, flow)
+
+    filePath, header, start = found
+
+    arrivals = map_column(filePath, header, start, ARRIVALS)
+    delays   = map_column(filePath, header, start, DELAYS  )
+
+    return arrivals, delays
+
+
+#
+# Function reads flow's data of the packets arrived within the time range. The packets are found
+# by the time index of the data file, so only the pages of the range are read from the disk.
+# param [in] directory - input directory containing the data file
+# param [in] flow      - flow index
+# param [in] fromSec   - start of the range in seconds or None for the start of the flow
+# param [in] toSec     - end of the range in seconds, not included, or None for the end of the flow
+# returns timestamps of arrivals of the flow's packets, one-way delays of the flow's packets,
+# sizes in bytes of the flow's packets, the flows's lost bytes number and total sent bytes number
+# throws DataError
+#
+def load_range(directory, flow, fromSec, toSec):
+    return load_flow(directory, flow, fromSec, toSec)[:4]
+
+
+#
+# Function reads flow's data of the packets arrived within the time range together with the first
+# and last arrivals of the whole flow, so that the data file is read only once.
+# param [in] directory - input directory containing the data file
+# param [in] flow      - flow index
+# param [in] fromSec   - start of the range in seconds or None for the start of the flow
+# param [in] toSec     - end of the range in seconds, not included, or None for the end of the flow
+# returns timestamps of arrivals of the flow's packets, one-way delays of the flow's packets,
+# sizes in bytes of the flow's packets, the flows's lost bytes number and total sent bytes number,
+# timestamps of flow's data first and last arrivals
+# throws DataError
+#
+def load_flow(directory, flow, fromSec, toSec):
+    found = find_flow(directory, flow)
+
+    if found is None:
+        duration, loss, arrivals, delays, sizes = load_legacy_log(directory, flow)
+        first, last = find_range(np.asarray(arrivals), None, None, fromSec, toSec)
+
+        return arrivals[first:last], delays[first:last], sizes[first:last], loss, duration
+
+    filePath, header, start = found
+
+    arrivals = map_column(filePath, header, start, ARRIVALS)
+    index    = None
+    step     = None
+
+    if INDEX in header[COLUMNS]:
+        index = np.array(map_column(filePath, header, start, INDEX)) # small, read at once
+        step  = header[STEP]
+
+    bounds = [ fromSec, toSec ]
+
+    if UNITS in header: # the bounds are compared with integer arrivals exactly
+        bounds = [ None if bound is None else int(round(bound * header[UNITS]))
+                   for bound in bounds ]
+
+    first, last = find_range(arrivals, index, step, bounds[0], bounds[1])
+
+    delays = map_column(filePath, header, start, DELAYS)
+    sizes  = map_column(filePath, header, start, SIZES )
+
+    return arrivals[first:last], delays[first:last], sizes[first:last], header[LOSS], \
+        header[DURATION]
+
+
+#
+# Function converts timestamps of arrivals of the flow's packets to float seconds. The arrivals of
+# the data files are float seconds or integer nanoseconds.
+# param [in] arrivals - timestamps of arrivals of the flow's packets
+# returns numpy array of the timestamps in seconds
+#
+def to_seconds(arrivals):
+    arrivals = np.asarray(arrivals)
+
+    if is_integer_time(arrivals):
+        return arrivals / float(NS_IN_SEC)
+
+    return arrivals
+
+
+#
+# Function checks whether timestamps of arrivals of the flow's packets are integer nanoseconds
+# param [in] arrivals - numpy array of timestamps of arrivals of the flow's packets
+# returns True if the timestamps are integer nanoseconds and False if they are float seconds
+#
+def is_integer_time(arrivals):
+    return np.issubdtype(arrivals.dtype, np.integer)
+
+
+#
+# Function finds the positions of the first packet arrived within the time range and of the first
+# packet arrived after it
+# param [in] arrivals - timestamps of arrivals of the flow's packets in order of arrival
+# param [in] index    - arrivals of every step-th packet or None if there is no time index
+# param [in] step     - number of packets per entry of the time index
+# param [in] fromSec  - start of the range in the units of the arrivals or None for the start
+# param [in] toSec    - end of the range in the units of the arrivals, not included, or None for
+#                       the end
+# returns the positions
+#
+def find_range(arrivals, index, step, fromSec, toSec):
+    first = 0             if fromSec is None else find_arrival(arrivals, index, step, fromSec)
+    last  = len(arrivals) if toSec   is None else find_arrival(arrivals, index, step, toSec  )
+
+    return first, max(first, last)
+
+
+#
+# Function finds the position of the first packet arrived not earlier than the time. The time
+# index narrows the search down to the packets of one entry of the index.
+# param [in] arrivals - timestamps of arrivals of the flow's packets in order of arrival
+# param [in] index    - arrivals of every step-th packet or None if there is no time index
+# param [in] step     - number of packets per entry of the time index
+# param [in] time     - the time in the units of the arrivals
+# returns the position
+#
+def find_arrival(arrivals, index, step, time):
+    if index is None:
+        return int(np.searchsorted(arrivals, time))
+
+    begin = max(int(np.searchsorted(index, time)) - 1, 0) * step
+    end   = min(begin + step, len(arrivals))
+
+    return begin + int(np.searchsorted(arrivals[begin:end], time))
+
+
+#
+# Function reads flow's data slotted per the interval from the pyramid of slotted data, if the
+# interval and the bounds of the time range are multiples of the slot of some level of the pyramid.
+# The pyramid is used only for integer arrivals, which both the pyramid and the per-packet slotting
+# slot exactly. A float arrival at the bound of slots may be put by int(arrival / interval) into
+# another slot than the pyramid puts it into, so the float arrivals are slotted per packet.
+# param [in] directory - input directory containing the data file
+# param [in] flow      - flow index
+# param [in] slotSec   - float interval in seconds per which data are slotted
+# param [in] fromSec   - start of the range in seconds or None for the start of the flow
+# param [in] toSec     - end of the range in seconds, not included, or None for the end of the flow
+# returns ids of the slots of the level with packets, numbers of packets, sums of delays and sums
+# of bytes of the packets in the slots, the flows's lost bytes number and total sent bytes number
+# and the number of the slots of the level per interval or None if the pyramid cannot be used
+# throws DataError
+#
+def load_slots(directory, flow, slotSec, fromSec, toSec):
+    found = find_flow(directory, flow)
+
+    if found is None:
+        return None
+
+    filePath, header, start = found
+
+    if PYRAMID not in header or UNITS not in header:
+        return None
+
+    pyramid = header[PYRAMID]
+    bounds  = [ bound for bound in [ fromSec, toSec ] if bound is not None ]
+    found   = find_level(slotSec, bounds, pyramid[SLOT], pyramid[FACTOR], pyramid[LEVELS])
+
+    if found is None:
+        return None
+
+    level, multiple = found
+
+    columns = [ map_column(filePath, header, start, slot_column_name(level, name))
+                for name, _ in SLOT_COLUMNS ]
+
+    levelSlotSec = slotSec / multiple
+    slotIds      = columns[0]
+    first        = 0            if fromSec is None else \
+                   int(np.searchsorted(slotIds, int(round(fromSec / levelSlotSec))))
+    last         = len(slotIds) if toSec   is None else \
+                   int(np.searchsorted(slotIds, int(round(toSec   / levelSlotSec))))
+
+    return [ column[first:max(first, last)] for column in columns ] + [ header[LOSS], multiple ]
+
+
+#
+# Function reads the quantile sketch of one-way delays of the flow's packets from the data file
+# param [in] directory - input directory containing the data file
+# param [in] flow      - flow index
+# returns the sketch or None if the data file has no sketch
+# throws DataError
+#
+def load_sketch(directory, flow):
+    found = find_flow(directory, flow)
+
+    if found is None:
+        return None
+
+    filePath, header, start = found
+
+    if SKETCH not in header:
+        return None
+
+    fields  = header[SKETCH]
+    columns = [ map_column(filePath, header, start, sketch_column_name(name))
+                for name, _ in SKETCH_COLUMNS ]
+
+    sketch = DelaySketch(fields[ACCURACY])
+    sketch.set_columns(columns[0], columns[1], fields[SUM], fields[MIN], fields[MAX])
+
+    return sketch
+
+
+#
+# Function finds the data of the flow: either in the flow's data file or in the container file of
+# the data of all the flows of the testing
+# param [in] directory - input directory containing the data file or the container file
 # param [in] flow      - flow index
-# param [in] arrivals  - timestamps of arrivals of the flow's packets
-# param [in] delays    - one-way delays of the flow's packets
-# param [in] sizes     - sizes in bytes of the flow's packets
-# param [in] loss      - list: [the flows's lost bytes number, the flow's total sent bytes number]
+# returns full path of the file, the header of the flow's data and the offset of the start of the
+# columns in the file or None if there are only legacy data log files
+# throws DataError
+#
+def find_flow(directory, flow):
+    filePath = os.path.join(directory, "{}-{:d}.{}".format(DATA, flow, BIN))
+
+    if os.path.exists(filePath):
+        header, start = read_header(filePath, MAGIC)
+        return filePath, header, start
+
+    containerPath = os.path.join(directory, "{}.{}".format(DATA, BIN))
+
+    if os.path.exists(containerPath):
+        header, start = read_container_header(containerPath)
+
+        if not 1 <= flow <= len(header[FLOWS]):
+            raise DataError('There is no flow %d in the file %s' % (flow, containerPath))
+
+        return containerPath, header[FLOWS][flow - 1], start
+
+    return None
+
+
+#
+# Function reads the metadata of the testing from the container file if there is one
+# param [in] directory - input directory containing the container file
+# returns the metadata or None if there is no container file
 # throws DataError
 #
-def save_data(directory, flow, arrivals, delays, sizes, loss):
-    filePath = os.path.join(directory, "{}-{:d}.{}".format(DATA, flow + 1, LOG))
+def load_container_metadata(directory):
+    containerPath = os.path.join(directory, "{}.{}".format(DATA, BIN))
+
+    if not os.path.exists(containerPath):
+        return None
+
+    header, _ = read_container_header(containerPath)
+
+    return header[METADATA]
+
+
+#
+# Function loads the metadata of the testing: from the metadata file, or from the container file if
+# the data were packed into the single file and there is no metadata file
+# param [in] directory - input directory containing the data files
+# returns the metadata
+# throws MetadataError, DataError
+#
+def load_testing_metadata(directory):
+    metadata = None
+
+    if not os.path.exists(os.path.join(directory, METADATA_NAME)):
+        metadata = load_container_metadata(directory)
 
-    duration = [None, None] if len(arrivals) == 0 else [arrivals[0], arrivals[-1]]
+    if metadata is None:
+        metadata = load_metadata(directory)
 
+    return metadata
+
+
+#
+# Function reads the header of the container file. The header is read once and is kept until the
+# file changes, as the header holds the table of contents of all the flows.
+# param [in] containerPath - full path of the container file
+# returns the header and the offset of the start of the columns in the file
+# throws DataError
+#
+def read_container_header(containerPath):
     try:
-        # file.write(json.dumps(data)) requires extra memory but is about two times faster than
-        # json.dump(data, file). So, here, speed is chosen over memory consumption.
-        with open(filePath, 'w') as file:
-            file.write(json.dumps(duration))
-            file.write('\n')
-            file.write(json.dumps(loss))
-            file.write('\n')
-            file.write(json.dumps(arrivals))
-            file.write('\n')
-            file.write(json.dumps(delays))
-            file.write('\n')
-            file.write(json.dumps(sizes))
-            file.write('\n')
-    except IOError as error:
-        raise DataError('Failed to write flow\'s data to the file %s:\n%s' % (filePath, error))
+        stat = os.stat(containerPath)
+    except OSError as error:
+        raise DataError('Failed to read the file %s:\n%s' % (containerPath, error))
+
+    cached = containerHeaders.get(containerPath)
+
+    if cached is None or cached[0] != (stat.st_size, stat.st_mtime):
+        cached = ((stat.st_size, stat.st_mtime), read_header(containerPath, CONTAINER_MAGIC))
+        containerHeaders[containerPath] = cached
+
+    return cached[1]
 
 
 #
-# Function reads flow's data first and last arrivals.
+# Function gets the name of the column of the pyramid of slotted data
+# param [in] level - level of the pyramid
+# param [in] name  - name of the column of the level
+# returns the name of the column in the data file
+#
+def slot_column_name(level, name):
+    return '{}-{:d}-{}'.format(SLOTS, level, name)
+
+
+#
+# Function gets the name of the column of the quantile sketch of delays
+# param [in] name - name of the column of the sketch
+# returns the name of the column in the data file
+#
+def sketch_column_name(name):
+    return '{}-{}'.format(SKETCH, name)
+
+
+#
+# Function reads the header of the binary data file or of the container file.
+# param [in] filePath - full path of the file
+# param [in] magic    - the expected magic bytes of the file
+# returns the header and the offset of the start of the columns in the file
+# throws DataError
+#
+def read_header(filePath, magic):
+    try:
+        with open(filePath, 'rb') as file:
+            fileMagic, version, headerLen = PREAMBLE.unpack(file.read(PREAMBLE.size))
+
+            if fileMagic != magic:
+                raise DataError('File %s is not a data file of the expected kind' % filePath)
+
+            if version != FORMAT_VERSION:
+                raise DataError('File %s has unsupported format version %d' % (filePath, version))
+
+            header = json.loads(file.read(headerLen).decode('ascii'))
+
+    except (IOError, struct.error, ValueError) as error:
+        raise DataError('Failed to read flow\'s data header from the file %s:\n%s' %
+                        (filePath, error))
+
+    return header, align(PREAMBLE.size + headerLen)
+
+
+#
+# Function maps the column of the binary data file to memory.
+# param [in] filePath - full path of the data file
+# param [in] header   - the header of the data file
+# param [in] start    - offset of the start of the columns in the file
+# param [in] name     - name of the column
+# returns read-only numpy array of the column
+# throws DataError
+#
+def map_column(filePath, header, start, name):
+    column = header[COLUMNS][name]
+
+    if column[COUNT] == 0:
+        return np.zeros(0, dtype=column[DTYPE]) # an empty region cannot be mapped
+
+    try:
+        return np.memmap(filePath, dtype=column[DTYPE], mode='r', offset=start + column[OFFSET],
+                         shape=(column[COUNT],))
+
+    except (IOError, ValueError) as error:
+        raise DataError('Failed to map flow\'s %s from the file %s:\n%s' % (name, filePath, error))
+
+
+#
+# Function rounds the offset up to the alignment of the columns
+# param [in] offset - offset in bytes
+# returns the aligned offset
+#
+def align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+#
+# Function reads flow's data first and last arrivals from the legacy JSON lines data log file.
 # param [in] directory - input directory containing the log file
 # param [in] flow      - flow index
 # returns timestamps of flow's data first and last arrivals
 # throws DataError
 #
-def get_duration(directory, flow):
+def get_legacy_duration(directory, flow):
     filePath = os.path.join(directory, "{}-{:d}.{}".format(DATA, flow, LOG))
 
     try:
@@ -68,38 +513,48 @@ def get_duration(directory, flow):
 
 
 #
-# Function reads flow's data from the data log file.
+# Function reads flow's data from the legacy JSON lines data log file.
 # param [in] directory - input directory containing the log file
 # param [in] flow      - flow index
 # returns timestamps of arrivals of the flow's packets, one-way delays of the flow's packets,
 # sizes in bytes of the flow's packets, the flows's lost bytes number and total sent bytes number
 # throws DataError
 #
-def load_data(directory, flow):
+def load_legacy_data(directory, flow):
+    _, loss, arrivals, delays, sizes = load_legacy_log(directory, flow)
+
+    return arrivals, delays, sizes, loss
+
+
+#
+# Function reads all the lines of the legacy JSON lines data log file.
+# param [in] directory - input directory containing the log file
+# param [in] flow      - flow index
+# returns timestamps of flow's data first and last arrivals, the flows's lost bytes number and total
+# sent bytes number, timestamps of arrivals of the flow's packets, one-way delays of the flow's
+# packets, sizes in bytes of the flow's packets
+# throws DataError
+#
+def load_legacy_log(directory, flow):
     filePath = os.path.join(directory, "{}-{:d}.{}".format(DATA, flow, LOG))
 
     try:
         with open(filePath, 'r') as file:
-            _        = json.loads(next(file))
-            loss     = json.loads(next(file))
-            arrivals = json.loads(next(file))
-            delays   = json.loads(next(file))
-            sizes    = json.loads(next(file))
-
-            return arrivals, delays, sizes, loss
+            return [ json.loads(next(file)) for _ in range(LEGACY_LINES) ]
 
     except IOError as error:
         raise DataError('Failed to read flow\'s data from the file %s:\n%s' % (filePath, error))
 
 
 #
-# Function reads arrival timestamps and delays of the flow's packets from the data log file.
+# Function reads arrival timestamps and delays of the flow's packets from the legacy JSON lines
+# data log file.
 # param [in] directory - input directory containing the log file
 # param [in] flow      - flow index
 # returns timestamps of arrivals of the flow's packets, one-way delays of the flow's packets
 # throws DataError
 #
-def load_delays(directory, flow):
+def load_legacy_delays(directory, flow):
     filePath = os.path.join(directory, "{}-{:d}.{}".format(DATA, flow, LOG))
 
     try:
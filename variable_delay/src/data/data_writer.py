@@ -0,0 +1,426 @@
+#!/usr/bin/env python
+
+import os
+import json
+import shutil
+import numpy as np
+from array import array
+
+from variable_delay.src.data.data_fields import ARRIVALS, DELAYS, SIZES
+from variable_delay.src.data.data import DATA, BIN, FORMAT_VERSION, MAGIC, PREAMBLE, DataError
+from variable_delay.src.data.data import ARRIVALS_TYPE, DELAYS_TYPE, SIZES_TYPE, WIDE_SIZES_TYPE
+from variable_delay.src.data.data import MAX_SIZE, DURATION, LOSS, COLUMNS, DTYPE, OFFSET, COUNT
+from variable_delay.src.data.data import PYRAMID, SLOT, FACTOR, LEVELS, align, slot_column_name
+from variable_delay.src.data.data import INDEX, STEP, INDEX_PACKETS
+from variable_delay.src.data.data import CONTAINER_MAGIC, METADATA, FLOWS, read_header
+from variable_delay.src.data.data import ARRIVALS_NS, NS_IN_SEC, UNITS
+from variable_delay.src.data.data import SKETCH, ACCURACY, SUM, MIN, MAX, sketch_column_name
+from variable_delay.src.data.slot_pyramid import SlotPyramid, SLOT_COLUMNS
+from variable_delay.src.data.slot_pyramid import PYRAMID_SLOT_SEC, PYRAMID_FACTOR, PYRAMID_LEVELS
+from variable_delay.src.data.delay_sketch import DelaySketch, SKETCH_COLUMNS
+
+BLOCK_PACKETS = 65536   # number of packets buffered before they are written to the disk
+COPY_VALUES   = 1048576 # number of values of a column copied at once into the data file
+SPILL_SIZES   = '<u4'   # sizes are spilled wide, as the longest packet is known only in the end
+COPY_BYTES    = 8388608 # number of bytes of flow data copied at once into the container file
+TEMP          = 'tmp'
+
+# types of the buffers of the packets: arrays of C doubles and unsigned ints instead of lists of
+# python objects, so a buffered value takes 4-8 bytes instead of ~32 bytes
+ARRIVALS_BUFFER = 'd'
+DELAYS_BUFFER   = 'd' # delays are rounded to DELAYS_TYPE only when written, as numpy rounds them
+SIZES_BUFFER    = 'I'
+
+try:
+    array('q')
+    ARRIVALS_NS_BUFFER = 'q' # python3: signed 64-bit integer
+except ValueError:
+    ARRIVALS_NS_BUFFER = 'l' # python2: signed long which is 64-bit on 64-bit Linux
+
+
+#
+# Function writes flow data to a binary data file at once.
+# param [in] directory - output directory to which the data should be saved
+# param [in] flow      - flow index
+# param [in] arrivals  - timestamps of arrivals of the flow's packets
+# param [in] delays    - one-way delays of the flow's packets
+# param [in] sizes     - sizes in bytes of the flow's packets
+# param [in] loss      - list: [the flows's lost bytes number, the flow's total sent bytes number]
+# throws DataError
+#
+def save_data(directory, flow, arrivals, delays, sizes, loss):
+    writer = DataWriter(directory, flow)
+
+    try:
+        writer.extend(arrivals, delays, sizes)
+        writer.finish(loss)
+    finally:
+        writer.discard()
+
+
+#
+# Function packs the data files of all the flows of the testing into the single container file.
+# The container file starts with a JSON header with the metadata of the testing and with the headers
+# of the flows' data followed by the columns of the flows one after another, copied from the data
+# files as they are. The offsets of the columns in the headers are moved to the columns of the
+# container, so the columns are mapped to memory in the same way as from the data files. The
+# container file is written under a temporary name and renamed afterwards, and the data files of
+# the flows are removed only after that.
+# param [in] directory - output directory containing the data files of the flows
+# param [in] flows     - total number of flows
+# param [in] metadata  - metadata of the testing
+# throws DataError
+#
+def pack_container(directory, flows, metadata):
+    filePath  = os.path.join(directory, "{}.{}".format(DATA, BIN))
+    tempPath  = '{}.{}'.format(filePath, TEMP)
+    flowPaths = [ os.path.join(directory, "{}-{:d}.{}".format(DATA, flow + 1, BIN))
+                  for flow in range(flows) ]
+    headers   = []
+    regions   = [] # per flow: the offset and the size of the columns in the data file
+    offset    = 0
+
+    for flowPath in flowPaths:
+        header, start = read_header(flowPath, MAGIC)
+        size          = os.path.getsize(flowPath) - start
+
+        for column in header[COLUMNS].values():
+            column[OFFSET] += offset
+
+        headers.append(header)
+        regions.append((start, size))
+        offset += size
+
+    try:
+        with open(tempPath, 'wb') as file:
+            headerBytes = json.dumps({ METADATA: metadata, FLOWS: headers },
+                                     sort_keys=True).encode('ascii')
+
+            file.write(PREAMBLE.pack(CONTAINER_MAGIC, FORMAT_VERSION, len(headerBytes)))
+            file.write(headerBytes)
+            file.write(b'\0' * (align(file.tell()) - file.tell()))
+
+            for flowPath, (start, size) in zip(flowPaths, regions):
+                with open(flowPath, 'rb') as flowFile:
+                    flowFile.seek(start)
+                    shutil.copyfileobj(flowFile, file, COPY_BYTES)
+
+        os.rename(tempPath, filePath)
+
+        for flowPath in flowPaths:
+            os.remove(flowPath)
+
+    except (IOError, OSError) as error:
+        if os.path.exists(tempPath):
+            os.remove(tempPath)
+
+        raise DataError('Failed to write the data of the flows to the file %s:\n%s' %
+                        (filePath, error))
+
+
+#
+# Class the instance of which writes flow data to a binary data file while the flow is analysed.
+# The data file starts with a small JSON header with the duration and loss of the flow followed by
+# the typed columns of arrivals, delays and sizes, by the time index of arrivals of every
+# INDEX_PACKETS-th packet, by the columns of the pyramid of the flow's data slotted per the slots of
+# its levels and by the columns of the quantile sketch of delays. The packets are buffered in blocks
+# in typed arrays, and each full block is appended to temporary files, one per column, together with
+# the closed slots of the pyramid. When the flow is finished, the data file is assembled from the
+# header and from the temporary files copied piece by piece. Thus, the memory held by the writer
+# does not depend on the length of the flow, as the sketch is bounded by the number of its buckets.
+#
+class DataWriter(object):
+    #
+    # Constructor
+    # param [in] directory   - output directory to which the data should be saved
+    # param [in] flow        - flow index
+    # param [in] nanoseconds - whether arrivals are integer nanoseconds instead of float seconds
+    # throws DataError
+    #
+    def __init__(self, directory, flow, nanoseconds=False):
+        self.filePath   = os.path.join(directory, "{}-{:d}.{}".format(DATA, flow + 1, BIN))
+        self.units      = NS_IN_SEC if nanoseconds else 1 # units of arrivals in a second
+        self.timeType   = ARRIVALS_NS        if nanoseconds else ARRIVALS_TYPE   # arrivals type
+        self.timeBuffer = ARRIVALS_NS_BUFFER if nanoseconds else ARRIVALS_BUFFER # and its buffer
+        self.arrivals   = array(self.timeBuffer)  # buffered timestamps of arrivals of the packets
+        self.delays     = array(DELAYS_BUFFER)    # buffered one-way delays of the packets
+        self.sizes      = array(SIZES_BUFFER)     # buffered sizes in bytes of the packets
+        self.first      = None                    # timestamp of the first arrival in seconds
+        self.last       = None                    # timestamp of the last arrival in seconds
+        self.maxSize    = 0                       # size of the longest packet
+        self.pyramid    = SlotPyramid()           # pyramid of the slotted data of the flow
+        self.spills     = []                      # temporary files of the packets' columns
+        self.index      = None                    # temporary file of the time index
+        self.levels     = []                      # per level: temporary files of pyramid columns
+        self.sketch     = DelaySketch()           # quantile sketch of delays of the flow
+        self.sketches   = []                      # temporary files of the sketch columns
+
+        try:
+            for name, dtype in [ (ARRIVALS, self.timeType),
+                                 (DELAYS,   DELAYS_TYPE  ),
+                                 (SIZES,    SPILL_SIZES  ) ]:
+                self.spills.append(ColumnSpill(self.filePath, name, dtype))
+
+            self.index = ColumnSpill(self.filePath, INDEX, self.timeType)
+
+            for level in range(PYRAMID_LEVELS):
+                self.levels.append([])
+
+                for name, dtype in SLOT_COLUMNS:
+                    spill = ColumnSpill(self.filePath, slot_column_name(level, name), dtype)
+                    self.levels[level].append(spill)
+
+            for name, dtype in SKETCH_COLUMNS:
+                self.sketches.append(ColumnSpill(self.filePath, sketch_column_name(name), dtype))
+
+        except IOError as error:
+            self.discard()
+            raise DataError('Failed to create temporary files for the file %s:\n%s' %
+                            (self.filePath, error))
+
+
+    #
+    # Method adds the packet to the flow data
+    # param [in] arrival - timestamp of arrival of the packet
+    # param [in] delay   - one-way delay of the packet
+    # param [in] size    - size in bytes of the packet
+    # throws DataError
+    #
+    def append(self, arrival, delay, size):
+        self.arrivals.append(arrival)
+        self.delays.  append(delay)
+        self.sizes.   append(size)
+
+        if len(self.arrivals) == BLOCK_PACKETS:
+            self.flush()
+
+
+    #
+    # Method adds the packets to the flow data
+    # param [in] arrivals - timestamps of arrivals of the packets
+    # param [in] delays   - one-way delays of the packets
+    # param [in] sizes    - sizes in bytes of the packets
+    # throws DataError
+    #
+    def extend(self, arrivals, delays, sizes):
+        self.flush()
+        self.write_block(arrivals, delays, sizes)
+
+
+    #
+    # Method writes the buffered packets to the temporary files
+    # throws DataError
+    #
+    def flush(self):
+        arrivals = np.frombuffer(self.arrivals, dtype=self.timeType) if self.arrivals else []
+        delays   = np.frombuffer(self.delays,   dtype=np.float64   ) if self.delays   else []
+        sizes    = np.frombuffer(self.sizes,    dtype=np.uintc     ) if self.sizes    else []
+
+        self.write_block(arrivals, delays, sizes)
+
+        # the buffers are replaced, as they cannot be resized while numpy arrays are their views
+        self.arrivals = array(self.timeBuffer)
+        self.delays   = array(DELAYS_BUFFER)
+        self.sizes    = array(SIZES_BUFFER)
+
+
+    #
+    # Method writes the block of packets to the temporary files
+    # param [in] arrivals - timestamps of arrivals of the packets
+    # param [in] delays   - one-way delays of the packets
+    # param [in] sizes    - sizes in bytes of the packets
+    # throws DataError
+    #
+    def write_block(self, arrivals, delays, sizes):
+        if len(arrivals) == 0:
+            return
+
+        arrivals = np.asarray(arrivals, dtype=self.timeType)
+        delays   = np.asarray(delays,   dtype=DELAYS_TYPE  )
+        sizes    = np.asarray(sizes,    dtype=SPILL_SIZES  )
+
+        if self.first is None:
+            self.first = float(arrivals[0]) / self.units
+
+        self.last    = float(arrivals[-1]) / self.units
+        self.maxSize = max(self.maxSize, int(sizes.max()))
+
+        try:
+            # the index holds arrivals of the packets at positions multiple of INDEX_PACKETS
+            self.index.append(arrivals[-self.spills[0].count % INDEX_PACKETS::INDEX_PACKETS])
+
+            for spill, column in zip(self.spills, [ arrivals, delays, sizes ]):
+                spill.append(column)
+
+            self.write_slots(self.pyramid.add(arrivals, delays, sizes))
+
+            self.sketch.add(delays)
+
+        except IOError as error:
+            raise DataError('Failed to write flow\'s data to temporary files for the file %s:\n%s'
+                            % (self.filePath, error))
+
+
+    #
+    # Method appends the closed slots of the pyramid to the temporary files
+    # param [in] closed - per level: the list of blocks of closed slots
+    # throws IOError
+    #
+    def write_slots(self, closed):
+        for spills, blocks in zip(self.levels, closed):
+            for slots in blocks:
+                for spill, column in zip(spills, slots):
+                    spill.append(column)
+
+
+    #
+    # Method finishes the flow data and assembles the data file. The file is written under a
+    # temporary name and renamed afterwards, so that the data file is never left incomplete.
+    # param [in] loss - list: [the flows's lost bytes number, the flow's total sent bytes number]
+    # throws DataError
+    #
+    def finish(self, loss):
+        self.flush()
+
+        tempPath = '{}.{}'.format(self.filePath, TEMP)
+
+        try:
+            self.write_slots(self.pyramid.finish())
+
+            sizesType = SIZES_TYPE if self.maxSize <= MAX_SIZE else WIDE_SIZES_TYPE
+            columns   = list(zip(self.spills, [ self.timeType, DELAYS_TYPE, sizesType ]))
+            columns.append((self.index, self.timeType))
+
+            for spills in self.levels:
+                columns.extend((spill, spill.dtype) for spill in spills)
+
+            for spill, column in zip(self.sketches, self.sketch.get_columns()):
+                spill.append(column)
+                columns.append((spill, spill.dtype))
+
+            with open(tempPath, 'wb') as file:
+                headerBytes = self.make_header(columns, loss)
+
+                file.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(headerBytes)))
+                file.write(headerBytes)
+                file.write(b'\0' * (align(file.tell()) - file.tell()))
+
+                for spill, dtype in columns:
+                    spill.copy_to(file, dtype)
+
+            os.rename(tempPath, self.filePath)
+
+        except (IOError, OSError) as error:
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+
+            raise DataError('Failed to write flow\'s data to the file %s:\n%s' %
+                            (self.filePath, error))
+
+
+    #
+    # Method makes the header of the data file
+    # param [in] columns - temporary files of the columns and the types of the columns in the file
+    # param [in] loss    - list: [the flows's lost bytes number, the flow's total sent bytes number]
+    # returns bytes of the header
+    #
+    def make_header(self, columns, loss):
+        header = { DURATION: [ self.first, self.last ],
+                   LOSS    : [ int(value) for value in loss ],
+                   COLUMNS : { },
+                   STEP    : INDEX_PACKETS,
+                   PYRAMID : { SLOT  : PYRAMID_SLOT_SEC,
+                               FACTOR: PYRAMID_FACTOR,
+                               LEVELS: PYRAMID_LEVELS } }
+        offset = 0
+
+        if self.units != 1:
+            header[UNITS] = self.units
+
+        header[SKETCH] = { ACCURACY: self.sketch.accuracy,
+                           SUM     : self.sketch.sum,
+                           MIN     : self.sketch.min,
+                           MAX     : self.sketch.max }
+
+        for spill, dtype in columns:
+            nbytes = spill.count * np.dtype(dtype).itemsize
+
+            header[COLUMNS][spill.name] = { DTYPE: dtype, OFFSET: offset, COUNT: spill.count }
+            offset                     += align(nbytes)
+
+        return json.dumps(header, sort_keys=True).encode('ascii')
+
+
+    #
+    # Method removes the temporary files of the flow data. It is called after the data file is
+    # written or when the analysis of the flow has failed.
+    #
+    def discard(self):
+        for spill in self.spills + [ spill for spills in self.levels for spill in spills ] + \
+                     self.sketches:
+            spill.remove()
+
+        if self.index is not None:
+            self.index.remove()
+
+        self.spills   = []
+        self.index    = None
+        self.levels   = []
+        self.sketches = []
+
+
+#
+# Class the instance of which is a temporary file to which the values of a column are appended
+#
+class ColumnSpill(object):
+    #
+    # Constructor
+    # param [in] filePath - full path of the data file
+    # param [in] name     - name of the column
+    # param [in] dtype    - type of the values of the column
+    # throws IOError
+    #
+    def __init__(self, filePath, name, dtype):
+        self.name  = name                                    # name of the column
+        self.dtype = dtype                                   # type of the values
+        self.path  = '{}.{}.{}'.format(filePath, name, TEMP) # path of the temporary file
+        self.file  = open(self.path, 'wb')                   # the temporary file
+        self.count = 0                                       # number of the values
+
+
+    #
+    # Method appends the values to the temporary file
+    # param [in] values - numpy array of the values
+    # throws IOError
+    #
+    def append(self, values):
+        np.asarray(values, dtype=self.dtype).tofile(self.file)
+        self.count += len(values)
+
+
+    #
+    # Method copies the values from the temporary file to the data file piece by piece and pads
+    # them up to the alignment of the columns
+    # param [in] file  - the data file
+    # param [in] dtype - type of the values of the column in the data file
+    # throws IOError
+    #
+    def copy_to(self, file, dtype):
+        self.file.close()
+
+        with open(self.path, 'rb') as spill:
+            for _ in range(0, self.count, COPY_VALUES):
+                np.fromfile(spill, dtype=self.dtype, count=COPY_VALUES).astype(dtype).tofile(file)
+
+        nbytes = self.count * np.dtype(dtype).itemsize
+        file.write(b'\0' * (align(nbytes) - nbytes))
+
+
+    #
+    # Method closes and removes the temporary file
+    #
+    def remove(self):
+        self.file.close()
+
+        if os.path.exists(self.path):
+            os.remove(self.path)
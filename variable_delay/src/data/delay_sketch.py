@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+
+import math
+import numpy as np
+
+SKETCH_ACCURACY = 0.0001 # relative accuracy of the quantiles of delays
+MIN_DELAY_MS    = 0.001  # smaller delays are counted in the bucket of this delay
+
+# columns of the sketch: only the buckets with delays are stored
+SKETCH_IDS     = 'ids'    # ids of the buckets
+SKETCH_COUNTS  = 'counts' # numbers of delays in the buckets
+SKETCH_COLUMNS = [ (SKETCH_IDS,    '<i4'),
+                   (SKETCH_COUNTS, '<u8') ]
+
+
+#
+# Class the instance of which is a mergeable quantile sketch of one-way delays of packets: the
+# histogram of delays over logarithmic buckets, the bucket with id i holding the delays in
+# (gamma^(i-1), gamma^i], where gamma = (1 + accuracy) / (1 - accuracy). Any quantile is estimated
+# with the relative error not exceeding the accuracy, and the sketches of several flows are merged
+# by adding the numbers of delays in the same buckets. The sum, minimum and maximum of delays are
+# kept exactly.
+#
+class DelaySketch(object):
+    #
+    # Constructor
+    # param [in] accuracy - relative accuracy of the quantiles
+    #
+    def __init__(self, accuracy=SKETCH_ACCURACY):
+        self.accuracy = accuracy                                       # relative accuracy
+        self.logGamma = math.log((1.0 + accuracy) / (1.0 - accuracy)) # log of the bucket ratio
+        self.counts   = { }                                            # per bucket id: delays
+        self.count    = 0                                              # number of delays
+        self.sum      = 0.0                                            # sum of delays
+        self.min      = None                                           # minimal delay
+        self.max      = None                                           # maximal delay
+
+
+    #
+    # Method adds the delays to the sketch
+    # param [in] delays - numpy array of one-way delays in milliseconds
+    #
+    def add(self, delays):
+        if len(delays) == 0:
+            return
+
+        delays = np.asarray(delays, dtype=np.float64)
+        ids    = np.ceil(np.log(np.maximum(delays, MIN_DELAY_MS)) / self.logGamma).astype(np.int64)
+
+        ids, counts = np.unique(ids, return_counts=True)
+
+        for bucket, count in zip(ids.tolist(), counts.tolist()):
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+
+        self.update(len(delays), float(np.sum(delays)), float(delays.min()), float(delays.max()))
+
+
+    #
+    # Method adds the delays of the other sketch to the sketch
+    # param [in] other - the other sketch of the same accuracy
+    #
+    def merge(self, other):
+        assert other.accuracy == self.accuracy
+
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+
+        if other.count != 0:
+            self.update(other.count, other.sum, other.min, other.max)
+
+
+    #
+    # Method updates the number, the sum, the minimum and the maximum of delays of the sketch
+    # param [in] count   - number of the added delays
+    # param [in] total   - sum of the added delays
+    # param [in] minimum - minimal added delay
+    # param [in] maximum - maximal added delay
+    #
+    def update(self, count, total, minimum, maximum):
+        self.count += count
+        self.sum   += total
+        self.min    = minimum if self.min is None else min(self.min, minimum)
+        self.max    = maximum if self.max is None else max(self.max, maximum)
+
+
+    #
+    # Method estimates the quantile of delays. The delay of the rank nearest to the quantile is
+    # chosen, as numpy.percentile with interpolation 'nearest' does.
+    # param [in] quantile - the quantile from 0 to 1
+    # returns the estimated delay or None if the sketch is empty
+    #
+    def get_quantile(self, quantile):
+        if self.count == 0:
+            return None
+
+        rank  = int(np.around(quantile * (self.count - 1)))
+        below = 0
+
+        for bucket in sorted(self.counts):
+            below += self.counts[bucket]
+
+            if below > rank:
+                break
+
+        value = 2.0 * math.exp(bucket * self.logGamma) / (1.0 + math.exp(self.logGamma))
+
+        return min(max(value, self.min), self.max)
+
+
+    #
+    # Method gets the average delay
+    # returns the average delay or None if the sketch is empty
+    #
+    def get_average(self):
+        if self.count == 0:
+            return None
+
+        return self.sum / self.count
+
+
+    #
+    # Method gets the columns of the sketch to be saved
+    # returns the list of SKETCH_COLUMNS
+    #
+    def get_columns(self):
+        buckets = sorted(self.counts)
+
+        return [ np.array(buckets,                                       dtype=np.int64 ),
+                 np.array([ self.counts[bucket] for bucket in buckets ], dtype=np.uint64) ]
+
+
+    #
+    # Method sets the sketch from the saved columns
+    # param [in] ids     - ids of the buckets with delays
+    # param [in] counts  - numbers of delays in the buckets
+    # param [in] total   - sum of delays
+    # param [in] minimum - minimal delay or None if there are no delays
+    # param [in] maximum - maximal delay or None if there are no delays
+    #
+    def set_columns(self, ids, counts, total, minimum, maximum):
+        self.counts = dict(zip(ids.tolist(), counts.tolist()))
+        self.count  = 0
+        self.sum    = 0.0
+        self.min    = None
+        self.max    = None
+
+        if len(self.counts) != 0:
+            self.update(sum(self.counts.values()), total, minimum, maximum)
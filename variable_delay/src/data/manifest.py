@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+import os
+import json
+
+from variable_delay.src.data.data import DATA, FORMAT_VERSION, DataError
+
+MANIFEST = 'manifest'
+
+# manifest fields
+VERSION    = 'version'   # version of the format of the data file
+BASE_TIME  = 'base-time' # timestamp of the earliest packet of all the dumps
+WINDOW_SEC = 'window'    # window of the windowed engine in seconds or None
+PACKET_ID  = 'identity'  # identity of packets and number of first bytes of payload in it
+DUMPS      = 'dumps'     # paths, sizes and modification times of the sender and receiver dumps
+DATA_SIZE  = 'data-size' # size of the data file in bytes
+TIME_UNITS = 'units'     # units of timestamps in a second: 1 for float seconds or nanoseconds
+
+
+#
+# Function writes the manifest of the flow data: the description of the dumps and the analysis which
+# the data file was produced from. The manifest is written only after the data file is written
+# completely, and it is written to a temporary file renamed afterwards, so that an interrupted run
+# never leaves a manifest of incomplete data.
+# param [in] directory - output directory to which the manifest should be saved
+# param [in] flow      - flow index
+# param [in] manifest  - dictionary of the manifest fields
+# throws DataError
+#
+def save_manifest(directory, flow, manifest):
+    filePath = os.path.join(directory, "{}-{:d}.{}".format(DATA, flow + 1, MANIFEST))
+    tempPath = filePath + '.tmp'
+
+    try:
+        with open(tempPath, 'w') as file:
+            json.dump(manifest, file, sort_keys=True)
+
+        os.rename(tempPath, filePath)
+    except (IOError, OSError) as error:
+        raise DataError('Failed to write flow\'s manifest to the file %s:\n%s' % (filePath, error))
+
+
+#
+# Function reads the manifest of the flow data
+# param [in] directory - input directory containing the manifest
+# param [in] flow      - flow index
+# returns dictionary of the manifest fields or None if there is no valid manifest
+#
+def load_manifest(directory, flow):
+    filePath = os.path.join(directory, "{}-{:d}.{}".format(DATA, flow + 1, MANIFEST))
+
+    try:
+        with open(filePath, 'r') as file:
+            return json.load(file)
+    except (IOError, ValueError):
+        return None
+
+
+#
+# Function removes the manifest of the flow data if there is one
+# param [in] directory - output directory containing the manifest
+# param [in] flow      - flow index
+#
+def remove_manifest(directory, flow):
+    filePath = os.path.join(directory, "{}-{:d}.{}".format(DATA, flow + 1, MANIFEST))
+
+    if os.path.exists(filePath):
+        os.remove(filePath)
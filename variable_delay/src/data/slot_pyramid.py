@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+
+import numpy as np
+
+PYRAMID_SLOT_SEC = 0.001   # slot of the base level of the pyramid in seconds
+PYRAMID_SLOT_NS  = 1000000 # slot of the base level of the pyramid in nanoseconds
+PYRAMID_FACTOR   = 10      # ratio of slots of the neighbouring levels
+PYRAMID_LEVELS   = 4       # levels of 1 ms, 10 ms, 100 ms and 1 s slots
+TOLERANCE        = 1e-9    # relative tolerance of an interval being a multiple of a slot
+
+# per level columns of the pyramid: only the slots with packets are stored
+SLOT_IDS     = 'ids'     # ids of the slots
+SLOT_PACKETS = 'packets' # numbers of packets arrived in the slots
+SLOT_DELAYS  = 'delays'  # sums of one-way delays of packets arrived in the slots
+SLOT_BYTES   = 'bytes'   # sums of sizes of packets arrived in the slots
+SLOT_COLUMNS = [ (SLOT_IDS,     '<u4'),
+                 (SLOT_PACKETS, '<u4'),
+                 (SLOT_DELAYS,  '<f8'),
+                 (SLOT_BYTES,   '<u8') ]
+
+
+#
+# Class the instance of which builds the pyramid of slotted data of the flow block by block of the
+# flow's packets: the numbers of packets, the sums of delays and the sums of bytes of the packets
+# arrived per base slot, with each next level summing PYRAMID_FACTOR slots of the previous level.
+# The last slot of each level is kept open as the next block may add to it, the other slots are
+# closed and handed out to be written. The delays of the packets of a slot are summed in the order
+# of the packets, as the per-packet slotting of the plotting script does.
+#
+class SlotPyramid(object):
+    #
+    # Constructor
+    #
+    def __init__(self):
+        self.openSlots = [ None ] * PYRAMID_LEVELS # per level: the last slot or None
+
+
+    #
+    # Method adds the block of the flow's packets to the pyramid
+    # param [in] arrivals - numpy array of timestamps of arrivals of the packets: float seconds or
+    #                       integer nanoseconds
+    # param [in] delays   - numpy array of one-way delays of the packets
+    # param [in] sizes    - numpy array of sizes in bytes of the packets
+    # returns per level: the list of blocks of closed slots, each is the list of SLOT_COLUMNS
+    #
+    def add(self, arrivals, delays, sizes):
+        closed = [ [] for _ in range(PYRAMID_LEVELS) ]
+
+        if np.issubdtype(arrivals.dtype, np.integer):
+            slotIds = arrivals // PYRAMID_SLOT_NS # exact
+        else:
+            slotIds = (arrivals / PYRAMID_SLOT_SEC).astype(np.int64) # truncated as by int()
+
+        self.push(0, [ slotIds, np.ones(len(slotIds), dtype=np.int64),
+                       delays.astype(np.float64), sizes.astype(np.int64) ], closed)
+
+        return closed
+
+
+    #
+    # Method closes the open slots of all the levels
+    # returns per level: the list of blocks of closed slots, each is the list of SLOT_COLUMNS
+    #
+    def finish(self):
+        closed = [ [] for _ in range(PYRAMID_LEVELS) ]
+
+        for level in range(PYRAMID_LEVELS):
+            if self.openSlots[level] is None:
+                continue
+
+            slots                 = [ np.array([ value ]) for value in self.openSlots[level] ]
+            self.openSlots[level] = None
+            closed[level].append(slots)
+
+            if level + 1 < PYRAMID_LEVELS:
+                self.push(level + 1, [ slots[0] // PYRAMID_FACTOR ] + slots[1:], closed)
+
+        return closed
+
+
+    #
+    # Method sums the packets or the slots of the previous level into the slots of the level
+    # param [in]      level   - level of the pyramid
+    # param [in]      columns - slot ids, numbers of packets, sums of delays and sums of bytes
+    # param [in, out] closed  - per level: the list of blocks of closed slots
+    #
+    def push(self, level, columns, closed):
+        if self.openSlots[level] is not None:
+            columns = [ np.concatenate(([ value ], column))
+                        for value, column in zip(self.openSlots[level], columns) ]
+
+        if len(columns[0]) == 0:
+            return
+
+        slotIds, packets, delays, sizes = columns
+
+        changes = np.concatenate(([ True ], slotIds[1:] != slotIds[:-1]))
+        starts  = np.flatnonzero(changes)
+        slots   = [ slotIds[starts],
+                    np.add.reduceat(packets, starts),
+                    np.bincount(np.cumsum(changes) - 1, weights=delays), # summed sequentially
+                    np.add.reduceat(sizes, starts) ]
+
+        self.openSlots[level] = [ column[-1]  for column in slots ]
+        slots                 = [ column[:-1] for column in slots ]
+
+        if len(slots[0]) == 0:
+            return
+
+        closed[level].append(slots)
+
+        if level + 1 < PYRAMID_LEVELS:
+            self.push(level + 1, [ slots[0] // PYRAMID_FACTOR ] + slots[1:], closed)
+
+
+#
+# Function finds the coarsest level of the pyramid the slots of which divide the interval and the
+# bounds of the time range
+# param [in] slotSec     - float interval in seconds per which data are slotted
+# param [in] bounds      - bounds of the time range in seconds
+# param [in] baseSlotSec - slot of the base level of the pyramid in seconds
+# param [in] factor      - ratio of slots of the neighbouring levels of the pyramid
+# param [in] levels      - number of levels of the pyramid
+# returns the level and the number of its slots per interval or None if there is no such level
+#
+def find_level(slotSec, bounds, baseSlotSec, factor, levels):
+    for level in reversed(range(levels)):
+        levelSlotSec = baseSlotSec * factor ** level
+        multiple     = get_multiple(slotSec, levelSlotSec)
+
+        if multiple is not None and multiple >= 1 and \
+           all(get_multiple(bound, levelSlotSec) is not None for bound in bounds):
+            return level, multiple
+
+    return None
+
+
+#
+# Function finds how many slots the time consists of
+# param [in] time    - the time in seconds
+# param [in] slotSec - the slot in seconds
+# returns the number of slots or None if the time is not a multiple of the slot
+#
+def get_multiple(time, slotSec):
+    ratio    = time / slotSec
+    multiple = int(round(ratio))
+
+    if abs(ratio - multiple) <= TOLERANCE * max(multiple, 1):
+        return multiple
+
+    return None
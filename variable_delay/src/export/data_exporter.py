@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+
+import os
+import math
+import numpy as np
+
+from variable_delay.src.metadata.metadata import MetadataError
+from variable_delay.src.metadata.metadata_fields import ALL_FLOWS, SORTED_LAYOUT
+from variable_delay.src.layout.layout import compute_per_flow
+from variable_delay.src.layout.layout_fields import SCHEME, DIRECTION
+from variable_delay.src.data.data import DataError, load_testing_metadata
+from variable_delay.src.data.data import to_seconds, DELAYS_TYPE, WIDE_SIZES_TYPE
+from variable_delay.src.plot.flow import Flow
+from variable_delay.src.plot.curve import Curve
+from variable_delay.src.plot.flow_cache import FlowCache
+from variable_delay.src.plot.per_flow_plot import PerFlowPlot
+from variable_delay.src.plot.average_rate import AverageRate
+from variable_delay.src.plot.jain_index import JainIndex
+from variable_delay.src.export.table_writer import create_writer, NPY
+from variable_delay.src.export.exporter_args import *
+
+# exported tables
+PACKETS = 'packets' # per packet: its flow and the packet's arrival, one-way delay and size
+SLOTS   = 'slots'   # per flow and slot: average throughput and one-way delay within the slot
+JAIN    = 'jain'    # per slot: Jain's index over average throughputs of the flows
+
+# columns of the tables, the type of a label column is None
+FLOW       = 'flow'       # flow number starting from 1 as in names of data files
+ARRIVAL    = 'arrival'    # seconds since the earliest packet of all the dumps
+DELAY      = 'delay'      # milliseconds
+SIZE       = 'size'       # bytes
+TIME       = 'time'       # start of the slot in seconds
+PKTS       = 'packets'    # number of packets arrived within the slot
+BYTES      = 'bytes'      # number of bytes arrived within the slot
+THROUGHPUT = 'throughput' # Mbit/s
+AVG_DELAY  = 'delay'      # average one-way delay in milliseconds or NaN for slot without packets
+INDEX      = 'index'      # Jain's index
+LABELS     = [ (FLOW, '<u4'), (SCHEME, None), (DIRECTION, None) ]
+
+TABLES = { PACKETS: LABELS + [ (ARRIVAL, '<f8'), (DELAY, DELAYS_TYPE), (SIZE, WIDE_SIZES_TYPE) ],
+           SLOTS  : LABELS + [ (TIME, '<f8'), (PKTS, '<u8'), (BYTES, '<u8'), (THROUGHPUT, '<f8'),
+                               (AVG_DELAY, '<f8') ],
+           JAIN   : [ (TIME, '<f8'), (INDEX, '<f8') ] }
+
+
+#
+# Class the instance of which exports the per-packet data of the flows and the slotted data computed
+# over them into columnar files for external tools
+#
+class DataExporter(object):
+    #
+    # Constructor
+    # param [in] args - dictionary of the exporter arguments
+    # throws MetadataError, DataError
+    #
+    def __init__(self, args):
+        self.inDir    = args[IN_DIR]   # full path of input folder with data files
+        self.outDir   = args[OUT_DIR]  # full path of output folder for exported files
+        self.format   = args[FORMAT]   # format of exported files
+        self.slotSec  = args[SLOT_SEC] # float slot size in seconds
+        self.fromSec  = args[FROM_SEC] # start of the time range in seconds or None
+        self.toSec    = args[TO_SEC]   # end of the time range in seconds or None
+        self.plotType = PerFlowPlot()  # each flow is a curve of its own
+
+        metadata = load_testing_metadata(self.inDir)
+
+        layout      = metadata[SORTED_LAYOUT]
+        flows       = [ Flow(i) for i in range(metadata[ALL_FLOWS]) ]
+        self.curves = self.plotType.get_curves(layout, flows) # one curve per flow
+
+        # the data of each flow are loaded once for the slotted data and for the per-packet data
+        self.cache = FlowCache(self.inDir, self.fromSec, self.toSec, args[MEMORY_MIB])
+
+        Curve.CACHE    = self.cache
+        Curve.SLOT_SEC = float(self.slotSec)
+        Curve.FROM_SEC = self.fromSec
+        Curve.TO_SEC   = self.toSec
+
+        self.labels = { }                      # per label column: the list of its labels
+        self.codes  = { }                      # per label column: codes of labels of the flows
+
+        for field in [ SCHEME, DIRECTION ]:
+            values             = compute_per_flow(field, layout)
+            self.labels[field] = sorted(set(values))
+            self.codes [field] = [ self.labels[field].index(value) for value in values ]
+
+
+    #
+    # Method exports the slotted data and the per-packet data of the flows
+    # throws DataError
+    #
+    def export(self):
+        try:
+            print('Computing slotted data of the flows...')
+            averageRate = self.compute_average_data()
+
+            print('Exporting slotted data...')
+            self.export_slots(averageRate)
+
+            print('Exporting per packet data...')
+            self.export_packets()
+        finally:
+            self.cache.close()
+
+
+    #
+    # Method computes the average data of the flows
+    # returns the average rate data of the flows
+    # throws DataError
+    #
+    def compute_average_data(self):
+        maxEnd = None
+
+        for curve in self.curves:
+            curve.compute_time_bounds()
+
+            if curve.end is not None:
+                maxEnd = curve.end if maxEnd is None else max(maxEnd, curve.end)
+
+        Curve.SLOTS_NUMBER = 0 if maxEnd is None else int(math.ceil(maxEnd / Curve.SLOT_SEC))
+
+        for curve in self.curves:
+            curve.compute_average_data()
+            curve.free_flows_data()
+
+        return AverageRate(self.outDir, self.plotType, self.curves, None, None)
+
+
+    #
+    # Method exports average throughputs and average delays of the flows per slot and Jain's index
+    # over the average throughputs per slot. The slots of a flow are the slots between its first
+    # and last arrivals as in the average throughput graph.
+    # param [in] averageRate - average rate data of the flows
+    # throws DataError
+    #
+    def export_slots(self, averageRate):
+        writer = self.open_table(SLOTS)
+
+        for curve in self.curves:
+            times, rates = averageRate.get_data(curve)
+
+            if len(times) == 0:
+                continue
+
+            slotIds = np.arange(len(times)) + int(curve.start / Curve.SLOT_SEC)
+            packets = np.array(curve.slottedPkts,   dtype=np.uint64)[slotIds]
+            delays  = np.array(curve.slottedDelays, dtype=np.float64)[slotIds]
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                averageDelays = np.where(packets != 0, delays / packets, np.nan)
+
+            block = self.get_labels(curve.flows[0], len(times))
+
+            block[TIME]       = np.array(times)
+            block[PKTS]       = packets
+            block[BYTES]      = np.array(curve.slottedBytes, dtype=np.uint64)[slotIds]
+            block[THROUGHPUT] = np.array(rates)
+            block[AVG_DELAY]  = averageDelays
+
+            writer.write(block)
+
+        writer.close()
+
+        times, indexes = JainIndex(self.outDir, self.plotType, averageRate, None, None).get_data()
+
+        writer = self.open_table(JAIN)
+        writer.write({ TIME: np.array(times, dtype=np.float64),
+                       INDEX: np.array(indexes, dtype=np.float64) })
+        writer.close()
+
+
+    #
+    # Method exports the per-packet data of the flows flow by flow
+    # throws DataError
+    #
+    def export_packets(self):
+        writer = self.open_table(PACKETS)
+
+        for curve in self.curves:
+            flow = curve.flows[0]
+
+            arrivals, delays, sizes, _ = self.cache.get_packets(flow.id + 1)
+
+            block = self.get_labels(flow, len(arrivals))
+
+            # the columns are copied out of the mapped data file, so that the file is not kept open
+            block[ARRIVAL] = np.array(to_seconds(arrivals))
+            block[DELAY]   = np.array(delays, dtype=DELAYS_TYPE)
+            block[SIZE]    = np.array(sizes,  dtype=WIDE_SIZES_TYPE)
+
+            writer.write(block)
+
+            del arrivals, delays, sizes, block
+
+        writer.close()
+
+
+    #
+    # Method gets the label columns of the rows of the flow
+    # param [in] flow   - the flow
+    # param [in] length - number of the rows
+    # returns per label column: numpy array of the values or codes of the labels of the rows
+    #
+    def get_labels(self, flow, length):
+        block = { FLOW: np.full(length, flow.id + 1, dtype=np.uint32) }
+
+        for field in [ SCHEME, DIRECTION ]:
+            block[field] = np.full(length, self.codes[field][flow.id], dtype=np.uint16)
+
+        return block
+
+
+    #
+    # Method opens the writer of the exported table. The table of NPY format is the folder named
+    # after the table.
+    # param [in] table - name of the table
+    # returns the writer of the table
+    # throws DataError
+    #
+    def open_table(self, table):
+        if self.format == NPY:
+            path = os.path.join(self.outDir, table)
+        else:
+            path = os.path.join(self.outDir, '{}.{}'.format(table, self.format))
+
+        return create_writer(path, self.format, TABLES[table], self.labels)
@@ -0,0 +1,9 @@
+#!/usr/bin/env python
+
+IN_DIR     = 'in-dir'
+OUT_DIR    = 'out-dir'
+FORMAT     = 'format'
+SLOT_SEC   = 'slot-sec'
+FROM_SEC   = 'from-sec'
+TO_SEC     = 'to-sec'
+MEMORY_MIB = 'memory-mib'
@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+
+import os
+import shutil
+import numpy as np
+
+from variable_delay.src.data.data import DataError
+
+try:
+    import pyarrow         # optional package
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+NPY           = 'npy'     # folder of numpy files, one file per column, memory mapped by np.load
+ARROW         = 'arrow'   # Arrow IPC file, memory mapped by pyarrow.memory_map
+PARQUET       = 'parquet' # Parquet file
+FORMATS       = [ NPY, ARROW, PARQUET ]
+CODES_TYPE    = '<u2'     # codes of the labels of the label columns
+LABELS_SUFFIX = 'labels'  # suffix of names of numpy files with labels of the label columns
+NPY_SUFFIX    = '.npy'    # suffix of numpy files
+RAW_SUFFIX    = '.raw'    # suffix of raw temporary files of the columns
+COPY_ROWS     = 1 << 20   # number of rows copied at once from a raw file into a numpy file
+
+
+#
+# Function gets the formats of the exported files supported with the installed packages
+# returns the list of the supported formats
+#
+def get_formats():
+    if pyarrow is None:
+        return [ NPY ]
+
+    return FORMATS
+
+
+#
+# Function creates the writer of the table to the file of the format
+# param [in] path    - full path of the output file, of the output folder for NPY format
+# param [in] format  - format of the output file
+# param [in] columns - list of names and numpy types of the columns, the type of a label column is
+#                      None
+# param [in] labels  - per label column: the list of its labels
+# returns the writer of the table
+#
+def create_writer(path, format, columns, labels):
+    if format == NPY:
+        return NpyWriter(path, columns, labels)
+
+    if pyarrow is None:
+        raise DataError('Writing of %s requires pyarrow package' % path)
+
+    return ArrowWriter(path, format, columns, labels)
+
+
+#
+# Class the instance of which writes the table block by block of its rows into the folder of numpy
+# files, one file per column, which np.load reads by memory mapping. A label column is stored as
+# the file of codes of the labels of the rows and the file of the labels. The values of a column
+# are appended to a raw temporary file and copied into the numpy file when the number of rows is
+# known, so that the table is never kept in memory. The folder is written under a temporary name
+# renamed afterwards.
+#
+class NpyWriter(object):
+    #
+    # Constructor
+    # param [in] path    - full path of the output folder
+    # param [in] columns - list of names and numpy types of the columns
+    # param [in] labels  - per label column: the list of its labels
+    # throws DataError
+    #
+    def __init__(self, path, columns, labels):
+        self.path    = path          # full path of the output folder
+        self.tempDir = path + '.tmp' # full path of the temporary folder renamed when closed
+        self.rows    = 0             # number of the rows written
+        self.files   = { }           # per column: raw temporary file of its values
+
+        # names and types of the columns, the codes of the labels for a label column
+        self.columns = [ (name, CODES_TYPE if dtype is None else dtype) for name, dtype in columns ]
+
+        # per label column of the table: its labels
+        self.labels = dict((name, labels[name]) for name, dtype in columns if dtype is None)
+
+        try:
+            if os.path.isdir(self.tempDir):
+                shutil.rmtree(self.tempDir)
+
+            os.makedirs(self.tempDir)
+
+            for name, _ in self.columns:
+                self.files[name] = open(self.get_raw_path(name), 'wb')
+        except (IOError, OSError) as error:
+            self.discard()
+            raise DataError('Failed to open the folder %s:\n%s' % (self.tempDir, error))
+
+
+    #
+    # Method appends the block of rows to the raw files of the columns
+    # param [in] block - per column: numpy array of values, codes of labels for a label column
+    # throws DataError
+    #
+    def write(self, block):
+        try:
+            for name, dtype in self.columns:
+                self.files[name].write(np.ascontiguousarray(block[name], dtype=dtype).tobytes())
+        except (IOError, OSError) as error:
+            raise DataError('Failed to write exported data to the folder %s:\n%s' %
+                            (self.tempDir, error))
+
+        self.rows += len(block[self.columns[0][0]])
+
+
+    #
+    # Method copies the raw files of the columns into numpy files block by block, saves the labels
+    # of the label columns and renames the folder from the temporary name
+    # throws DataError
+    #
+    def close(self):
+        try:
+            for name, dtype in self.columns:
+                self.files.pop(name).close()
+                self.copy_column(name, dtype)
+
+            for name, values in self.labels.items():
+                labelsName = '{}-{}'.format(name, LABELS_SUFFIX)
+                np.save(os.path.join(self.tempDir, labelsName + NPY_SUFFIX),
+                        np.array(values, dtype='U'))
+
+            if os.path.isdir(self.path):
+                shutil.rmtree(self.path)
+
+            os.rename(self.tempDir, self.path)
+        except (IOError, OSError) as error:
+            self.discard()
+            raise DataError('Failed to write exported data to the folder %s:\n%s' %
+                            (self.path, error))
+
+
+    #
+    # Method closes the raw files and removes the temporary folder
+    #
+    def discard(self):
+        for file in self.files.values():
+            file.close()
+
+        self.files = { }
+        shutil.rmtree(self.tempDir, ignore_errors=True)
+
+
+    #
+    # Method copies the raw file of the column into the numpy file block by block and removes it
+    # param [in] name  - name of the column
+    # param [in] dtype - numpy type of the column
+    #
+    def copy_column(self, name, dtype):
+        rawPath = self.get_raw_path(name)
+        column  = np.lib.format.open_memmap(os.path.join(self.tempDir, name + NPY_SUFFIX),
+                                            mode='w+', dtype=dtype, shape=(self.rows,))
+
+        with open(rawPath, 'rb') as file:
+            for start in range(0, self.rows, COPY_ROWS):
+                rows = min(COPY_ROWS, self.rows - start)
+                column[start : start + rows] = np.fromfile(file, dtype=dtype, count=rows)
+
+        column.flush()
+        del column
+
+        os.remove(rawPath)
+
+
+    #
+    # Method gets the full path of the raw temporary file of the column
+    # param [in] name - name of the column
+    # returns the full path of the raw file
+    #
+    def get_raw_path(self, name):
+        return os.path.join(self.tempDir, name + RAW_SUFFIX)
+
+
+#
+# Class the instance of which writes the table block by block of its rows into Arrow IPC file or
+# Parquet file. A label column is written as a dictionary column.
+#
+class ArrowWriter(object):
+    #
+    # Constructor
+    # param [in] path    - full path of the output file
+    # param [in] format  - format of the output file: ARROW or PARQUET
+    # param [in] columns - list of names and numpy types of the columns
+    # param [in] labels  - per label column: the list of its labels
+    # throws DataError
+    #
+    def __init__(self, path, format, columns, labels):
+        self.path     = path                # full path of the output file
+        self.tempPath = path + '.tmp'       # full path of the temporary file renamed when closed
+        self.columns  = columns             # names and types of the columns
+        self.labels   = dict((name, pyarrow.array(values, type=pyarrow.string()))
+                             for name, values in labels.items()) # per label column: its labels
+
+        fields = []
+
+        for name, dtype in columns:
+            if dtype is None:
+                fieldType = pyarrow.dictionary(pyarrow.from_numpy_dtype(np.dtype(CODES_TYPE)),
+                                               pyarrow.string())
+            else:
+                fieldType = pyarrow.from_numpy_dtype(np.dtype(dtype))
+
+            fields.append(pyarrow.field(name, fieldType))
+
+        self.schema = pyarrow.schema(fields) # schema of the table
+
+        try:
+            if format == ARROW:
+                self.writer = pyarrow.ipc.new_file(self.tempPath, self.schema)
+            else:
+                self.writer = pyarrow.parquet.ParquetWriter(self.tempPath, self.schema)
+        except (IOError, OSError) as error:
+            raise DataError('Failed to open the file %s:\n%s' % (self.tempPath, error))
+
+
+    #
+    # Method writes the block of rows to the file
+    # param [in] block - per column: numpy array of values, codes of labels for a label column
+    # throws DataError
+    #
+    def write(self, block):
+        arrays = []
+
+        for name, dtype in self.columns:
+            if dtype is None:
+                codes = pyarrow.array(np.asarray(block[name], dtype=CODES_TYPE))
+                arrays.append(pyarrow.DictionaryArray.from_arrays(codes, self.labels[name]))
+            else:
+                arrays.append(pyarrow.array(np.asarray(block[name], dtype=dtype)))
+
+        try:
+            self.writer.write_table(pyarrow.Table.from_arrays(arrays, schema=self.schema))
+        except (IOError, OSError) as error:
+            raise DataError('Failed to write exported data to the file %s:\n%s' %
+                            (self.tempPath, error))
+
+
+    #
+    # Method finishes the file and renames it from the temporary name
+    # throws DataError
+    #
+    def close(self):
+        try:
+            self.writer.close()
+            os.rename(self.tempPath, self.path)
+        except (IOError, OSError) as error:
+            raise DataError('Failed to write exported data to the file %s:\n%s' %
+                            (self.path, error))
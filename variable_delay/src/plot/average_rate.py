@@ -1,17 +1,12 @@
 #!/usr/bin/env python
 
 import os
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import matplotlib.ticker as plticker
 
-from variable_delay.src.plot.plot_utils import get_x_limit, get_marker, flip
+from variable_delay.src.plot.plot_utils import get_x_limit, get_marker, get_filename
+from variable_delay.src.plot.figure_renderer import FigureData, render_figure
 
 AVERAGE_RATE     = 'avg-rate'
 PLOTS_EXTENSION  = 'png'
-LABELS_IN_ROW    = 4
-FONT_SIZE        = 12
 MIN_DURATION_SEC = 0.005 # same value as in Wireshark
 MS_IN_SEC        = 1000
 BITS_IN_BYTE     = 8
@@ -28,17 +23,19 @@ class AverageRate(object):
     # param [in] plotType   - type of graphs and stats to make
     # param [in] curves     - list of curves to plot
     # param [in] colorCycle - color cycle for curves
+    # param [in] interval   - aggregation interval in seconds to put into the filename or None
     #
-    def __init__(self, outDir, plotType, curves, colorCycle):
+    def __init__(self, outDir, plotType, curves, colorCycle, interval):
         self.curves        = curves                               # curves to plot
         self.slotSec       = curves[0].SLOT_SEC                   # float slot size in seconds
         self.slotsNumber   = curves[0].SLOTS_NUMBER               # number of slots
+        self.fromSec       = curves[0].FROM_SEC                   # start of time range or None
         self.colorCycle    = colorCycle                           # color cycle for curves
         self.labelNotation = plotType.get_label_notation_prefix() # label notation's prefix
         self.statsRates    = { }                                  # per curve: average rate stats
         self.slottedRates  = { }                                  # per curve: slotted rates
 
-        filename = '{}-{}.{}'.format(plotType.get_filename_prefix(), AVERAGE_RATE, PLOTS_EXTENSION)
+        filename = get_filename(plotType, AVERAGE_RATE, PLOTS_EXTENSION, interval)
 
         self.path = os.path.join(outDir, filename)                # full path of output graph
 
@@ -50,32 +47,24 @@ class AverageRate(object):
     # Method plots average rate of curves
     #
     def plot(self):
-        figure, ax = plt.subplots(figsize=(16, 9))
-        ax.set_prop_cycle(self.colorCycle)
+        render_figure(self.get_figure())
 
-        for curve in self.curves:
-            xData, yData = self.get_data(curve)
-            ax.plot(xData, yData, marker=get_marker(xData), label=self.get_label(curve))
-
-        ax.ticklabel_format(useOffset=False, style='plain') # turn off scientific notation
-        locator = plticker.MultipleLocator(base=1)          # enforce tick for each second on x axis
-        ax.xaxis.set_major_locator(locator)
-
-        ax.set_xlim  (get_x_limit(self.slotsNumber, self.slotSec))
-        ax.set_xlabel('Time (s), aggregation interval %gs' % self.slotSec, fontsize=FONT_SIZE)
-        ax.set_ylabel('Throughput (Mbit/s)',                               fontsize=FONT_SIZE)
-        ax.set_title (self.get_title(), loc='right',                       fontsize=FONT_SIZE)
-        ax.grid()
-
-        handles, labels = ax.get_legend_handles_labels()
 
-        legend = ax.legend(flip(handles, LABELS_IN_ROW), flip(labels,  LABELS_IN_ROW),
-                           ncol=LABELS_IN_ROW, bbox_to_anchor=(0.5, -0.1), loc='upper center',
-                           fontsize=FONT_SIZE)
+    #
+    # Method computes the data of the average rate graph of curves
+    # returns the data of the graph
+    #
+    def get_figure(self):
+        figure = FigureData(self.path, self.colorCycle,
+                            get_x_limit(self.slotsNumber, self.slotSec, self.fromSec),
+                            'Time (s), aggregation interval %gs' % self.slotSec,
+                            'Throughput (Mbit/s)', self.get_title(), { })
 
-        figure.savefig(self.path, bbox_extra_artists=(legend,), bbox_inches='tight', pad_inches=0.2)
+        for curve in self.curves:
+            xData, yData = self.get_data(curve)
+            figure.add_line(xData, yData, self.get_label(curve), { 'marker': get_marker(xData) })
 
-        plt.close(figure)
+        return figure
 
 
     #
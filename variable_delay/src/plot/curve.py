@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 
-import itertools
+import numpy as np
 
 #
 # Class the instance of which is a curve to plot
@@ -19,9 +19,27 @@ class Curve(object):
 
 
     #
-    # full path of directory with input data-files
+    # cache of the data of the flows within the time range
     #
-    IN_DIR = None
+    CACHE = None
+
+
+    #
+    # start of the time range in seconds within which packets are plotted or None
+    #
+    FROM_SEC = None
+
+
+    #
+    # end of the time range in seconds, not included, within which packets are plotted or None
+    #
+    TO_SEC = None
+
+
+    #
+    # whether per-packet delay stats are computed exactly instead of from quantile sketches
+    #
+    EXACT = False
 
 
     #
@@ -57,7 +75,7 @@ class Curve(object):
         maxEnd   = None
 
         for flow in self.flows:
-            flow.compute_time_bounds(Curve.IN_DIR)
+            flow.compute_time_bounds(Curve.CACHE)
 
             if flow.start is not None:
                 if minStart is None:
@@ -87,19 +105,75 @@ class Curve(object):
     #
     def compute_average_data(self):
         for flow in self.flows:
-            flow.compute_average_data(Curve.IN_DIR, Curve.SLOTS_NUMBER, Curve.SLOT_SEC)
+            flow.compute_average_data(Curve.CACHE, Curve.SLOTS_NUMBER, Curve.SLOT_SEC)
+
+        self.sum_average_data()
+
+
+    #
+    # Method sums average data for the curve from the average data already computed for its flows,
+    # so that the flows shared by curves of several types of plots are computed only once. The
+    # slotted data of the flows are summed as the matrix of flows by slots, the rows are added one
+    # by one in the order of the flows.
+    #
+    def sum_average_data(self):
+        self.lostSentBytes = 0
+        self.allSentBytes  = 0
+
+        for flow in self.flows:
             self.lostSentBytes += flow.lostSentBytes
             self.allSentBytes  += flow.allSentBytes
 
-        self.slottedPkts   = [0] * Curve.SLOTS_NUMBER
-        self.slottedDelays = [0] * Curve.SLOTS_NUMBER
-        self.slottedBytes  = [0] * Curve.SLOTS_NUMBER
+        self.slottedPkts   = Curve.sum_flows([ flow.slottedPkts   for flow in self.flows ])
+        self.slottedDelays = Curve.sum_flows([ flow.slottedDelays for flow in self.flows ])
+        self.slottedBytes  = Curve.sum_flows([ flow.slottedBytes  for flow in self.flows ])
+
+
+    #
+    # Method computes average data for the curve from its average data per finer slot, the slot of
+    # the curve being a multiple of the finer slot
+    # param [in] slotted  - the curve's slotted packets, delays and bytes per finer slot
+    # param [in] multiple - number of finer slots per slot
+    #
+    def derive_average_data(self, slotted, multiple):
+        finePkts, fineDelays, fineBytes = slotted
+
+        slotIds = np.arange(len(finePkts)) // multiple
 
-        for slotId in range(Curve.SLOTS_NUMBER):
-            for flow in self.flows:
-                self.slottedPkts[slotId]   += flow.slottedPkts[slotId]
-                self.slottedDelays[slotId] += flow.slottedDelays[slotId]
-                self.slottedBytes[slotId]  += flow.slottedBytes[slotId]
+        self.slottedPkts   = Curve.sum_slots(slotIds, finePkts,   np.int64  )
+        self.slottedDelays = Curve.sum_slots(slotIds, fineDelays, np.float64)
+        self.slottedBytes  = Curve.sum_slots(slotIds, fineBytes,  np.int64  )
+
+
+    #
+    # Method sums the values of finer slots into slots
+    # param [in] slotIds - ids of the slots of the finer slots
+    # param [in] values  - values of the finer slots
+    # param [in] dtype   - numpy type of the sums
+    # returns the list of the sums per slot
+    #
+    @staticmethod
+    def sum_slots(slotIds, values, dtype):
+        return np.bincount(slotIds, weights=values, minlength=Curve.SLOTS_NUMBER).astype(dtype).\
+            tolist()
+
+
+    #
+    # Method gets the slotted data of the curve
+    # returns the curve's slotted packets, delays and bytes
+    #
+    def get_slotted_data(self):
+        return self.slottedPkts, self.slottedDelays, self.slottedBytes
+
+
+    #
+    # Method sums the slotted data of the flows
+    # param [in] slotted - list of numpy arrays of the slotted data of the flows
+    # returns the list of the sums of the slotted data per slot
+    #
+    @staticmethod
+    def sum_flows(slotted):
+        return np.add.reduce(np.vstack(slotted), axis=0).tolist()
 
 
     #
@@ -126,6 +200,33 @@ class Curve(object):
         del self.allSentBytes
 
 
+    #
+    # Method gets the quantile sketch of delays of all the packets of the curve merged from the
+    # sketches of its flows. The sketches are not used if the exact stats are chosen or if the
+    # packets are limited to a time range, as the sketches cover the whole flows.
+    # returns the sketch or None if the sketch cannot be used
+    # throws DataError
+    #
+    def get_sketch(self):
+        if Curve.EXACT or Curve.FROM_SEC is not None or Curve.TO_SEC is not None:
+            return None
+
+        curveSketch = None
+
+        for flow in self.flows:
+            flowSketch = flow.get_sketch(Curve.CACHE)
+
+            if flowSketch is None:
+                return None
+
+            if curveSketch is None:
+                curveSketch = flowSketch
+            else:
+                curveSketch.merge(flowSketch)
+
+        return curveSketch
+
+
     #
     # Method gets arrays of arrival timestamps and of delays of all the packets of the curve
     # returns arrival timestamps and delays of the packets of the curve
@@ -136,9 +237,9 @@ class Curve(object):
         curveDelays   = []
 
         for flow in self.flows:
-            flowArrivals, flowDelays = flow.get_delays(Curve.IN_DIR)
+            flowArrivals, flowDelays = flow.get_delays(Curve.CACHE)
 
             curveArrivals.append(flowArrivals)
             curveDelays  .append(flowDelays)
 
-        return list(itertools.chain(*curveArrivals)), list(itertools.chain(*curveDelays))
+        return np.concatenate(curveArrivals), np.concatenate(curveDelays)
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+
+import os
+import time
+import shutil
+import signal
+import tempfile
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import matplotlib.ticker as plticker
+from multiprocessing import Pool
+
+from variable_delay.src.data.data import DataError
+from variable_delay.src.plot.plot_utils import flip
+
+POLL_SEC      = 0.1
+SPILL_PREFIX  = 'coco-beholder-figures-'
+LABELS_IN_ROW = 4
+FONT_SIZE     = 12
+
+
+#
+# Function renders the figure -- for multiprocessing pool. The arrays spilled into temporary files
+# are memory mapped back.
+# param [in] figure - the data of the figure
+#
+def render_figure_in_worker(figure):
+    for line in figure.lines:
+        for axis in range(2):
+            if isinstance(line[axis], str):
+                line[axis] = np.load(line[axis], mmap_mode='r')
+
+    render_figure(figure)
+
+
+#
+# Function renders the figure into its file
+# param [in] figure - the data of the figure
+#
+def render_figure(figure):
+    plotFigure, ax = plt.subplots(figsize=(16, 9))
+
+    if figure.colorCycle is not None:
+        ax.set_prop_cycle(figure.colorCycle)
+
+    for xData, yData, label, style in figure.lines:
+        ax.plot(xData, yData, label=label, **style)
+
+    ax.ticklabel_format(useOffset=False, style='plain') # turn off scientific notation
+    locator = plticker.MultipleLocator(base=1)          # enforce tick for each second on x axis
+    ax.xaxis.set_major_locator(locator)
+
+    if figure.xLimit is None:
+        ax.autoscale(enable=True, axis='x', tight=True) # use new x axis limit
+    else:
+        ax.set_xlim(figure.xLimit)
+
+    ax.set_xlabel(figure.xLabel,            fontsize=FONT_SIZE)
+    ax.set_ylabel(figure.yLabel,            fontsize=FONT_SIZE)
+    ax.set_title (figure.title, loc='right', fontsize=FONT_SIZE)
+    ax.grid()
+
+    handles, labels = ax.get_legend_handles_labels()
+
+    legend = ax.legend(flip(handles, LABELS_IN_ROW), flip(labels, LABELS_IN_ROW),
+                       ncol=LABELS_IN_ROW, bbox_to_anchor=(0.5, -0.1), loc='upper center',
+                       fontsize=FONT_SIZE, **figure.legendStyle)
+
+    plotFigure.savefig(figure.path, bbox_extra_artists=(legend,), bbox_inches='tight',
+                       pad_inches=0.2)
+
+    plt.close(plotFigure)
+
+
+#
+# Class the instance of which keeps the data of a figure computed in advance, so that the figure
+# can be rendered by another process
+#
+class FigureData(object):
+    #
+    # Constructor
+    # param [in] path        - full path of output graph
+    # param [in] colorCycle  - color cycle for curves or None
+    # param [in] xLimit      - min and max x limits or None for the tight limits of the data
+    # param [in] xLabel      - label of x axis
+    # param [in] yLabel      - label of y axis
+    # param [in] title       - title of the graph
+    # param [in] legendStyle - dictionary of extra arguments of the legend
+    #
+    def __init__(self, path, colorCycle, xLimit, xLabel, yLabel, title, legendStyle):
+        self.path        = path        # full path of output graph
+        self.colorCycle  = colorCycle  # color cycle for curves or None
+        self.xLimit      = xLimit      # min and max x limits or None
+        self.xLabel      = xLabel      # label of x axis
+        self.yLabel      = yLabel      # label of y axis
+        self.title       = title       # title of the graph
+        self.legendStyle = legendStyle # extra arguments of the legend
+        self.lines       = []          # per curve: x-data, y-data, label and style of the curve
+
+
+    #
+    # Method adds the curve to the figure
+    # param [in] xData - x-data of the curve
+    # param [in] yData - y-data of the curve
+    # param [in] label - label of the curve
+    # param [in] style - dictionary of extra arguments of the curve
+    #
+    def add_line(self, xData, yData, label, style):
+        self.lines.append([ xData, yData, label, style ])
+
+
+#
+# Class the instance of which renders figures by a pool of processes while the next figures are
+# computed, so that the time of the rendering is bounded by the slowest figure rather than by the
+# sum of the figures. The numpy arrays of the figures, e.g. the per-packet data, are spilled into
+# temporary files memory mapped by the processes instead of being pickled.
+#
+class FigureRenderer(object):
+    #
+    # Constructor
+    # param [in] processes - number of processes rendering the figures, with 1 the figures are
+    #                        rendered one after another by the calling process
+    #
+    def __init__(self, processes):
+        self.processes = processes # number of processes rendering the figures
+        self.pool      = None      # multiprocessing pool or None
+        self.results   = []        # results of the figures submitted to the pool
+        self.spillDir  = None      # directory of spilled arrays or None
+        self.spilled   = 0         # number of spilled arrays
+
+        if self.processes > 1:
+            self.pool = self.start_pool(self.processes)
+
+
+    #
+    # Method renders the figure or submits it to the pool
+    # param [in] figure - the data of the figure
+    # throws DataError
+    #
+    def render(self, figure):
+        if self.pool is None:
+            render_figure(figure)
+            return
+
+        for line in figure.lines:
+            for axis in range(2):
+                if isinstance(line[axis], np.ndarray):
+                    line[axis] = self.spill(line[axis])
+
+        self.results.append(self.pool.apply_async(render_figure_in_worker, (figure,)))
+
+
+    #
+    # Method waits until all the submitted figures are rendered
+    #
+    def wait(self):
+        if self.pool is None:
+            return
+
+        print('Waiting for rendering of %d figures by %d processes...' %
+              (len(self.results), self.processes))
+
+        for result in self.results:
+            while not result.ready():
+                time.sleep(POLL_SEC)
+
+            result.get() # rethrows errors of the rendering of the figure
+
+        self.results = []
+
+
+    #
+    # Method stops the processes and removes the spilled arrays
+    #
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+        if self.spillDir is not None:
+            shutil.rmtree(self.spillDir, ignore_errors=True)
+            self.spillDir = None
+
+
+    #
+    # Method spills the array into a temporary file
+    # param [in] array - numpy array
+    # returns full path of the file
+    # throws DataError
+    #
+    def spill(self, array):
+        if self.spillDir is None:
+            self.spillDir = tempfile.mkdtemp(prefix=SPILL_PREFIX)
+
+        filePath = os.path.join(self.spillDir, '{:d}.npy'.format(self.spilled))
+
+        try:
+            np.save(filePath, array)
+        except (IOError, OSError) as error:
+            raise DataError('Failed to spill figure\'s data to the file %s:\n%s' %
+                            (filePath, error))
+
+        self.spilled += 1
+
+        return filePath
+
+
+    #
+    # Method starts multiprocessing pool with processes which will render figures. The processes
+    # ignore SIGINT so that only the main process handles KeyboardInterrupt.
+    # param [in] processes - number of processes
+    # returns multiprocessing pool
+    #
+    @staticmethod
+    def start_pool(processes):
+        originalSigintHandler = signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        pool = Pool(processes)
+
+        signal.signal(signal.SIGINT, originalSigintHandler)
+
+        return pool
@@ -1,6 +1,9 @@
 #!/usr/bin/env python
 
-from variable_delay.src.data.data import get_duration, load_data, load_delays, DataError
+import numpy as np
+
+from variable_delay.src.data.data import load_slots, load_sketch, DataError
+from variable_delay.src.data.data import to_seconds, is_integer_time, NS_IN_SEC
 
 #
 # Class the instance of which is a flow with data to plot
@@ -19,47 +22,64 @@ class Flow(object):
         self.slottedBytes  = None # flow slotted bytes
         self.lostSentBytes = None # flow lost bytes
         self.allSentBytes  = None # flow sent bytes
+        self.integerTime   = None # whether arrivals are integer, so that the slots are exact
 
 
     #
-    # Method computes the flow's data first and last arrivals.
-    # param [in] directory - input directory containing the log file
+    # Method computes the flow's data first and last arrivals within the time range.
+    # param [in] cache - cache of the data of the flows within the time range
     # throws DataError
     #
-    def compute_time_bounds(self, directory):
-        self.start, self.end = get_duration(directory, self.id + 1)
+    def compute_time_bounds(self, cache):
+        if cache.fromSec is None and cache.toSec is None:
+            self.start, self.end = cache.get_duration(self.id + 1)
+            return
+
+        arrivals = np.asarray(cache.get_packets(self.id + 1)[0])
+
+        if len(arrivals) == 0:
+            self.start, self.end = None, None
+        else:
+            self.start, self.end = [ float(value) for value in to_seconds(arrivals[[0, -1]]) ]
 
 
     #
-    # Method computes average data for the flow
-    # param [in] directory   - input directory containing the log file
+    # Method computes average data for the flow. The data are summed from the pyramid of slotted
+    # data saved by the analysis if the arrivals are integer and the slot size is a multiple of the
+    # slot of some level of the pyramid, otherwise, the packets of the flow are divided into slots
+    # by their arrivals.
+    # param [in] cache       - cache of the data of the flows within the time range
     # param [in] slotsNumber - number of slots
     # param [in] slotSec     - float slot size in seconds
     # throws DataError
     #
-    def compute_average_data(self, directory, slotsNumber, slotSec):
-        arrivals, delays, sizes, loss = load_data(directory, self.id + 1)
+    def compute_average_data(self, cache, slotsNumber, slotSec):
+        slots = load_slots(cache.directory, self.id + 1, slotSec, cache.fromSec, cache.toSec)
 
-        self.lostSentBytes, self.allSentBytes = loss
+        if slots is not None:
+            slotIds, packets, delays, sizes, loss, multiple = slots
+
+            self.lostSentBytes, self.allSentBytes = loss
+            self.integerTime                      = True
+
+            self.compute_slots(slotIds // multiple, packets, delays, sizes, slotsNumber)
+            return
 
-        self.compute_slotted_packets(arrivals, slotsNumber, slotSec)
-        del arrivals[:]
+        arrivals, delays, sizes, loss = cache.get_packets(self.id + 1)
 
-        self.compute_slotted_delays(delays)
-        del delays[:]
+        self.lostSentBytes, self.allSentBytes = loss
+        self.integerTime                      = is_integer_time(np.asarray(arrivals))
+
+        slotIds = Flow.get_slot_ids(arrivals, slotSec)
+        del arrivals
 
-        self.compute_slotted_bytes(sizes)
-        del sizes[:]
+        self.compute_slots(slotIds, None, delays, sizes, slotsNumber)
 
 
     #
     # Method frees the data of the flow
     #
     def free_data(self):
-        del self.slottedPkts  [:]
-        del self.slottedDelays[:]
-        del self.slottedBytes [:]
-
         del self.slottedPkts
         del self.slottedDelays
         del self.slottedBytes
@@ -69,65 +89,64 @@ class Flow(object):
 
 
     #
-    # Method gets arrays of arrival timestamps and of delays of all the packets of the flow
-    # param [in] directory - input directory containing the log data-file of the flow
+    # Method gets arrays of arrival timestamps and of delays of the packets of the flow arrived
+    # within the time range. The arrays are copied out of the mapped columns, so that the data file
+    # of the flow is not kept open by the arrays.
+    # param [in] cache - cache of the data of the flows within the time range
     # returns arrival timestamps and delays of the packets of the flow
     # throws DataError
     #
-    def get_delays(self, directory):
-        return load_delays(directory, self.id + 1)
+    def get_delays(self, cache):
+        arrivals, delays = cache.get_packets(self.id + 1)[:2]
+
+        return np.array(to_seconds(arrivals)), np.array(delays)
 
 
     #
-    # Methods divides packets of the flow into time slots
-    # param [in] arrivals    - timestamps of packets' arrivals
-    # param [in] slotsNumber - number of slots
-    # param [in] slotSec     - float slot size in seconds
+    # Method gets the quantile sketch of delays of the packets of the flow
+    # param [in] cache - cache of the data of the flows
+    # returns the sketch or None if the data file of the flow has no sketch
+    # throws DataError
     #
-    def compute_slotted_packets(self, arrivals, slotsNumber, slotSec):
-        self.slottedPkts = [0] * slotsNumber
-
-        for arrival in arrivals:
-            slotId = int(arrival / slotSec)
-
-            self.slottedPkts[slotId] += 1
+    def get_sketch(self, cache):
+        return load_sketch(cache.directory, self.id + 1)
 
 
     #
-    # Methods computed sums of delays of packets placed in one slot for the flow
-    # param [in] delays - packets' delays
+    # Method gets the ids of the time slots of the packets of the flow. Integer nanosecond arrivals
+    # are divided by the slot in nanoseconds exactly, float arrivals are truncated as by int().
+    # param [in] arrivals - timestamps of packets' arrivals
+    # param [in] slotSec  - float slot size in seconds
+    # returns numpy array of the ids of the slots of the packets
     #
-    def compute_slotted_delays(self, delays):
-        self.slottedDelays = [0] * len(self.slottedPkts)
-
-        firstPacket = 0
-
-        for slotId, packets in enumerate(self.slottedPkts):
-            delaySum = 0.0
-
-            for packet in range(firstPacket, firstPacket + packets):
-                delaySum += delays[packet]
+    @staticmethod
+    def get_slot_ids(arrivals, slotSec):
+        arrivals = np.asarray(arrivals)
 
-            firstPacket += packets
+        if is_integer_time(arrivals):
+            return arrivals // int(round(slotSec * NS_IN_SEC))
 
-            self.slottedDelays[slotId] = delaySum
+        return (arrivals / slotSec).astype(np.int64)
 
 
     #
-    # Methods computed sums of bytes of packets placed in one slot
-    # param [in] sizes - packets' sizes in bytes
+    # Method sums the packets of the flow or the slots of the level of the pyramid of slotted data
+    # into time slots. The sums are computed by np.bincount, which adds the values to the slots in
+    # the order of the values, so the sums of delays are the same as if they were summed one by one.
+    # param [in] slotIds     - ids of the time slots of the packets or of the slots of the level
+    # param [in] packets     - numbers of packets in the slots of the level or None for packets
+    # param [in] delays      - delays of the packets or sums of delays in the slots of the level
+    # param [in] sizes       - sizes of the packets or sums of bytes in the slots of the level
+    # param [in] slotsNumber - number of slots
     #
-    def compute_slotted_bytes(self, sizes):
-        self.slottedBytes = [0] * len(self.slottedPkts)
-
-        firstPacket = 0
-
-        for slotId, packets in enumerate(self.slottedPkts):
-            bytesSum = 0
-
-            for packet in range(firstPacket, firstPacket + packets):
-                bytesSum += sizes[packet]
-
-            firstPacket += packets
-
-            self.slottedBytes[slotId] = bytesSum
+    def compute_slots(self, slotIds, packets, delays, sizes, slotsNumber):
+        if packets is None:
+            self.slottedPkts = np.bincount(slotIds, minlength=slotsNumber)
+        else:
+            self.slottedPkts = np.bincount(slotIds, weights=packets, minlength=slotsNumber).\
+                astype(np.int64)
+
+        self.slottedDelays = np.bincount(slotIds, weights=np.asarray(delays, dtype=np.float64),
+                                         minlength=slotsNumber)
+        self.slottedBytes  = np.bincount(slotIds, weights=sizes, minlength=slotsNumber).\
+            astype(np.int64)
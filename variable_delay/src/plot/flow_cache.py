@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+
+import os
+import shutil
+import tempfile
+import numpy as np
+from collections import OrderedDict
+
+from variable_delay.src.data.data import load_flow, DataError
+
+BYTES_IN_MIB = 1024 * 1024
+SPILL_PREFIX = 'coco-beholder-'
+MAPPED_FLOWS = 64 # maximum number of flows with mapped columns, each column holds a file descriptor
+ARRIVALS     = 0 # positions of the columns of the flow data
+DELAYS       = 1
+SIZES        = 2
+COLUMNS      = [ ARRIVALS, DELAYS, SIZES ]
+LOSS         = 3
+DURATION     = 4
+
+
+#
+# Class the instance of which loads the data of each flow once and serves them to the computation
+# of the average data and of the per-packet data. The columns of the data files are memory mapped
+# and cost no memory of the process. The columns parsed from the legacy data log files are kept in
+# memory within the memory budget: once the budget is exceeded, the columns of the least recently
+# used flows are spilled into temporary files and are memory mapped from there instead of parsing
+# the data log files again. As each mapped column holds an open file descriptor, only the columns of
+# MAPPED_FLOWS most recently used flows are kept mapped, the columns of other flows are mapped again
+# when they are used. The loss and the duration of each flow are kept until the cache is closed.
+#
+class FlowCache(object):
+    #
+    # Constructor
+    # param [in] directory - input directory containing the data files
+    # param [in] fromSec   - start of the time range in seconds or None
+    # param [in] toSec     - end of the time range in seconds or None
+    # param [in] budgetMib - memory budget for the columns kept in memory in MiB
+    #
+    def __init__(self, directory, fromSec, toSec, budgetMib):
+        self.directory = directory                 # input directory containing the data files
+        self.fromSec   = fromSec                   # start of the time range in seconds or None
+        self.toSec     = toSec                     # end of the time range in seconds or None
+        self.budget    = budgetMib * BYTES_IN_MIB  # memory budget in bytes
+        self.used      = 0                         # bytes of the columns kept in memory
+        self.flows     = OrderedDict()             # per flow in order of use: the flow data
+        self.inMemory  = { }                       # per flow: bytes of its columns in memory
+        self.summaries = { }                       # per flow: its loss and duration
+        self.spilled   = { }                       # per spilled flow: paths of its column files
+        self.spillDir  = None                      # directory of spilled columns or None
+
+
+    #
+    # Method gets the data of the packets of the flow arrived within the time range
+    # param [in] flow - flow index
+    # returns timestamps of arrivals of the flow's packets, one-way delays of the flow's packets,
+    # sizes in bytes of the flow's packets, the flows's lost bytes number and total sent bytes
+    # number
+    # throws DataError
+    #
+    def get_packets(self, flow):
+        return self.get(flow)[:DURATION]
+
+
+    #
+    # Method gets the first and last arrivals of the whole flow
+    # param [in] flow - flow index
+    # returns timestamps of flow's data first and last arrivals
+    # throws DataError
+    #
+    def get_duration(self, flow):
+        if flow in self.summaries:
+            return self.summaries[flow][1]
+
+        return self.get(flow)[DURATION]
+
+
+    #
+    # Method gets the data of the flow loading or mapping them if they are not kept
+    # param [in] flow - flow index
+    # returns the flow data
+    # throws DataError
+    #
+    def get(self, flow):
+        if flow in self.flows:
+            data = self.flows.pop(flow)
+            self.flows[flow] = data # the most recently used
+
+            return data
+
+        if flow in self.spilled:
+            data = [ np.load(filePath, mmap_mode='r') for filePath in self.spilled[flow] ] + \
+                   list(self.summaries[flow])
+
+            self.flows[flow] = data
+            self.unmap()
+
+            return data
+
+        data = list(load_flow(self.directory, flow, self.fromSec, self.toSec))
+
+        self.summaries[flow] = (data[LOSS], data[DURATION])
+
+        for column in COLUMNS:
+            if isinstance(data[column], list):
+                data[column] = np.array(data[column])
+
+        size = sum(data[column].nbytes for column in COLUMNS if not is_mapped(data[column]))
+
+        self.flows[flow] = data
+
+        if size != 0:
+            self.inMemory[flow]  = size
+            self.used           += size
+
+            self.spill()
+
+        self.unmap()
+
+        return data
+
+
+    #
+    # Method spills the columns of the least recently used flows, up to the latest one, into
+    # temporary files until the columns kept in memory fit into the memory budget
+    # throws DataError
+    #
+    def spill(self):
+        for flow in list(self.flows.keys()):
+            if self.used <= self.budget:
+                break
+
+            if flow not in self.inMemory:
+                continue
+
+            if self.spillDir is None:
+                self.spillDir = tempfile.mkdtemp(prefix=SPILL_PREFIX)
+
+            data = self.flows[flow]
+
+            self.spilled[flow] = []
+
+            for column in COLUMNS:
+                filePath = os.path.join(self.spillDir, '{:d}-{:d}.npy'.format(flow, column))
+
+                try:
+                    np.save(filePath, data[column])
+                except (IOError, OSError) as error:
+                    raise DataError('Failed to spill flow\'s data to the file %s:\n%s' %
+                                    (filePath, error))
+
+                data[column] = np.load(filePath, mmap_mode='r')
+
+                self.spilled[flow].append(filePath)
+
+            self.used -= self.inMemory.pop(flow)
+
+
+    #
+    # Method drops the mapped columns of the least recently used flows until at most MAPPED_FLOWS
+    # flows have mapped columns, so that their file descriptors are closed
+    #
+    def unmap(self):
+        mapped = [ flow for flow in self.flows.keys() if flow not in self.inMemory ]
+
+        for flow in mapped[:max(0, len(mapped) - MAPPED_FLOWS)]:
+            del self.flows[flow]
+
+
+    #
+    # Method frees the data of all the flows and removes the spilled columns
+    #
+    def close(self):
+        self.flows.clear()
+        self.inMemory.clear()
+        self.summaries.clear()
+        self.spilled.clear()
+        self.used = 0
+
+        if self.spillDir is not None:
+            shutil.rmtree(self.spillDir, ignore_errors=True)
+            self.spillDir = None
+
+
+#
+# Function checks whether the column is memory mapped from a file
+# param [in] column - numpy array of the column
+# returns True if the column is memory mapped and False if it is kept in memory
+#
+def is_mapped(column):
+    return isinstance(column, np.memmap) or isinstance(column.base, np.memmap)
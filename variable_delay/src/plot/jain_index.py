@@ -1,17 +1,12 @@
 #!/usr/bin/env python
 
 import os
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import matplotlib.ticker as plticker
 
-from variable_delay.src.plot.plot_utils import get_x_limit, get_marker, flip
+from variable_delay.src.plot.plot_utils import get_x_limit, get_marker, get_filename
+from variable_delay.src.plot.figure_renderer import FigureData, render_figure
 
 AVERAGE_JAIN    = 'avg-jain'
 PLOTS_EXTENSION = 'png'
-LABELS_IN_ROW   = 4
-FONT_SIZE       = 12
 CURVE           = 'curve'
 CURVES          = 'curves'
 
@@ -26,16 +21,18 @@ class JainIndex(object):
     # param [in] plotType    - type of graphs and stats to make
     # param [in] averageRate - average rate data to compute Jain's Index over
     # param [in] color       - color of Jain's Index curve
+    # param [in] interval    - aggregation interval in seconds to put into the filename or None
     #
-    def __init__(self, outDir, plotType, averageRate, color):
+    def __init__(self, outDir, plotType, averageRate, color, interval):
         self.averageRate = averageRate                 # average rate data to compute Jain's Index
         self.curves      = averageRate.get_curves()    # curves for which Jain's Index is computed
         self.slotSec     = self.curves[0].SLOT_SEC     # float slot size in seconds
         self.slotsNumber = self.curves[0].SLOTS_NUMBER # number of slots
+        self.fromSec     = self.curves[0].FROM_SEC     # start of time range or None
         self.color       = color                       # color of the Jain's Index curve
         self.jainStats   = None                        # average Jain's index stats
 
-        filename = '{}-{}.{}'.format(plotType.get_filename_prefix(), AVERAGE_JAIN, PLOTS_EXTENSION)
+        filename = get_filename(plotType, AVERAGE_JAIN, PLOTS_EXTENSION, interval)
 
         self.path = os.path.join(outDir, filename)     # full path of output graph
 
@@ -46,31 +43,24 @@ class JainIndex(object):
     # Method plots average Jain's index of the curves
     #
     def plot(self):
-        figure, ax = plt.subplots(figsize=(16, 9))
+        render_figure(self.get_figure())
 
-        xData, yData = self.get_data()
-
-        ax.plot(xData, yData, marker=get_marker(xData), label=self.get_label(), color=self.color)
-
-        ax.ticklabel_format(useOffset=False, style='plain') # turn off scientific notation
-        locator = plticker.MultipleLocator(base=1)          # enforce tick for each second on x axis
-        ax.xaxis.set_major_locator(locator)
-
-        ax.set_xlim  (get_x_limit(self.slotsNumber, self.slotSec))
-        ax.set_xlabel('Time (s), aggregation interval %gs' % self.slotSec, fontsize=FONT_SIZE)
-        ax.set_ylabel('Jain\'s index',                                     fontsize=FONT_SIZE)
-        ax.set_title (self.get_title(), loc='right',                       fontsize=FONT_SIZE)
-        ax.grid()
 
-        handles, labels = ax.get_legend_handles_labels()
-
-        legend = ax.legend(flip(handles, LABELS_IN_ROW), flip(labels, LABELS_IN_ROW),
-                           ncol=LABELS_IN_ROW, bbox_to_anchor=(0.5, -0.1), loc='upper center',
-                           fontsize=FONT_SIZE)
+    #
+    # Method computes the data of the average Jain's index graph of the curves
+    # returns the data of the graph
+    #
+    def get_figure(self):
+        figure = FigureData(self.path, None,
+                            get_x_limit(self.slotsNumber, self.slotSec, self.fromSec),
+                            'Time (s), aggregation interval %gs' % self.slotSec, 'Jain\'s index',
+                            self.get_title(), { })
 
-        figure.savefig(self.path, bbox_extra_artists=(legend,), bbox_inches='tight', pad_inches=0.2)
+        xData, yData = self.get_data()
+        figure.add_line(xData, yData, self.get_label(),
+                        { 'marker': get_marker(xData), 'color': self.color })
 
-        plt.close(figure)
+        return figure
 
 
     #
@@ -2,17 +2,11 @@
 
 import os
 import numpy
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import matplotlib.ticker as plticker
 
-from variable_delay.src.plot.plot_utils import flip
+from variable_delay.src.plot.figure_renderer import FigureData, render_figure
 
 PPT_DELAY        = 'ppt-delay'
 PLOTS_EXTENSION  = 'png'
-LABELS_IN_ROW    = 4
-FONT_SIZE        = 12
 
 
 #
@@ -45,32 +39,25 @@ class PerPacketDelay(object):
     # throws DataError
     #
     def plot(self):
-        figure, ax = plt.subplots(figsize=(16, 9))
-        ax.set_prop_cycle(self.colorCycle)
+        render_figure(self.get_figure())
 
-        for curve in self.curves:
-            xData, yData = self.get_data(curve)
-            ax.plot(xData, yData, marker='.', ms=1, ls="", label=self.get_label(curve))
-
-        ax.ticklabel_format(useOffset=False, style='plain') # turn off scientific notation
-        locator = plticker.MultipleLocator(base=1)          # enforce tick for each second on x axis
-        ax.xaxis.set_major_locator(locator)
-
-        ax.autoscale (enable=True, axis='x', tight=True )   # use new x axis limit
-        ax.set_xlabel('Time (s)',                      fontsize=FONT_SIZE)
-        ax.set_ylabel('Per-packet one-way delay (ms)', fontsize=FONT_SIZE)
-        ax.set_title (self.get_title(), loc='right',   fontsize=FONT_SIZE)
-        ax.grid()
 
-        handles, labels = ax.get_legend_handles_labels()
-
-        legend = ax.legend(flip(handles, LABELS_IN_ROW), flip(labels,  LABELS_IN_ROW),
-                           ncol=LABELS_IN_ROW, bbox_to_anchor=(0.5, -0.1), loc='upper center',
-                           fontsize=FONT_SIZE, scatterpoints=1, markerscale=10, handletextpad=0)
+    #
+    # Method computes the data of the per-packet delay graph of the curves and the per-packet stats
+    # returns the data of the graph
+    # throws DataError
+    #
+    def get_figure(self):
+        figure = FigureData(self.path, self.colorCycle, None, 'Time (s)',
+                            'Per-packet one-way delay (ms)', self.get_title(),
+                            { 'scatterpoints': 1, 'markerscale': 10, 'handletextpad': 0 })
 
-        figure.savefig(self.path, bbox_extra_artists=(legend,), bbox_inches='tight', pad_inches=0.2)
+        for curve in self.curves:
+            xData, yData = self.get_data(curve)
+            figure.add_line(xData, yData, self.get_label(curve),
+                            { 'marker': '.', 'ms': 1, 'ls': "" })
 
-        plt.close(figure)
+        return figure
 
 
     #
@@ -122,19 +109,28 @@ class PerPacketDelay(object):
 
 
     #
-    # Method computes x-axis and y-axis data to plot per-packet delay of the curve
+    # Method computes x-axis and y-axis data to plot per-packet delay of the curve. The stats are
+    # estimated from the quantile sketch of delays of the curve if it can be used, otherwise they
+    # are computed over the delays of all the packets of the curve.
     # param [in] curve - the curve to plot
     # returns x-data and y-data of the curve
     # throws DataError
     #
     def get_data(self, curve):
-        arrivals, delays = curve.get_delays()
-
         self.statsAverages     [curve] = None
         self.statsMedians      [curve] = None
         self.stats95Percentiles[curve] = None
 
-        if len(delays) != 0:
+        sketch = curve.get_sketch()
+
+        if sketch is not None:
+            self.statsAverages     [curve] = sketch.get_average()
+            self.statsMedians      [curve] = sketch.get_quantile(0.50)
+            self.stats95Percentiles[curve] = sketch.get_quantile(0.95)
+
+        arrivals, delays = curve.get_delays()
+
+        if sketch is None and len(delays) != 0:
             self.statsAverages     [curve] = numpy.average(delays)
             self.statsMedians      [curve] = numpy.percentile(delays, 50, interpolation='nearest')
             self.stats95Percentiles[curve] = numpy.percentile(delays, 95, interpolation='nearest')
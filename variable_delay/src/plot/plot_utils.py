@@ -9,19 +9,35 @@ from cycler import cycler
 # Function finds x limit for the graphs of the slotted data
 # param [in] slotsNumber - number of slots
 # param [in] slotSec     - slot size in seconds
+# param [in] fromSec     - start of the time range in seconds or None
 # returns min x limit, max x limit
 #
-def get_x_limit(slotsNumber, slotSec):
+def get_x_limit(slotsNumber, slotSec, fromSec):
     if slotsNumber == 0 or slotsNumber == 1:
         minLimit = -1
         maxLimit = 1
     else:
-        minLimit = 0
+        minLimit = 0 if fromSec is None else int(math.floor(fromSec))
         maxLimit = int(math.ceil((slotsNumber - 1) * slotSec))
 
     return minLimit, maxLimit
 
 
+#
+# Function makes the name of the file of graphs or stats of the type
+# param [in] plotType  - type of graphs and stats to make
+# param [in] name      - name of the graph or stats
+# param [in] extension - extension of the file
+# param [in] interval  - aggregation interval in seconds to put into the name or None
+# returns the name of the file
+#
+def get_filename(plotType, name, extension, interval):
+    if interval is None:
+        return '{}-{}.{}'.format(plotType.get_filename_prefix(), name, extension)
+
+    return '{}-{}-{:g}s.{}'.format(plotType.get_filename_prefix(), name, interval, extension)
+
+
 #
 # Function finds marker for line graphs
 # param [in] data - list with data to plot
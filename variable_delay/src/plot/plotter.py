@@ -3,11 +3,15 @@
 import gc
 import math
 
-from variable_delay.src.metadata.metadata import load_metadata, MetadataError
+from variable_delay.src.metadata.metadata import MetadataError
 from variable_delay.src.metadata.metadata_fields import ALL_FLOWS, SORTED_LAYOUT
-from variable_delay.src.data.data import DataError
+from variable_delay.src.data.data import DataError, load_testing_metadata
+from variable_delay.src.data.slot_pyramid import get_multiple
 from variable_delay.src.plot.plotter_args import *
 from variable_delay.src.plot.flow import Flow
+from variable_delay.src.plot.curve import Curve
+from variable_delay.src.plot.flow_cache import FlowCache
+from variable_delay.src.plot.figure_renderer import FigureRenderer
 from variable_delay.src.plot.average_rate import AverageRate
 from variable_delay.src.plot.average_delay import AverageDelay
 from variable_delay.src.plot.jain_index import JainIndex
@@ -23,98 +27,208 @@ class Plotter(object):
     #
     # Constructor
     # param [in] args - dictionary of the plotter arguments
-    # throws MetadataError
+    # throws MetadataError, DataError
     #
     def __init__(self, args):
         self.outDir          = args[OUT_DIR]           # full path of output folder for plots/stats
-        self.plotType        = args[PLOT_TYPE]         # type of graphs and stats to make
+        self.plotTypes       = args[PLOT_TYPES]        # types of graphs and stats to make
         self.jainsIndexColor = args[JAINS_INDEX_COLOR] # color of Jain's Index curve
         self.colorCycle      = args[COLOR_CYCLE]       # color cycle for curves
+        self.slotsSec        = args[SLOTS_SEC]         # ascending intervals of average plots
+        self.processes       = args[PROCESSES]         # number of processes rendering figures
+        self.renderer        = None                    # renderer of figures while generating
 
-        metadata = load_metadata(args[IN_DIR])
+        metadata = load_testing_metadata(args[IN_DIR])
 
         flowsNumber = metadata[ALL_FLOWS]
-        flows       = [ Flow(i) for i in range(flowsNumber) ]
-        self.curves = self.plotType.get_curves(metadata[SORTED_LAYOUT], flows) # the curves to plot
+        self.flows  = [ Flow(i) for i in range(flowsNumber) ] # the flows shared by all the types
 
-        type(self.curves[0]).IN_DIR   = args[IN_DIR]
-        type(self.curves[0]).SLOT_SEC = float(args[SLOT_SEC])
+        # per type: the curves to plot
+        self.curves = [ plotType.get_curves(metadata[SORTED_LAYOUT], self.flows)
+                        for plotType in self.plotTypes ]
+
+        # the data of each flow are loaded once and are shared by the average and per-packet plots
+        self.cache = FlowCache(args[IN_DIR], args[FROM_SEC], args[TO_SEC], args[MEMORY_MIB])
+
+        Curve.CACHE    = self.cache
+        Curve.FROM_SEC = args[FROM_SEC]
+        Curve.TO_SEC   = args[TO_SEC]
+        Curve.EXACT    = args[EXACT]
 
 
     #
-    # Method generates plots and stats over data extracted from pcap-files
+    # Method generates plots and stats over data extracted from pcap-files. The data of the figures
+    # are computed by the calling process, and the figures are rendered by the pool of processes
+    # started before the data are loaded.
     # throws DataError, StatsWriterError
     #
     def generate(self):
-        self.generate_average()
+        self.renderer = FigureRenderer(self.processes)
+
+        try:
+            self.generate_average()
 
-        gc.collect()
+            gc.collect()
 
-        self.generate_per_packet()
+            self.generate_per_packet()
+
+            self.renderer.wait()
+        finally:
+            self.renderer.close()
+            self.cache.close()
 
 
     #
-    # Method generates average plots/stats: average rate, average Jain index, average one-way delay
+    # Method generates average plots/stats: average rate, average Jain index, average one-way delay,
+    # for each interval and each type. The average data of the flows are computed once for all the
+    # types for the finest interval and, if the arrivals of all the flows are integer, are summed
+    # from the average data of the finest interval for the intervals that are its multiples.
     # throws DataError, StatsWriterError
     #
     def generate_average(self):
         print('Loading data of the curves to make average plots and stats...')
-        self.compute_curves_average_data()
+        self.compute_curves_time_bounds()
 
-        print('Plotting average throughput...')
-        averageRate  = AverageRate (self.outDir, self.plotType, self.curves, self.colorCycle)
-        averageRate. plot()
+        finest = None # the finest interval and per curve: its slotted data for the interval
 
-        print('Plotting average one-way delay...')
-        averageDelay = AverageDelay(self.outDir, self.plotType, self.curves, self.colorCycle)
-        averageDelay.plot()
+        for slotSec in self.slotsSec:
+            Curve.SLOT_SEC     = float(slotSec)
+            Curve.SLOTS_NUMBER = self.compute_slots_number()
 
-        print('Plotting average Jain\'s index...')
-        jainIndex    = JainIndex   (self.outDir, self.plotType, averageRate, self.jainsIndexColor)
-        jainIndex.   plot()
+            multiple = None if finest is None or not self.has_exact_slots() else \
+                       get_multiple(slotSec, finest[0])
 
-        print('Saving average statistics...')
-        statsWriter = StatsWriter(self.outDir, self.plotType, self.curves)
-        statsWriter.write_average(averageRate, averageDelay, jainIndex, Loss(self.curves))
+            if multiple is None:
+                self.compute_curves_average_data()
+
+                if finest is None:
+                    finest = (slotSec, dict((curve, curve.get_slotted_data())
+                                            for curve in self.get_all_curves()))
+            else:
+                for curve in self.get_all_curves():
+                    curve.derive_average_data(finest[1][curve], multiple)
+
+            for plotType, curves in zip(self.plotTypes, self.curves):
+                self.generate_interval(plotType, curves, self.get_interval_name(slotSec))
 
         self.free_curves_data()
 
 
     #
-    # Method generates per packet plots/stats: per packet one-way delay
+    # Method generates average plots/stats of the type for the interval of the computed average data
+    # param [in] plotType - type of graphs and stats to make
+    # param [in] curves   - the curves of the type
+    # param [in] interval - interval in seconds to put into the filenames or None
+    # throws DataError, StatsWriterError
+    #
+    def generate_interval(self, plotType, curves, interval):
+        suffix = self.get_progress_suffix(plotType, interval)
+
+        print('Plotting average throughput{}...'.format(suffix))
+        averageRate  = AverageRate (self.outDir, plotType, curves, self.colorCycle, interval)
+        self.renderer.render(averageRate.get_figure())
+
+        print('Plotting average one-way delay{}...'.format(suffix))
+        averageDelay = AverageDelay(self.outDir, plotType, curves, self.colorCycle, interval)
+        self.renderer.render(averageDelay.get_figure())
+
+        print('Plotting average Jain\'s index{}...'.format(suffix))
+        jainIndex    = JainIndex   (self.outDir, plotType, averageRate, self.jainsIndexColor,
+                                    interval)
+        self.renderer.render(jainIndex.get_figure())
+
+        print('Saving average statistics{}...'.format(suffix))
+        statsWriter = StatsWriter(self.outDir, plotType, curves, interval)
+        statsWriter.write_average(averageRate, averageDelay, jainIndex, Loss(curves))
+
+
+    #
+    # Method generates per packet plots/stats of each type: per packet one-way delay. The per-packet
+    # stats are appended to the stats of each interval.
     # throws DataError, StatsWriterError
     #
     def generate_per_packet(self):
-        print('Plotting per packet one-way delay...')
-        perPacketDelay = PerPacketDelay(self.outDir, self.plotType, self.curves, self.colorCycle)
-        perPacketDelay.plot()
+        for plotType, curves in zip(self.plotTypes, self.curves):
+            suffix = self.get_progress_suffix(plotType, None)
+
+            print('Plotting per packet one-way delay{}...'.format(suffix))
+            perPacketDelay = PerPacketDelay(self.outDir, plotType, curves, self.colorCycle)
+            self.renderer.render(perPacketDelay.get_figure())
+
+            print('Saving per-packet statistics{}...'.format(suffix))
+            for slotSec in self.slotsSec:
+                statsWriter = StatsWriter(self.outDir, plotType, curves,
+                                          self.get_interval_name(slotSec))
+                statsWriter.append_per_packet(perPacketDelay)
+
 
-        print('Saving per-packet statistics...')
-        statsWriter = StatsWriter(self.outDir, self.plotType, self.curves)
-        statsWriter.append_per_packet(perPacketDelay)
+    #
+    # Method gets the interval to put into the filenames of average plots/stats: the filenames
+    # have the interval only if several intervals are chosen
+    # param [in] slotSec - the interval in seconds
+    # returns the interval or None
+    #
+    def get_interval_name(self, slotSec):
+        return None if len(self.slotsSec) == 1 else slotSec
+
+
+    #
+    # Method gets the suffix of the progress messages naming the type if several types are chosen
+    # and the interval if several intervals are chosen
+    # param [in] plotType - type of graphs and stats
+    # param [in] interval - interval in seconds or None
+    # returns the suffix
+    #
+    def get_progress_suffix(self, plotType, interval):
+        suffix = ''
+
+        if len(self.plotTypes) != 1:
+            suffix += ' {}'.format(plotType.get_filename_prefix())
+
+        if interval is not None:
+            suffix += ' per {:g}s'.format(interval)
 
+        return suffix
 
+
+    #
+    # Method gets the curves of all the types
+    # returns the list of the curves
     #
-    # Method computes average data for each curve
+    def get_all_curves(self):
+        return [ curve for curves in self.curves for curve in curves ]
+
+
+    #
+    # Method computes average data of the flows once and sums them into average data of each curve
     # throws DataError
     #
     def compute_curves_average_data(self):
-        self.compute_curves_time_bounds()
-
-        type(self.curves[0]).SLOTS_NUMBER = self.compute_slots_number()
+        for flow in self.flows:
+            flow.compute_average_data(Curve.CACHE, Curve.SLOTS_NUMBER, Curve.SLOT_SEC)
 
-        for curve in self.curves:
-            curve.compute_average_data()
+        for curve in self.get_all_curves():
+            curve.sum_average_data()
 
         self.free_flows_data()
 
 
+    #
+    # Method checks whether the arrivals of all the flows are integer, so that a slot is exactly the
+    # sum of the finer slots in it. A float arrival at the bound of slots may be put by
+    # int(arrival / interval) into another slot than the finer slot containing it.
+    # returns True if the arrivals of all the flows are integer and False otherwise
+    #
+    def has_exact_slots(self):
+        return all(flow.integerTime for flow in self.flows)
+
+
     #
     # Methods computes start and end timestamps for each curve
     # throws DataError
     #
     def compute_curves_time_bounds(self):
-        for curve in self.curves:
+        for curve in self.get_all_curves():
             curve.compute_time_bounds()
 
 
@@ -125,7 +239,7 @@ class Plotter(object):
     def compute_slots_number(self):
         maxEnd = None
 
-        for curve in self.curves:
+        for curve in self.get_all_curves():
             if curve.end is not None:
                 if maxEnd is None:
                     maxEnd = curve.end
@@ -135,7 +249,7 @@ class Plotter(object):
         if maxEnd is None:
             slotsNumber = int(0)
         else:
-            slotsNumber = int(math.ceil(maxEnd / self.curves[0].SLOT_SEC))
+            slotsNumber = int(math.ceil(maxEnd / Curve.SLOT_SEC))
 
         return slotsNumber
 
@@ -144,13 +258,13 @@ class Plotter(object):
     # Method frees the data of all the flows
     #
     def free_flows_data(self):
-        for curve in self.curves:
-            curve.free_flows_data()
+        for flow in self.flows:
+            flow.free_data()
 
 
     #
     # Method frees data of the curves
     #
     def free_curves_data(self):
-        for curve in self.curves:
+        for curve in self.get_all_curves():
             curve.free_data()
@@ -1,8 +1,13 @@
 #!/usr/bin/env python
 
-SLOT_SEC          = 'slot-sec'
+SLOTS_SEC         = 'slots-sec'
 IN_DIR            = 'in-dir'
 OUT_DIR           = 'out-dir'
-PLOT_TYPE         = 'plot-type'
+PLOT_TYPES        = 'plot-types'
 COLOR_CYCLE       = 'color-cycle'
 JAINS_INDEX_COLOR = 'jains-index-color'
+FROM_SEC          = 'from-sec'
+TO_SEC            = 'to-sec'
+EXACT             = 'exact'
+MEMORY_MIB        = 'memory-mib'
+PROCESSES         = 'processes'
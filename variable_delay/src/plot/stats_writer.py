@@ -2,6 +2,8 @@
 
 import os
 
+from variable_delay.src.plot.plot_utils import get_filename
+
 WRITE_MODE      = 'w'
 APPEND_MODE     = 'a'
 STATISTICS      = 'stats'
@@ -24,9 +26,10 @@ class StatsWriter(object):
     # param [in] outDir   - full path of output directory for graphs and stats
     # param [in] plotType - type of graphs and stats to make
     # param [in] curves   - the curves whose stats to write
+    # param [in] interval - aggregation interval in seconds to put into the filename or None
     #
-    def __init__(self, outDir, plotType, curves):
-        filename = '{}-{}.{}'.format(plotType.get_filename_prefix(), STATISTICS, STATS_EXTENSION)
+    def __init__(self, outDir, plotType, curves, interval):
+        filename = get_filename(plotType, STATISTICS, STATS_EXTENSION, interval)
 
         self.path   = os.path.join(outDir, filename) # full path of output stats file
         self.curves = curves                         # the curves whose stats to write
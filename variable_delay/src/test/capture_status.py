@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+
+import os
+import json
+
+CAPTURE_STATUS_NAME = 'capture.json'
+RUNNING             = 'running' # tcpdump recordings have been started and are being written
+DONE                = 'done'    # tcpdump recordings have been stopped and flushed to the dumps
+
+
+#
+# Function saves the status of capturing of the dumps so that live analysis could follow the dumps
+# while they are written. The status is written to a temporary file renamed afterwards, so that the
+# status is never read partially written.
+# param [in] directoryPath - full path of the directory with the dumps
+# param [in] status        - RUNNING or DONE
+#
+def save_capture_status(directoryPath, status):
+    statusPath = os.path.join(directoryPath, CAPTURE_STATUS_NAME)
+    tempPath   = statusPath + '.tmp'
+
+    with open(tempPath, 'w') as statusFile:
+        json.dump(status, statusFile)
+
+    os.rename(tempPath, statusPath)
+
+
+#
+# Function loads the status of capturing of the dumps
+# param [in] directoryPath - full path of the directory with the dumps
+# returns RUNNING, DONE or None if capturing has not been started yet
+#
+def load_capture_status(directoryPath):
+    statusPath = os.path.join(directoryPath, CAPTURE_STATUS_NAME)
+
+    try:
+        with open(statusPath) as statusFile:
+            return json.load(statusFile)
+    except (IOError, ValueError):
+        return None
+
+
+#
+# Function removes the status of capturing left by the previous testing
+# param [in] directoryPath - full path of the directory with the dumps
+#
+def remove_capture_status(directoryPath):
+    statusPath = os.path.join(directoryPath, CAPTURE_STATUS_NAME)
+
+    if os.path.exists(statusPath):
+        os.remove(statusPath)
@@ -24,6 +24,7 @@ from variable_delay.src.metadata.metadata_fields import *
 from variable_delay.src.layout.layout import LEFTWARD, compute_per_flow
 from variable_delay.src.layout.layout_fields import *
 from variable_delay.src.pantheon.pantheon_constants import *
+from variable_delay.src.test.capture_status import save_capture_status, RUNNING, DONE
 
 SUPERNET_SIZE       = 16
 SUBNET_SIZE         = 2
@@ -153,6 +154,7 @@ class Test(object):
             self.setup_interfaces_qdisc()
             print("Starting tcpdump recordings at hosts...")
             self.start_tcpdump_recordings()
+            save_capture_status(self.dir, RUNNING)
             print("Starting servers...")
             self.start_servers()
 
@@ -408,7 +410,9 @@ class Test(object):
             receiverDumpPath = os.path.join(self.dir, receiverDumpName)
             senderDumpPath   = os.path.join(self.dir, senderDumpName)
 
-            cmd = 'tcpdump -tt -nn -i {} -Z {} -B {:d} -w "{}" host {} and host {} and (tcp or udp)'
+            # timestamps are recorded with nanosecond precision for analysis with -n/--nanoseconds
+            cmd = 'tcpdump -tt -nn -i {} -Z {} -B {:d} --time-stamp-precision=nano -w "{}" ' \
+                  'host {} and host {} and (tcp or udp)'
 
             receiverDumpPopen = receiverHost.popen(shlex.split(cmd.format(
                 receiverIntf, self.user, self.bufferKiB, receiverDumpPath, receiverIp, senderIp)))
@@ -773,6 +777,8 @@ def test(user, dir, pantheon):
     except KeyboardInterrupt:
         print("KeyboardInterrupt was caught")
         exitCode = EXIT_FAILURE
+    finally:
+        save_capture_status(dir, DONE) # live analysis reads the rest of the dumps and finishes
 
     exitMessage = SUCCESS_MESSAGE if exitCode == EXIT_SUCCESS else FAILURE_MESSAGE
     print(exitMessage)